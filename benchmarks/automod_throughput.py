@@ -0,0 +1,64 @@
+"""Measure AutoModFilter throughput on one core.
+
+Messages come from a pool of users at a fixed simulated rate, with a small
+share of invites, blocked terms and mention-heavy messages mixed in.
+
+Usage: python -m benchmarks.automod_throughput [terms ...]
+"""
+import random
+import string
+import sys
+import time
+
+from bot.utils.automod import AutoModFilter
+
+MESSAGES = 200_000
+USERS = 5_000
+SIMULATED_RATE = 2_000  # Messages per second of simulated time
+WORDS = ['the', 'patrol', 'traffic', 'stop', 'anyone', 'joining', 'session', 'tonight', 'lol', 'server',
+         'roleplay', 'police', 'fire', 'department', 'car', 'chase', 'when', 'is', 'next', 'ok']
+
+def blocked_terms(count: int, rng: random.Random) -> list:
+    return [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))) for _ in range(count)]
+
+def build_messages(terms: list, rng: random.Random) -> list:
+    messages = []
+    for n in range(MESSAGES):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(3, 25))]
+        roll = rng.random()
+        if roll < 0.01:
+            words.append('discord.gg/' + ''.join(rng.choice(string.ascii_letters) for _ in range(8)))
+        elif roll < 0.02 and terms:
+            words.insert(rng.randrange(len(words)), rng.choice(terms).upper())
+        mentions = rng.randint(1, 5) if roll > 0.97 else 0
+        messages.append((rng.randrange(USERS), ' '.join(words), mentions, n / SIMULATED_RATE))
+    return messages
+
+def run(term_count: int) -> None:
+    rng = random.Random(term_count)
+    terms = blocked_terms(term_count, rng)
+    messages = build_messages(terms, rng)
+
+    started = time.perf_counter()
+    automod = AutoModFilter(terms)
+    compile_seconds = time.perf_counter() - started
+
+    violations = {}
+    check = automod.check
+    started = time.perf_counter()
+    for user_id, content, mentions, now in messages:
+        violation = check(user_id, content, mentions, now)
+        if violation is not None:
+            violations[violation] = violations.get(violation, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    found = ', '.join(f'{count} {name}' for name, count in sorted(violations.items()))
+    print(f'{term_count:>8} {MESSAGES / elapsed:>12,.0f} {elapsed / MESSAGES * 1e6:>10.2f} {compile_seconds * 1000:>10.1f}  {found}')
+
+def main(term_counts):
+    print(f'{"terms":>8} {"msgs/s":>12} {"us/msg":>10} {"compile ms":>10}  violations')
+    for term_count in term_counts:
+        run(term_count)
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [0, 100, 1_000, 10_000])
@@ -0,0 +1,59 @@
+"""Measure in-memory cost per case: the old dict layout vs CaseRecord.
+
+Usage: python -m benchmarks.case_memory [count ...]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from bot.utils.case_tracker import CaseRecord
+
+ACTIONS = ['warn', 'kick', 'ban', 'softban', 'mute', 'infraction']
+
+def synthetic_case(case_number: int, rng: random.Random) -> dict:
+    """A case in the cases.json layout, as loaded by json.load"""
+    created = datetime.fromtimestamp(1_700_000_000 + case_number * 37 + rng.random(), timezone.utc).replace(tzinfo=None)
+    return {
+        'case_number': case_number,
+        # json.load does not intern values, so build each string fresh
+        'action': ''.join(rng.choice(ACTIONS)),
+        'target_id': rng.randrange(10**17, 10**18),
+        'moderator_id': rng.randrange(10**17, 10**18),
+        'reason': f'Reason for case {case_number}',
+        'timestamp': created.isoformat(),
+        'created_at': created.strftime('%Y-%m-%d %H:%M:%S UTC')
+    }
+
+def measure(build, count: int) -> float:
+    """Bytes allocated per case by build(count)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cases = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del cases
+    return (after - before) / count
+
+def build_dicts(count: int) -> dict:
+    rng = random.Random(count)
+    return {str(n): synthetic_case(n, rng) for n in range(1, count + 1)}
+
+def build_records(count: int) -> dict:
+    rng = random.Random(count)
+    return {n: CaseRecord.from_dict(synthetic_case(n, rng)) for n in range(1, count + 1)}
+
+def main(counts):
+    print(f'{"cases":>10} {"dict B/case":>12} {"record B/case":>14} {"saving":>8}')
+    for count in counts:
+        started = time.perf_counter()
+        dict_bytes = measure(build_dicts, count)
+        record_bytes = measure(build_records, count)
+        saving = 1 - record_bytes / dict_bytes
+        print(f'{count:>10} {dict_bytes:>12.0f} {record_bytes:>14.0f} {saving:>7.0%}  ({time.perf_counter() - started:.1f}s)')
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,82 @@
+"""Measure CaseTracker cold start: the JSON snapshot vs the indexed case file.
+
+Both stores are prepared once (including the statistics file), then timed
+from construction until the tracker is ready to serve queries.
+
+Usage: python -m benchmarks.case_startup [count ...]
+"""
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.case_memory import synthetic_case
+from bot.utils.case_tracker import CaseTracker, STORAGE_JSON, STORAGE_INDEXED
+
+RUNS = 3
+MODERATORS = 25  # Statistics rollups grow with the moderator count, so keep it realistic
+
+def build_case(case_number: int, rng: random.Random) -> dict:
+    case_data = synthetic_case(case_number, rng)
+    case_data['moderator_id'] = 10**17 + case_number % MODERATORS
+    return case_data
+
+def prepare(directory: str, count: int) -> None:
+    """Write a cases.json with count cases, then let each mode build its own files"""
+    rng = random.Random(count)
+    os.makedirs(os.path.join(directory, STORAGE_JSON))
+    json_file = os.path.join(directory, STORAGE_JSON, 'cases.json')
+    with open(json_file, 'w') as f:
+        json.dump({str(n): build_case(n, rng) for n in range(1, count + 1)}, f, indent=2)
+
+    os.makedirs(os.path.join(directory, STORAGE_INDEXED))
+    shutil.copy(json_file, os.path.join(directory, STORAGE_INDEXED, 'cases.json'))
+    for storage in (STORAGE_JSON, STORAGE_INDEXED):
+        # The first start writes the statistics file and, in indexed mode, converts the snapshot
+        CaseTracker(os.path.join(directory, storage, 'cases.json'), storage=storage).close()
+
+def start(directory: str, storage: str) -> CaseTracker:
+    tracker = CaseTracker(os.path.join(directory, storage, 'cases.json'), storage=storage)
+    # Touch the newest case so lazy loading cannot defer everything past the measurement
+    tracker.get_case(tracker.next_case_number - 1)
+    return tracker
+
+def measure(directory: str, storage: str) -> tuple:
+    """(best startup seconds, retained MiB) for one storage mode"""
+    timings = []
+    for _ in range(RUNS):
+        gc.collect()
+        started = time.perf_counter()
+        tracker = start(directory, storage)
+        timings.append(time.perf_counter() - started)
+        tracker.close()
+        del tracker
+
+    gc.collect()
+    tracemalloc.start()
+    tracker = start(directory, storage)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracker.close()
+    return min(timings), retained / 2**20
+
+def main(counts):
+    print(f'{"cases":>10} {"json s":>9} {"indexed s":>10} {"json MiB":>9} {"indexed MiB":>12} {"speedup":>8}')
+    for count in counts:
+        directory = tempfile.mkdtemp(prefix='case_startup_')
+        try:
+            prepare(directory, count)
+            json_time, json_memory = measure(directory, STORAGE_JSON)
+            indexed_time, indexed_memory = measure(directory, STORAGE_INDEXED)
+            print(f'{count:>10} {json_time:>9.3f} {indexed_time:>10.4f} {json_memory:>9.1f} {indexed_memory:>12.2f} '
+                  f'{json_time / indexed_time:>7.0f}x')
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,194 @@
+"""Run the real cogs' commands against a local fake Discord and measure them.
+
+Each scenario sends synthetic interactions through the bot's command tree (or
+calls the listener, for joins) with a fixed number in flight, while the fake
+REST API adds latency and answers some requests with a 429. Reported per
+scenario: throughput, p50/p99 latency, REST requests per operation, 429s
+retried, and traced memory from a second, smaller pass. Results are saved as
+JSON; pass an earlier file with --compare to see the change.
+
+Usage: python -m benchmarks.command_latency [--ops 300] [--concurrency 10] [--latency-ms 50]
+           [--rate-limit 0.02] [--scenarios warn,infract,...] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import time
+import tracemalloc
+
+import discord
+
+from benchmarks import fake_discord
+from benchmarks.fake_discord import (FakeDiscordAPI, isolate_data_dir, start_bot, close_bot, slash_command, member_join,
+                                     GUILD_ID, MODERATOR_ID, STAFF_ID, MEMBER_BASE_ID, MODERATOR_ROLE_ID, LIMITED_ROLE_ID,
+                                     COMMUNITY_MEMBER_ROLE_ID)
+
+MEMBERS = 1000  # Regular members in the synthetic guild; targets are picked from them
+MEMORY_OPS = 100  # Operations in the traced-memory pass (tracemalloc slows everything down)
+
+def target(rng: random.Random) -> int:
+    return MEMBER_BASE_ID + rng.randrange(MEMBERS)
+
+async def run_command(bot, interaction: discord.Interaction) -> bool:
+    """Dispatch like the gateway would; returns whether the command completed without error"""
+    await bot.tree._call(interaction)
+    return interaction.extras.get('error') is None and not interaction.command_failed
+
+async def warn(bot, rng):
+    return await run_command(bot, slash_command(bot, 'warn', MODERATOR_ID, {'member': target(rng), 'reason': 'Spam'},
+                                                [MODERATOR_ROLE_ID]))
+
+async def kick(bot, rng):
+    return await run_command(bot, slash_command(bot, 'kick', MODERATOR_ID, {'member': target(rng), 'reason': 'Spam'},
+                                                [MODERATOR_ROLE_ID]))
+
+async def ban(bot, rng):
+    return await run_command(bot, slash_command(bot, 'ban', MODERATOR_ID, {'member': target(rng), 'reason': 'Spam'},
+                                                [MODERATOR_ROLE_ID]))
+
+async def infract(bot, rng):
+    return await run_command(bot, slash_command(bot, 'infract', STAFF_ID, {'staff_member': MODERATOR_ID,
+                                                'punishment': 'Warning', 'reason': 'Late to shift'}, [LIMITED_ROLE_ID]))
+
+async def suggest(bot, rng):
+    return await run_command(bot, slash_command(bot, 'suggest', target(rng), {'suggestion': 'Add a music channel'},
+                                                [COMMUNITY_MEMBER_ROLE_ID]))
+
+async def say(bot, rng):
+    return await run_command(bot, slash_command(bot, 'say', MODERATOR_ID, {'message': 'Server restart in 5 minutes'},
+                                                [MODERATOR_ROLE_ID]))
+
+async def join(bot, rng):
+    guild = bot.get_guild(GUILD_ID)
+    cog = bot.get_cog('WelcomeCog')
+    cog.raid_trackers.pop(GUILD_ID, None)  # Measure the welcome path; a burst this fast would otherwise read as a raid
+    member = discord.Member(data=member_join(rng.getrandbits(22)), guild=guild, state=bot._connection)
+    await cog.on_member_join(member)
+    return True
+
+SCENARIOS = {'warn': warn, 'kick': kick, 'ban': ban, 'infract': infract, 'suggest': suggest, 'say': say, 'join': join}
+
+async def drive(bot, scenario, ops: int, concurrency: int, seed: int) -> tuple:
+    """Run ops operations with up to concurrency in flight, returns (latencies, failures, wall seconds)"""
+    rng = random.Random(seed)
+    latencies = []
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await scenario(bot, rng)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            failures += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(ops)))
+    return latencies, failures, time.perf_counter() - started
+
+def percentile(values: list, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+async def measure(bot, api: FakeDiscordAPI, name: str, ops: int, concurrency: int) -> dict:
+    scenario = SCENARIOS[name]
+    await drive(bot, scenario, min(ops, 20), concurrency, seed=-1)  # Warm up caches and connections
+    api.reset_counts()
+    gc.collect()
+    latencies, failures, wall = await drive(bot, scenario, ops, concurrency, seed=0)
+    requests = sum(api.requests.values())
+    rate_limited = api.rate_limited
+
+    gc.collect()
+    tracemalloc.start()
+    await drive(bot, scenario, MEMORY_OPS, concurrency, seed=1)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'ops': ops, 'failures': failures, 'throughput': ops / wall,
+            'p50_ms': percentile(latencies, 0.5) * 1000, 'p99_ms': percentile(latencies, 0.99) * 1000,
+            'mean_ms': statistics.fmean(latencies) * 1000, 'requests_per_op': requests / ops,
+            'rate_limited': rate_limited, 'peak_mib': peak / 2**20, 'retained_kib_per_op': retained / 1024 / MEMORY_OPS}
+
+def print_table(results: dict, baseline: dict = None) -> None:
+    header = f'{"scenario":>10} {"ops/s":>9} {"p50 ms":>9} {"p99 ms":>9} {"req/op":>7} {"429s":>6} {"peak MiB":>9} {"KiB/op":>7} {"failed":>7}'
+    if baseline:
+        header += f' {"ops/s Δ":>8} {"p99 Δ":>8}'
+    print(header)
+    for name, result in results.items():
+        line = (f'{name:>10} {result["throughput"]:>9.1f} {result["p50_ms"]:>9.1f} {result["p99_ms"]:>9.1f} '
+                f'{result["requests_per_op"]:>7.1f} {result["rate_limited"]:>6} {result["peak_mib"]:>9.2f} '
+                f'{result["retained_kib_per_op"]:>7.1f} {result["failures"]:>7}')
+        before = (baseline or {}).get(name)
+        if before:
+            line += (f' {(result["throughput"] / before["throughput"] - 1) * 100:>+7.1f}%'
+                     f' {(result["p99_ms"] / before["p99_ms"] - 1) * 100:>+7.1f}%')
+        print(line)
+
+async def run(args) -> dict:
+    api = FakeDiscordAPI(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit=args.rate_limit,
+                         retry_after=args.retry_after, bucket_limit=args.bucket_limit)
+    await api.start()
+    bot = await start_bot(api, members=MEMBERS)
+    try:
+        results = {}
+        for name in args.scenarios:
+            results[name] = await measure(bot, api, name, args.ops, args.concurrency)
+        return results
+    finally:
+        await close_bot(bot)
+        await api.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cogs against a local fake Discord API')
+    parser.add_argument('--ops', type=int, default=300, help='Operations per scenario')
+    parser.add_argument('--concurrency', type=int, default=10, help='Operations in flight at once')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Fake API response time')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='Random extra response time, up to this much')
+    parser.add_argument('--rate-limit', type=float, default=0.02, help='Share of requests answered with a 429')
+    parser.add_argument('--retry-after', type=float, default=0.05, help='Seconds each 429 asks the bot to wait')
+    parser.add_argument('--bucket-limit', type=int, default=50, help='Requests per route per second before real 429s')
+    parser.add_argument('--scenarios', type=lambda value: value.split(','), default=list(SCENARIOS),
+                        help=f'Comma-separated, from: {",".join(SCENARIOS)}')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['scenarios']
+    output = args.output and os.path.abspath(args.output)  # Resolve before moving to the scratch directory
+
+    logging.basicConfig(level=logging.CRITICAL)  # The cogs log every action and discord.py every 429
+    directory = isolate_data_dir()
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        os.chdir(fake_discord.REPO_ROOT)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print_table(results, baseline)
+    if output:
+        settings = {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}
+        with open(output, 'w') as f:
+            json.dump({'created': time.time(), 'python': platform.python_version(), 'discord.py': discord.__version__,
+                       'settings': settings, 'scenarios': results}, f, indent=2)
+        print(f'Results written to {output}')
+
+if __name__ == '__main__':
+    main()
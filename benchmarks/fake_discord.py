@@ -0,0 +1,340 @@
+"""Offline stand-in for Discord: a local REST API and a synthetic guild to run the real cogs against.
+
+FakeDiscordAPI serves the endpoints the cogs call with made-up but well-formed
+payloads, after a configurable delay, and answers a configurable share of
+requests with a 429 so discord.py's rate limit handling is exercised too.
+start_bot() points discord.py at it, logs in, loads cogs and adds the guild
+the cogs expect (their hardcoded role and channel IDs) to the bot's cache.
+Nothing here talks to the real Discord.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+import discord
+from discord.ext import commands
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOT_ID = 900000000000000001
+APP_ID = BOT_ID
+GUILD_ID = 900000000000000100
+OWNER_ID = 900000000000000002
+MODERATOR_ID = 900000000000000003  # Has the moderator role
+STAFF_ID = 900000000000000004  # Has the limited (infraction) role
+MEMBER_BASE_ID = 910000000000000000  # Regular members are MEMBER_BASE_ID + n
+
+# IDs the cogs hardcode
+MODERATOR_ROLE_ID = 1393754910088101958
+LIMITED_ROLE_ID = 1393737607653097614
+COMMUNITY_MEMBER_ROLE_ID = 1393737552502194238
+BOT_ROLE_ID = 900000000000000200
+GENERAL_CHANNEL_ID = 900000000000000300
+WELCOME_CHANNEL_ID = 1393737919121854584
+INFRACTION_CHANNEL_ID = 1393737982120558674
+SUGGESTION_CHANNEL_ID = 1394068696603037868
+COMMAND_LOG_CHANNEL_ID = 1393756933957226506
+
+COGS = ['bot.cogs.moderation', 'bot.cogs.infraction', 'bot.cogs.suggestions', 'bot.cogs.welcome', 'bot.cogs.messaging']
+
+ID_SEGMENT = re.compile(r'/(?:\d+|[A-Za-z0-9_.-]{40,})(?=/|$)')  # Snowflakes and tokens, folded in request counts
+MAJOR_PARAMETER = re.compile(r'^/(?:channels|guilds|webhooks|interactions)/\d+')  # Splits Discord's rate limit buckets
+TIMESTAMP = '2025-01-01T00:00:00.000000+00:00'
+
+def user_payload(user_id: int, name: Optional[str] = None, bot: bool = False) -> dict:
+    return {'id': str(user_id), 'username': name or f'user{user_id % 100000}', 'discriminator': '0',
+            'global_name': None, 'avatar': None, 'bot': bot}
+
+def member_payload(user_id: int, roles: List[int] = (), name: Optional[str] = None, bot: bool = False) -> dict:
+    return {'user': user_payload(user_id, name, bot), 'roles': [str(role) for role in roles], 'joined_at': TIMESTAMP,
+            'deaf': False, 'mute': False, 'flags': 0}
+
+def role_payload(role_id: int, name: str, position: int, permissions: int = 0) -> dict:
+    return {'id': str(role_id), 'name': name, 'color': 0, 'hoist': False, 'position': position,
+            'permissions': str(permissions), 'managed': False, 'mentionable': True, 'flags': 0}
+
+def channel_payload(channel_id: int, name: str, position: int = 0) -> dict:
+    return {'id': str(channel_id), 'type': 0, 'guild_id': str(GUILD_ID), 'name': name, 'position': position,
+            'permission_overwrites': [], 'nsfw': False, 'parent_id': None, 'topic': None}
+
+def thread_payload(thread_id: int, parent_id: int, name: str) -> dict:
+    return {'id': str(thread_id), 'type': 11, 'guild_id': str(GUILD_ID), 'parent_id': str(parent_id), 'name': name,
+            'owner_id': str(BOT_ID), 'member_count': 1, 'message_count': 0,
+            'thread_metadata': {'archived': False, 'auto_archive_duration': 10080,
+                                'archive_timestamp': TIMESTAMP, 'locked': False}}
+
+def message_payload(message_id: int, channel_id: int, content: str = '', author_id: int = BOT_ID, body: Optional[dict] = None) -> dict:
+    body = body or {}
+    return {'id': str(message_id), 'channel_id': str(channel_id), 'author': user_payload(author_id, bot=author_id == BOT_ID),
+            'content': body.get('content') or content, 'timestamp': TIMESTAMP, 'edited_timestamp': None, 'tts': False,
+            'mention_everyone': False, 'mentions': [], 'mention_roles': [], 'attachments': [],
+            'embeds': body.get('embeds') or [], 'components': body.get('components') or [], 'pinned': False, 'type': 0,
+            'flags': body.get('flags') or 0}
+
+def guild_payload(members: int) -> dict:
+    """The guild the cogs are written for, with members regular members besides the staff and the bot"""
+    everyone = (1 << 10) | (1 << 11) | (1 << 16)  # View channels, send messages, read history
+    roles = [
+        role_payload(GUILD_ID, '@everyone', 0, everyone),
+        role_payload(COMMUNITY_MEMBER_ROLE_ID, 'Community Member', 1),
+        role_payload(LIMITED_ROLE_ID, 'Staff', 5),
+        role_payload(MODERATOR_ROLE_ID, 'Moderator', 6),
+        role_payload(BOT_ROLE_ID, 'Bot', 10, 8)  # Administrator
+    ]
+    channels = [
+        channel_payload(GENERAL_CHANNEL_ID, 'general', 0),
+        channel_payload(WELCOME_CHANNEL_ID, 'welcome', 1),
+        channel_payload(INFRACTION_CHANNEL_ID, 'infractions', 2),
+        channel_payload(SUGGESTION_CHANNEL_ID, 'suggestions', 3),
+        channel_payload(COMMAND_LOG_CHANNEL_ID, 'command-log', 4)
+    ]
+    member_list = [
+        member_payload(BOT_ID, [BOT_ROLE_ID], 'bench-bot', bot=True),
+        member_payload(OWNER_ID, [], 'owner'),
+        member_payload(MODERATOR_ID, [MODERATOR_ROLE_ID], 'moderator'),
+        member_payload(STAFF_ID, [LIMITED_ROLE_ID], 'staff')
+    ]
+    member_list.extend(member_payload(MEMBER_BASE_ID + n, [COMMUNITY_MEMBER_ROLE_ID]) for n in range(members))
+    return {'id': str(GUILD_ID), 'name': 'Benchmark Guild', 'icon': None, 'owner_id': str(OWNER_ID),
+            'member_count': len(member_list), 'roles': roles, 'channels': channels, 'members': member_list,
+            'emojis': [], 'stickers': [], 'features': [], 'threads': [], 'premium_tier': 0, 'verification_level': 0,
+            'default_message_notifications': 0, 'explicit_content_filter': 0, 'mfa_level': 0, 'nsfw_level': 0,
+            'afk_timeout': 300, 'system_channel_flags': 0, 'preferred_locale': 'en-US', 'large': False}
+
+class FakeDiscordAPI:
+    """Local HTTP server answering Discord REST calls after latency_ms (plus up to jitter_ms).
+
+    Like Discord, every response carries the rate limit headers of its bucket
+    (route plus major parameter), allowing bucket_limit requests per
+    bucket_window seconds; going over gets a 429. On top of that a rate_limit
+    share of requests is refused with a 429 asking for retry_after seconds.
+    """
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 10.0, rate_limit: float = 0.0,
+                 retry_after: float = 0.05, bucket_limit: int = 50, bucket_window: float = 1.0, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.buckets: Dict[str, list] = {}  # bucket key -> [requests left, monotonic time it refills]
+        self.random = random.Random(seed)
+        self.requests: Counter = Counter()  # 'METHOD /route/{id}' -> count
+        self.rate_limited = 0
+        self.next_id = 950000000000000000
+        self.runner: Optional[web.AppRunner] = None
+        self.url = ''
+
+    def reset_counts(self) -> None:
+        self.requests.clear()
+        self.rate_limited = 0
+
+    def snowflake(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    async def start(self) -> str:
+        """Serve on a free local port and point discord.py's REST and webhook clients at it"""
+        app = web.Application(client_max_size=8 * 1024 * 1024)
+        app.router.add_route('*', '/api/v10/{path:.*}', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f'http://127.0.0.1:{port}/api/v10'
+        discord.http.Route.BASE = self.url  # Also used by the interaction webhook adapter
+        return self.url
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        path = '/' + request.match_info['path']
+        self.requests[f"{request.method} {ID_SEGMENT.sub('/{id}', path)}"] += 1
+        await asyncio.sleep(self.latency + self.random.random() * self.jitter)
+
+        headers = {'Via': '1.1 google'}  # discord.py treats a 429 without it as a Cloudflare ban
+        remaining, reset_after = self.take(request.method, path)
+        headers.update({'X-RateLimit-Limit': str(self.bucket_limit), 'X-RateLimit-Remaining': str(max(remaining, 0)),
+                        'X-RateLimit-Reset-After': f'{reset_after:.3f}',
+                        'X-RateLimit-Reset': f'{time.time() + reset_after:.3f}'})
+        if remaining < 0:
+            return self.too_many_requests(headers, reset_after)
+        if self.rate_limit and self.random.random() < self.rate_limit:
+            return self.too_many_requests(headers, self.retry_after)
+
+        body = {}
+        if request.can_read_body:
+            if request.content_type == 'application/json':
+                body = await request.json()
+            else:
+                await request.read()  # Multipart uploads; the payload isn't needed
+        data = self.respond(request.method, path, body)
+        if data is None:
+            return web.Response(status=204, headers=headers)
+        return self.json(data, headers)
+
+    def take(self, method: str, path: str) -> tuple:
+        """Use up one request of the path's bucket, returns (requests left, seconds until it refills);
+        fewer than zero left means the request is over the limit"""
+        match = MAJOR_PARAMETER.match(path)
+        key = f"{method} {ID_SEGMENT.sub('/{id}', path)} {match.group(0) if match else ''}"
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None or now >= bucket[1]:
+            bucket = self.buckets[key] = [self.bucket_limit, now + self.bucket_window]
+        bucket[0] -= 1
+        return bucket[0], bucket[1] - now
+
+    def too_many_requests(self, headers: dict, retry_after: float) -> web.Response:
+        self.rate_limited += 1
+        headers.update({'Retry-After': f'{retry_after:.3f}', 'X-RateLimit-Scope': 'user'})
+        return self.json({'message': 'You are being rate limited.', 'retry_after': retry_after, 'global': False},
+                         headers, status=429)
+
+    def json(self, data, headers: dict, status: int = 200) -> web.Response:
+        # Exactly Discord's content type: discord.py only decodes bodies labelled plain application/json
+        return web.Response(body=json.dumps(data).encode(), status=status, headers=headers, content_type='application/json')
+
+    def respond(self, method: str, path: str, body: dict) -> Optional[dict]:
+        """Response payload for one request; None is a 204"""
+        parts = path.strip('/').split('/')
+        if path == '/users/@me':
+            return user_payload(BOT_ID, 'bench-bot', bot=True)
+        if path == '/oauth2/applications/@me':
+            return {'id': str(APP_ID), 'name': 'bench-bot', 'description': '', 'icon': None, 'bot_public': True,
+                    'bot_require_code_grant': False, 'owner': user_payload(OWNER_ID, 'owner'), 'verify_key': '0' * 64,
+                    'flags': 0}
+        if path == '/users/@me/channels':
+            return {'id': str(self.snowflake()), 'type': 1, 'recipients': [user_payload(int(body.get('recipient_id', 0)))],
+                    'last_message_id': None}
+        if parts[0] == 'interactions' and parts[-1] == 'callback':
+            response_type = body.get('type', 4)
+            data = {'interaction': {'id': parts[1], 'type': 2, 'response_message_id': str(self.snowflake()),
+                                    'response_message_loading': response_type == 5,
+                                    'response_message_ephemeral': bool((body.get('data') or {}).get('flags', 0) & 64)}}
+            if response_type in (4, 7):
+                data['resource'] = {'type': response_type, 'message': message_payload(
+                    int(data['interaction']['response_message_id']), GENERAL_CHANNEL_ID, body=body.get('data'))}
+            return data
+        if parts[0] == 'webhooks':
+            if method == 'DELETE':
+                return None
+            message_id = int(parts[4]) if len(parts) > 4 and parts[4].isdigit() else self.snowflake()
+            return message_payload(message_id, GENERAL_CHANNEL_ID, body=body)
+        if parts[0] == 'channels' and len(parts) >= 3 and parts[2] == 'messages':
+            channel_id = int(parts[1])
+            if len(parts) == 5 and parts[4] == 'threads':
+                return thread_payload(self.snowflake(), channel_id, body.get('name', 'thread'))
+            if method == 'DELETE' or len(parts) > 4:
+                return None  # Deletes, reactions, bulk deletes
+            if method in ('POST', 'PATCH'):
+                message_id = int(parts[3]) if len(parts) == 4 else self.snowflake()
+                return message_payload(message_id, channel_id, body=body)
+            return []  # History
+        if parts[0] == 'guilds' and len(parts) == 4 and parts[2] == 'members' and method == 'PATCH':
+            return member_payload(int(parts[3]), body.get('roles') or [])
+        if parts[0] == 'guilds' and len(parts) == 3 and parts[2] == 'bulk-ban':
+            return {'banned_users': body.get('user_ids', []), 'failed_users': []}
+        return None  # Bans, kicks, role changes, permission overwrites
+
+def isolate_data_dir() -> str:
+    """Run from a fresh temporary directory so the bot's data/ files don't touch the real ones"""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    directory = tempfile.mkdtemp(prefix='discord_bench_')
+    os.chdir(directory)
+    return directory
+
+async def start_bot(api: FakeDiscordAPI, members: int = 1000, cogs: List[str] = COGS) -> commands.Bot:
+    """Logged-in bot wired like main.py, with cogs loaded and the synthetic guild cached, but no gateway"""
+    from bot.utils.metrics import MetricsTree, instrument_http
+    from bot.utils.tracing import trace_http
+
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    bot = commands.Bot(command_prefix='!', intents=intents, tree_cls=MetricsTree)
+    instrument_http(bot.http)
+    trace_http(bot.http)
+    await bot.login('fake-token')
+    bot._connection._add_guild_from_data(guild_payload(members))
+    for cog in cogs:
+        await bot.load_extension(cog)
+    return bot
+
+async def close_bot(bot: commands.Bot) -> None:
+    """Stop the background pieces the cogs started and close the HTTP session"""
+    from bot.utils.audit_log import AUDIT_LOG
+
+    for name in ('scheduler', 'case_tracker', 'point_ledger'):
+        store = getattr(bot, name, None)
+        if store is not None:
+            store.close()
+    AUDIT_LOG.close()
+    await bot.http.close()
+
+_interaction_ids = iter(range(960000000000000000, 970000000000000000))
+
+def interaction_payload(interaction_type: int, data: dict, user_id: int, channel_id: int = GENERAL_CHANNEL_ID,
+                        roles: List[int] = (), message: Optional[dict] = None) -> dict:
+    payload = {'id': str(next(_interaction_ids)), 'application_id': str(APP_ID), 'type': interaction_type,
+               'token': f'token-{time.monotonic_ns()}-{"x" * 40}', 'version': 1, 'guild_id': str(GUILD_ID),
+               'channel_id': str(channel_id), 'channel': {'id': str(channel_id), 'type': 0, 'guild_id': str(GUILD_ID)},
+               'member': {**member_payload(user_id, roles), 'permissions': str((1 << 53) - 1)},
+               'app_permissions': str((1 << 53) - 1), 'locale': 'en-US', 'guild_locale': 'en-US', 'entitlements': [],
+               'authorizing_integration_owners': {}, 'data': data}
+    if message is not None:
+        payload['message'] = message
+    return payload
+
+def slash_command(bot: commands.Bot, name: str, user_id: int, options: dict, roles: List[int] = (),
+                  channel_id: int = GENERAL_CHANNEL_ID) -> discord.Interaction:
+    """App command interaction for /name; int values naming a cached member are sent as user options"""
+    guild = bot.get_guild(GUILD_ID)
+    command = bot.tree.get_command(name)
+    data = {'id': str(next(_interaction_ids)), 'name': name, 'type': 1, 'guild_id': str(GUILD_ID), 'options': []}
+    resolved_users, resolved_members = {}, {}
+    for option, value in options.items():
+        parameter = command._params[option]
+        option_type = parameter.type.value
+        if option_type == discord.AppCommandOptionType.user.value:
+            member = guild.get_member(value)
+            roles_of = [role.id for role in member.roles[1:]]
+            resolved_users[str(value)] = user_payload(value, member.name)
+            resolved_members[str(value)] = {**member_payload(value, roles_of), 'permissions': '0'}
+            value = str(value)
+        data['options'].append({'name': option, 'type': option_type, 'value': value})
+    if resolved_users:
+        data['resolved'] = {'users': resolved_users, 'members': resolved_members}
+    payload = interaction_payload(2, data, user_id, channel_id, roles)
+    return discord.Interaction(data=payload, state=bot._connection)
+
+def button_press(message_id: int, custom_id: str, user_id: int, channel_id: int, roles: List[int] = ()) -> dict:
+    """INTERACTION_CREATE gateway payload for a press of a button on one of the bot's messages"""
+    data = {'custom_id': custom_id, 'component_type': 2}
+    return interaction_payload(3, data, user_id, channel_id, roles, message_payload(message_id, channel_id))
+
+def message_create(message_id: int, user_id: int, channel_id: int, content: str, roles: List[int] = ()) -> dict:
+    """MESSAGE_CREATE gateway payload for a member's message"""
+    member = member_payload(user_id, roles)
+    del member['user']
+    return {**message_payload(message_id, channel_id, content, author_id=user_id), 'guild_id': str(GUILD_ID),
+            'member': member}
+
+def member_join(user_id: int, account_age_days: float = 365.0) -> dict:
+    """GUILD_MEMBER_ADD gateway payload for a new member whose account is account_age_days old"""
+    created = int((time.time() - account_age_days * 86400) * 1000)
+    user_id = ((created - discord.utils.DISCORD_EPOCH) << 22) | (user_id & 0x3FFFFF)  # Snowflakes carry creation time
+    return {**member_payload(user_id), 'guild_id': str(GUILD_ID), 'joined_at': discord.utils.utcnow().isoformat()}
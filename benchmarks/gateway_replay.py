@@ -0,0 +1,399 @@
+"""Replay a stream of gateway events into the bot's dispatch path to find where it stops keeping up.
+
+Member joins, messages and suggestion button presses are synthesised at the
+given rates (Poisson arrivals, optionally ramping up over the run), or loaded
+from a stream saved earlier with --save so runs can be repeated exactly. Each
+event is handed to the same discord.py parser the gateway would call, so the
+real listeners run: WelcomeCog.on_member_join (and raid detection),
+AutoModCog.on_message and the SuggestionView buttons, all against the local
+fake REST API from benchmarks.fake_discord.
+
+Every interval the timeline shows the events offered, how far the replayer
+is behind schedule, handlers still running, tasks on the loop, loop lag,
+RSS, and p50/p99 handling lag per kind (from the event's scheduled arrival
+until the last handler it started finished). Once p99 lag stays above --lag-budget the bot is
+saturated at roughly the offered rate.
+
+Usage: python -m benchmarks.gateway_replay [--joins-per-min 1000] [--messages-per-min 600] [--votes-per-min 300]
+           [--duration 60] [--ramp] [--young-share 0.2] [--save stream.jsonl | --replay stream.jsonl]
+           [--latency-ms 50] [--rate-limit 0.0] [--interval 1] [--output timeline.json]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from benchmarks import fake_discord
+from benchmarks.fake_discord import (FakeDiscordAPI, isolate_data_dir, start_bot, close_bot, slash_command, member_join,
+                                     message_create, button_press, COGS, GENERAL_CHANNEL_ID, SUGGESTION_CHANNEL_ID,
+                                     MEMBER_BASE_ID, COMMUNITY_MEMBER_ROLE_ID)
+
+STREAM_VERSION = 1
+SUGGESTIONS = 5  # Suggestions posted before the replay; button presses are spread over them
+RAMP_FLOOR = 0.1  # With --ramp, rates start at this share of the target and rise linearly to all of it
+SPAM_SHARE = 0.05  # Share of messages carrying an invite link, which auto-mod deletes and warns for
+DRAIN_TIMEOUT = 30.0  # Seconds to wait for handlers to finish once the stream has been sent
+CHATTER = ('gm', 'anyone on patrol tonight?', 'when is the next session?', 'lol', 'thanks for the help earlier',
+           'what department should I apply for', 'brb', 'is the server up?')
+
+# Event kinds
+KIND_JOIN = 'join'
+KIND_MESSAGE = 'message'
+KIND_VOTE = 'vote'
+KINDS = (KIND_JOIN, KIND_MESSAGE, KIND_VOTE)
+
+def arrivals(rng: random.Random, per_minute: float, duration: float, ramp: bool) -> List[float]:
+    """Poisson arrival offsets at per_minute, thinned to a linear ramp when asked"""
+    times = []
+    rate = per_minute / 60
+    t = 0.0
+    while rate > 0:
+        t += rng.expovariate(rate)
+        if t >= duration:
+            break
+        if ramp and rng.random() > RAMP_FLOOR + (1 - RAMP_FLOOR) * t / duration:
+            continue
+        times.append(t)
+    return times
+
+def synthesize(joins: float, messages: float, votes: float, duration: float, members: int, ramp: bool,
+               young_share: float, seed: int = 0) -> tuple:
+    """(header, events) for a stream of the given per-minute rates; events are gateway dispatches in time order"""
+    rng = random.Random(seed)
+    events = []
+    for n, at in enumerate(arrivals(rng, joins, duration, ramp)):
+        age = rng.uniform(0, 0.9) if rng.random() < young_share else rng.uniform(30, 2000)  # Days
+        events.append({'at': at, 't': 'GUILD_MEMBER_ADD', 'd': member_join(n, age)})
+
+    for n, at in enumerate(arrivals(rng, messages, duration, ramp)):
+        content = f'join my server discord.gg/raid{n}' if rng.random() < SPAM_SHARE else rng.choice(CHATTER)
+        data = message_create(980000000000000000 + n, MEMBER_BASE_ID + rng.randrange(members), GENERAL_CHANNEL_ID,
+                              content, [COMMUNITY_MEMBER_ROLE_ID])
+        events.append({'at': at, 't': 'MESSAGE_CREATE', 'd': data})
+
+    for at in arrivals(rng, votes, duration, ramp):
+        # The suggestion messages don't exist yet; the placeholder ID is resolved once they are posted
+        custom_id = f'suggestion:{rng.randrange(SUGGESTIONS)}:{rng.randrange(2)}'
+        data = button_press(0, custom_id, MEMBER_BASE_ID + rng.randrange(members), SUGGESTION_CHANNEL_ID,
+                            [COMMUNITY_MEMBER_ROLE_ID])
+        events.append({'at': at, 't': 'INTERACTION_CREATE', 'd': data})
+
+    events.sort(key=lambda event: event['at'])
+    header = {'version': STREAM_VERSION, 'members': members, 'suggestions': SUGGESTIONS, 'duration': duration,
+              'rates': {KIND_JOIN: joins, KIND_MESSAGE: messages, KIND_VOTE: votes}, 'ramp': ramp}
+    return header, events
+
+def save_stream(path: str, header: dict, events: List[dict]) -> None:
+    """Write the stream as JSONL: the header, then one event per line"""
+    with open(path, 'w') as f:
+        f.write(json.dumps(header) + '\n')
+        for event in events:
+            f.write(json.dumps(event) + '\n')
+
+def load_stream(path: str) -> tuple:
+    with open(path) as f:
+        header = json.loads(f.readline())
+        if header.get('version') != STREAM_VERSION:
+            raise ValueError(f'{path} is stream version {header.get("version")}, expected {STREAM_VERSION}')
+        return header, [json.loads(line) for line in f if line.strip()]
+
+def event_kind(event: dict) -> str:
+    if event['t'] == 'GUILD_MEMBER_ADD':
+        return KIND_JOIN
+    if event['t'] == 'MESSAGE_CREATE':
+        return KIND_MESSAGE
+    return KIND_VOTE
+
+def rss_mib() -> float:
+    """Resident memory of this process; falls back to the peak where /proc isn't available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentile(values: list, share: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+class Replay:
+    """Feeds events to the connection state's parsers on schedule and times their handlers.
+
+    The gateway calls ConnectionState parsers from its reader task; here the
+    replayer does. Parsers start each handler (client event listeners, app
+    commands, view callbacks) as a task before returning, so a task factory
+    counts the tasks created during each parser call as that event's handlers.
+    The event is handled when the last of them finishes.
+    """
+
+    def __init__(self, bot, interval: float):
+        self.bot = bot
+        self.interval = interval
+        self.parsers = bot._connection.parsers
+        self.suggestions: List[tuple] = []  # (message ID, [upvote custom ID, downvote custom ID])
+        self.current: Optional[list] = None  # [kind, scheduled time, unfinished handlers] of the event being parsed
+        self.dispatched = 0
+        self.behind = 0  # Events due but not dispatched yet
+        self.running = 0  # Handler tasks created and not finished, started or not
+        self.handled: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self.lags: Dict[str, list] = {kind: [] for kind in KINDS}  # Lags of events handled in the current interval
+        self.all_lags: Dict[str, list] = {kind: [] for kind in KINDS}
+        self.dispatch_lag = 0.0  # Worst lateness of a dispatch in the current interval
+        self.timeline: List[dict] = []
+        self._task_factory = None
+
+    def instrument(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._task_factory = loop.get_task_factory()
+
+        def task_factory(loop, coro, **kwargs):
+            if self._task_factory is not None:
+                task = self._task_factory(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            if self.current is not None:
+                self.current[2] += 1
+                self.running += 1
+                task.add_done_callback(functools.partial(self.handler_done, self.current))
+            return task
+
+        loop.set_task_factory(task_factory)
+
+    def uninstrument(self) -> None:
+        asyncio.get_running_loop().set_task_factory(self._task_factory)
+
+    def handler_done(self, event: list, task: asyncio.Task) -> None:
+        self.running -= 1
+        event[2] -= 1
+        if event[2] == 0:
+            self.handled_event(event)
+
+    def handled_event(self, event: list) -> None:
+        kind, scheduled, _ = event
+        lag = time.perf_counter() - scheduled
+        self.handled[kind] += 1
+        self.lags[kind].append(lag)
+        self.all_lags[kind].append(lag)
+
+    async def post_suggestions(self, count: int) -> None:
+        """Post the suggestions the stream's button presses refer to, through /suggest"""
+        from bot.cogs.suggestions import SuggestionView
+
+        for n in range(count):
+            await self.bot.tree._call(slash_command(self.bot, 'suggest', MEMBER_BASE_ID + n,
+                                                    {'suggestion': f'Benchmark suggestion {n}'}, [COMMUNITY_MEMBER_ROLE_ID]))
+        views = self.bot._connection._view_store._synced_message_views
+        for message_id, view in sorted(views.items()):
+            if isinstance(view, SuggestionView):
+                self.suggestions.append((message_id, [item.custom_id for item in view.children]))
+        if len(self.suggestions) < count:
+            raise RuntimeError(f'Only {len(self.suggestions)} of {count} suggestions were posted')
+
+    def resolve(self, data: dict) -> dict:
+        """Point a button press at the real message and custom ID of the suggestion it names"""
+        _, number, button = data['data']['custom_id'].split(':')
+        message_id, custom_ids = self.suggestions[int(number)]
+        data = {**data, 'data': {**data['data'], 'custom_id': custom_ids[int(button)]}}
+        data['message'] = {**data['message'], 'id': str(message_id)}
+        return data
+
+    def dispatch(self, event: dict, scheduled: float) -> None:
+        kind = event_kind(event)
+        data = self.resolve(event['d']) if kind == KIND_VOTE else event['d']
+        self.current = current = [kind, scheduled, 0]
+        try:
+            self.parsers[event['t']](data)
+        except Exception as e:
+            logging.getLogger(__name__).error(f'Parser for {event["t"]} failed: {e}')
+        finally:
+            self.current = None
+        if current[2] == 0:
+            self.handled_event(current)  # Nothing listens for it
+        self.dispatched += 1
+
+    async def feed(self, events: List[dict], started: float) -> None:
+        offsets = [event['at'] for event in events]
+        for number, event in enumerate(events):
+            scheduled = started + event['at']
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)  # Behind schedule; still let the handlers run, as the gateway reader would
+            now = time.perf_counter()
+            self.dispatch_lag = max(self.dispatch_lag, now - scheduled)
+            self.behind = bisect_right(offsets, now - started) - number - 1
+            self.dispatch(event, scheduled)
+        self.behind = 0
+
+    async def sample(self, started: float) -> None:
+        """Add a timeline row every interval"""
+        last_dispatched = 0
+        expected = started + self.interval
+        while True:
+            await asyncio.sleep(max(0.0, expected - time.perf_counter()))
+            now = time.perf_counter()
+            row = {'t': round(now - started, 2), 'offered_per_s': (self.dispatched - last_dispatched) / self.interval,
+                   'behind': self.behind, 'dispatch_lag_ms': round(self.dispatch_lag * 1000, 1),
+                   'running': self.running, 'tasks': len(asyncio.all_tasks()),
+                   'loop_lag_ms': round(max(0.0, now - expected) * 1000, 1), 'rss_mib': round(rss_mib(), 1)}
+            for kind in KINDS:
+                lags = self.lags[kind]
+                row[kind] = {'handled': len(lags),
+                             'p50_ms': round(percentile(lags, 0.5) * 1000, 1) if lags else None,
+                             'p99_ms': round(percentile(lags, 0.99) * 1000, 1) if lags else None}
+                self.lags[kind] = []
+            self.timeline.append(row)
+            print_row(row)
+            last_dispatched = self.dispatched
+            self.dispatch_lag = 0.0
+            expected += self.interval
+
+    async def run(self, events: List[dict]) -> None:
+        started = time.perf_counter()
+        sampler = asyncio.create_task(self.sample(started))
+        try:
+            await self.feed(events, started)
+            deadline = time.perf_counter() + DRAIN_TIMEOUT
+            while self.running and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(max(0.0, started + (len(self.timeline) + 1) * self.interval - time.perf_counter()))  # Last row
+        finally:
+            sampler.cancel()
+
+def print_header() -> None:
+    print(f'{"t":>6} {"ev/s":>6} {"behind":>6} {"run":>5} {"tasks":>6} {"loop ms":>8} {"RSS MiB":>8}  '
+          + '  '.join(f'{kind + " p50/p99 ms":>22}' for kind in KINDS))
+
+def print_row(row: dict) -> None:
+    lags = []
+    for kind in KINDS:
+        stats = row[kind]
+        text = f'{stats["p50_ms"]:.0f}/{stats["p99_ms"]:.0f} ({stats["handled"]})' if stats['handled'] else '-'
+        lags.append(f'{text:>22}')
+    print(f'{row["t"]:>6.1f} {row["offered_per_s"]:>6.0f} {row["behind"]:>6} {row["running"]:>5} {row["tasks"]:>6} '
+          f'{row["loop_lag_ms"]:>8.1f} {row["rss_mib"]:>8.1f}  ' + '  '.join(lags))
+
+def summarize(replay: Replay, events: List[dict], lag_budget: float) -> dict:
+    offered = dict.fromkeys(KINDS, 0)
+    for event in events:
+        offered[event_kind(event)] += 1
+    kinds = {}
+    for kind in KINDS:
+        lags = replay.all_lags[kind]
+        kinds[kind] = {'offered': offered[kind], 'handled': replay.handled[kind],
+                       'p50_ms': round(percentile(lags, 0.5) * 1000, 1) if lags else None,
+                       'p99_ms': round(percentile(lags, 0.99) * 1000, 1) if lags else None,
+                       'max_ms': round(max(lags) * 1000, 1) if lags else None}
+
+    saturated = None  # First interval from which p99 lag of some kind stayed over budget
+    for row in reversed(replay.timeline):
+        if not any((row[kind]['p99_ms'] or 0) > lag_budget * 1000 for kind in KINDS):
+            break
+        saturated = {'t': row['t'], 'offered_per_s': row['offered_per_s']}
+    return {'kinds': kinds, 'saturated_at': saturated,
+            'peak_tasks': max((row['tasks'] for row in replay.timeline), default=0),
+            'peak_rss_mib': max((row['rss_mib'] for row in replay.timeline), default=0)}
+
+async def run(args, header: dict, events: List[dict]) -> tuple:
+    from bot.utils.loop_monitor import LOOP_MONITOR
+
+    api = FakeDiscordAPI(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit=args.rate_limit,
+                         bucket_limit=args.bucket_limit)
+    await api.start()
+    bot = await start_bot(api, members=header['members'], cogs=COGS + ['bot.cogs.automod'])
+    replay = Replay(bot, args.interval)
+    try:
+        await replay.post_suggestions(header['suggestions'])
+        api.reset_counts()
+        replay.instrument()
+        LOOP_MONITOR.start()
+        print_header()
+        await replay.run(events)
+        summary = summarize(replay, events, args.lag_budget)
+        summary['requests'] = sum(api.requests.values())
+        summary['rate_limited'] = api.rate_limited
+        summary['loop'] = LOOP_MONITOR.snapshot()['lag']
+        summary['loop_stalls'] = len(LOOP_MONITOR.stalls)
+        return replay.timeline, summary
+    finally:
+        LOOP_MONITOR.stop()
+        replay.uninstrument()
+        await close_bot(bot)
+        await api.stop()
+
+def print_summary(summary: dict, lag_budget: float) -> None:
+    print()
+    print(f'{"kind":>8} {"offered":>8} {"handled":>8} {"p50 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+    for kind, stats in summary['kinds'].items():
+        print(f'{kind:>8} {stats["offered"]:>8} {stats["handled"]:>8} {stats["p50_ms"] or 0:>9.1f} '
+              f'{stats["p99_ms"] or 0:>9.1f} {stats["max_ms"] or 0:>9.1f}')
+    print(f'REST requests: {summary["requests"]} ({summary["rate_limited"]} answered 429), '
+          f'peak tasks: {summary["peak_tasks"]}, peak RSS: {summary["peak_rss_mib"]:.1f} MiB, '
+          f'loop lag p99: {(summary["loop"]["p99"] or 0) * 1000:.1f} ms, stalls: {summary["loop_stalls"]}')
+    saturated = summary['saturated_at']
+    if saturated:
+        print(f'Saturated at t={saturated["t"]}s: p99 lag stayed over {lag_budget}s from about '
+              f'{saturated["offered_per_s"]:.0f} events/s')
+    else:
+        print(f'Kept p99 lag under {lag_budget}s for the whole run')
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay gateway events into the bot against a local fake Discord API')
+    parser.add_argument('--joins-per-min', type=float, default=1000, help='Member joins (a raid is 1000 a minute)')
+    parser.add_argument('--messages-per-min', type=float, default=600)
+    parser.add_argument('--votes-per-min', type=float, default=300, help='Suggestion button presses')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds of events to synthesise')
+    parser.add_argument('--ramp', action='store_true', help=f'Rise from {RAMP_FLOOR * 100:.0f}%% of the rates to all of them')
+    parser.add_argument('--young-share', type=float, default=0.2, help='Share of joining accounts under a day old')
+    parser.add_argument('--members', type=int, default=1000, help='Members in the synthetic guild')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help='Write the synthesised stream to this JSONL file')
+    parser.add_argument('--replay', help='Replay a stream saved with --save instead of synthesising one')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Fake API response time')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='Random extra response time, up to this much')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Share of requests answered with a 429')
+    parser.add_argument('--bucket-limit', type=int, default=50, help='Requests per route per second before real 429s')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds per timeline row')
+    parser.add_argument('--lag-budget', type=float, default=1.0, help='p99 handling lag (s) counted as saturated')
+    parser.add_argument('--output', help='Write the timeline and summary to this JSON file')
+    args = parser.parse_args()
+
+    if args.replay:
+        header, events = load_stream(args.replay)
+    else:
+        header, events = synthesize(args.joins_per_min, args.messages_per_min, args.votes_per_min, args.duration,
+                                    args.members, args.ramp, args.young_share, args.seed)
+        if args.save:
+            save_stream(args.save, header, events)
+            print(f'{len(events)} events written to {args.save}')
+    output = args.output and os.path.abspath(args.output)  # Resolve before moving to the scratch directory
+
+    logging.basicConfig(level=logging.CRITICAL)  # Every join, deletion and 429 is logged otherwise
+    directory = isolate_data_dir()
+    try:
+        timeline, summary = asyncio.run(run(args, header, events))
+    finally:
+        os.chdir(fake_discord.REPO_ROOT)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print_summary(summary, args.lag_budget)
+    if output:
+        settings = {key: value for key, value in vars(args).items() if key != 'output'}
+        with open(output, 'w') as f:
+            json.dump({'created': time.time(), 'stream': header, 'settings': settings, 'summary': summary,
+                       'timeline': timeline}, f, indent=2)
+        print(f'Results written to {output}')
+
+if __name__ == '__main__':
+    main()
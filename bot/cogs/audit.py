@@ -0,0 +1,70 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import logging
+import time
+from typing import Optional
+from bot.utils.permissions import has_moderator_role
+from bot.utils.audit_log import AUDIT_LOG
+from bot.utils.command_logger import log_command_usage
+
+logger = logging.getLogger(__name__)
+
+AUDIT_MAX_DAYS = 365
+AUDIT_ENTRIES_SHOWN = 25
+
+class AuditCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    def format_entry(self, entry: dict) -> str:
+        line = f"<t:{int(entry['ts'])}:f> **{entry['kind']}** `{entry['name']}`"
+        if entry.get('user_id') is not None:
+            line += f" by <@{entry['user_id']}>"
+        if entry.get('target_id') is not None:
+            line += f" on <@{entry['target_id']}>"
+        if entry.get('details'):
+            line += f" - {entry['details'][:120]}"
+        return line
+
+    @app_commands.command(name='audit', description='Search the audit log for what a user did or had done to them')
+    @app_commands.describe(
+        user='User to search for, as actor or target',
+        days=f'How many days back to search (1-{AUDIT_MAX_DAYS}, default 7)',
+        kind='Only show this kind of record (command, action, case)'
+    )
+    async def audit(self, interaction: discord.Interaction, user: discord.User, days: int = 7, kind: Optional[str] = None):
+        if not has_moderator_role(interaction.user):
+            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
+            return
+
+        if days < 1 or days > AUDIT_MAX_DAYS:
+            await interaction.response.send_message(f'Days must be between 1 and {AUDIT_MAX_DAYS}.', ephemeral=True)
+            return
+
+        try:
+            entries = AUDIT_LOG.search(user_id=user.id, since=time.time() - days * 86400,
+                                       kind=kind.lower() if kind else None, limit=AUDIT_ENTRIES_SHOWN)
+            lines = []
+            length = 0
+            for entry in entries:
+                line = self.format_entry(entry)
+                length += len(line) + 1
+                if length > 4000:
+                    break
+                lines.append(line)
+
+            embed = discord.Embed(
+                title=f"Audit Log: {user}",
+                description="\n".join(lines) or f"No records in the last {days} days.",
+                color=0x8AA0AE
+            )
+            embed.set_footer(text=f"Newest first, up to {AUDIT_ENTRIES_SHOWN} records | User ID: {user.id}")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await log_command_usage(self.bot, interaction, 'audit', f'User: {user} | Days: {days} | Kind: {kind}')
+        except Exception as e:
+            logger.error(f'Error searching audit log: {e}')
+            await interaction.response.send_message('An error occurred while searching the audit log.', ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(AuditCog(bot))
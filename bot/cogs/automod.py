@@ -0,0 +1,77 @@
+import discord
+from discord.ext import commands
+import logging
+import time
+from bot.utils.automod import AutoModFilter
+from bot.utils.permissions import has_moderator_role
+from bot.utils.case_tracker import get_case_tracker, maybe_await
+from bot.utils.point_ledger import get_point_ledger
+
+logger = logging.getLogger(__name__)
+
+AUTOMOD_WARN_POINTS = 2  # Same as a manual /warn
+AUTOMOD_WARN_COOLDOWN = 60.0  # Seconds before the same user can be warned again; messages are still deleted
+
+class AutoModCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.case_tracker = get_case_tracker(bot)
+        self.point_ledger = get_point_ledger(bot)
+        self.filter = AutoModFilter()
+        self.last_warned = {}  # user_id -> monotonic time of the last auto-mod warning
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Delete messages that break an auto-mod rule and warn their author"""
+        if message.author.bot or message.guild is None:
+            return
+
+        mentions = len(message.raw_mentions) + len(message.raw_role_mentions) + message.mention_everyone
+        now = time.monotonic()
+        violation = self.filter.check(message.author.id, message.content, mentions, now)
+        if violation is None or has_moderator_role(message.author):
+            return
+
+        try:
+            await message.delete()
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            logger.error(f'Auto-mod could not delete message {message.id}: {e}')
+
+        last = self.last_warned.get(message.author.id)
+        if last is not None and now - last < AUTOMOD_WARN_COOLDOWN:
+            return
+        self.last_warned[message.author.id] = now
+        await self.warn(message, violation)
+
+    async def warn(self, message: discord.Message, violation: str):
+        """Give points and record a case for an auto-mod violation"""
+        member = message.author
+        reason = f'Auto-mod: {violation}'
+        moderation = self.bot.get_cog('ModerationCog')  # Same points and auto-ban as /warn
+        if moderation is not None:
+            total_points = moderation.add_points(member.id, AUTOMOD_WARN_POINTS)
+        else:
+            logger.warning('Moderation cog not loaded, auto-mod warnings cannot auto-ban')
+            total_points = self.point_ledger.add_points(member.id, AUTOMOD_WARN_POINTS)
+        case_number = self.case_tracker.get_next_case_number()
+        await maybe_await(self.case_tracker.save_case(case_number, 'warn', member.id, self.bot.user.id, reason))
+        logger.info(f'Auto-mod warned {member} ({member.id}) for {violation} - Case #{case_number}')
+
+        # DM before a possible ban, which would leave no shared server to message from
+        try:
+            await member.send(f"You have been **warned** for: {reason}")
+        except discord.HTTPException:
+            pass
+
+        notice = f"⚠️ {member.mention} has been warned for {violation}. They now have {total_points}/12 points."
+        if moderation is not None:
+            notice += await moderation.enforce_ban_threshold(member, total_points)
+        try:
+            await message.channel.send(notice, delete_after=10)
+        except discord.HTTPException as e:
+            logger.error(f'Auto-mod could not send warning in {message.channel}: {e}')
+
+async def setup(bot):
+    await bot.add_cog(AutoModCog(bot))
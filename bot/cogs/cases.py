@@ -0,0 +1,199 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from bot.utils.permissions import has_moderator_role
+from bot.utils.case_tracker import get_case_tracker, fetch_case_page, maybe_await
+from bot.utils.command_logger import log_command_usage
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 5
+REASON_PREVIEW_LENGTH = 200
+MODSTATS_DEFAULT_DAYS = 30
+MODSTATS_TOP_MODERATORS = 10
+
+def parse_date_range(since: Optional[str], until: Optional[str]) -> tuple:
+    """Parse YYYY-MM-DD bounds into (start, end) datetimes with an inclusive end date.
+    Raises ValueError on a bad date."""
+    start = datetime.strptime(since, '%Y-%m-%d') if since else None
+    end = datetime.strptime(until, '%Y-%m-%d') + timedelta(days=1) if until else None
+    return start, end
+
+def build_case_embed(cases: list, page_number: int, has_next: bool) -> discord.Embed:
+    """Render one page of cases"""
+    embed = discord.Embed(title="Moderation Cases", color=0x8AA0AE)
+
+    if not cases:
+        embed.description = "No cases match these filters."
+
+    for case_data in cases:
+        reason = case_data.get('reason', '')
+        if len(reason) > REASON_PREVIEW_LENGTH:
+            reason = reason[:REASON_PREVIEW_LENGTH] + '...'
+        embed.add_field(
+            name=f"Case #{case_data['case_number']} - {case_data['action']}",
+            value=(
+                f"**Target:** <@{case_data['target_id']}>\n"
+                f"**Moderator:** <@{case_data['moderator_id']}>\n"
+                f"**Reason:** {reason}\n"
+                f"**Date:** {case_data['created_at']}"
+            ),
+            inline=False
+        )
+
+    embed.set_footer(text=f"Page {page_number}" + ("" if has_next else " (last page)"))
+    return embed
+
+class CaseBrowserView(discord.ui.View):
+    """Previous/next buttons over a case query, fetching one page per click"""
+
+    def __init__(self, store, author_id: int, filters: dict, first_page: list, next_cursor: Optional[int]):
+        super().__init__(timeout=300)
+        self.store = store
+        self.author_id = author_id
+        self.filters = filters
+        self.cases = first_page
+        self.next_cursor = next_cursor
+        # Cursor each visited page started from; the last entry is the current page
+        self.page_cursors = [None]
+        self.update_buttons()
+
+    @property
+    def page_number(self) -> int:
+        return len(self.page_cursors)
+
+    def build_embed(self) -> discord.Embed:
+        return build_case_embed(self.cases, self.page_number, self.next_cursor is not None)
+
+    def update_buttons(self):
+        self.previous_page.disabled = len(self.page_cursors) <= 1
+        self.next_page.disabled = self.next_cursor is None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the person who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def show_page(self, interaction: discord.Interaction, cursor: Optional[int]):
+        self.cases, self.next_cursor = await fetch_case_page(self.store, PAGE_SIZE, cursor, **self.filters)
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_cursors.pop()
+        await self.show_page(interaction, self.page_cursors[-1])
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        cursor = self.next_cursor
+        self.page_cursors.append(cursor)
+        await self.show_page(interaction, cursor)
+
+class CasesCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.case_tracker = get_case_tracker(bot)
+
+    @app_commands.command(name='cases', description='Browse moderation cases')
+    @app_commands.describe(
+        member='Only show cases against this user',
+        moderator='Only show cases issued by this moderator',
+        action='Only show this action (warn, kick, ban, softban, mute, infraction)',
+        since='Only show cases on or after this date (YYYY-MM-DD)',
+        until='Only show cases on or before this date (YYYY-MM-DD)'
+    )
+    async def cases(self, interaction: discord.Interaction, member: Optional[discord.User] = None,
+                    moderator: Optional[discord.User] = None, action: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None):
+        if not has_moderator_role(interaction.user):
+            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
+            return
+
+        try:
+            start, end = parse_date_range(since, until)
+        except ValueError:
+            await interaction.response.send_message('Dates must be in YYYY-MM-DD format.', ephemeral=True)
+            return
+
+        filters = {
+            'target_id': member.id if member else None,
+            'moderator_id': moderator.id if moderator else None,
+            'action': action.lower() if action else None,
+            'since': start,
+            'until': end
+        }
+
+        try:
+            first_page, next_cursor = await fetch_case_page(self.case_tracker, PAGE_SIZE, None, **filters)
+            view = CaseBrowserView(self.case_tracker, interaction.user.id, filters, first_page, next_cursor)
+            await interaction.response.send_message(embed=view.build_embed(), view=view, ephemeral=True)
+            await log_command_usage(self.bot, interaction, 'cases', f'Member: {member} | Moderator: {moderator} | Action: {action} | Since: {since} | Until: {until}')
+        except Exception as e:
+            logger.error(f'Error browsing cases: {e}')
+            await interaction.response.send_message('An error occurred while fetching cases.', ephemeral=True)
+
+    @app_commands.command(name='modstats', description='Show moderation statistics for a date range')
+    @app_commands.describe(
+        moderator='Only count cases issued by this moderator',
+        action='Only count this action (warn, kick, ban, softban, mute, infraction)',
+        since=f'Count cases on or after this date (YYYY-MM-DD, default: last {MODSTATS_DEFAULT_DAYS} days)',
+        until='Count cases on or before this date (YYYY-MM-DD, default: today)'
+    )
+    async def modstats(self, interaction: discord.Interaction, moderator: Optional[discord.User] = None,
+                       action: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None):
+        if not has_moderator_role(interaction.user):
+            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
+            return
+
+        try:
+            start, end = parse_date_range(since, until)
+        except ValueError:
+            await interaction.response.send_message('Dates must be in YYYY-MM-DD format.', ephemeral=True)
+            return
+
+        if start is None:
+            start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=MODSTATS_DEFAULT_DAYS - 1)
+
+        try:
+            stats = await maybe_await(self.case_tracker.get_case_stats(
+                since=start,
+                until=end,
+                moderator_id=moderator.id if moderator else None,
+                action=action.lower() if action else None
+            ))
+
+            period = f"{start.strftime('%Y-%m-%d') if start else 'the beginning'} to {until or 'today'}"
+            embed = discord.Embed(
+                title="Moderation Statistics",
+                description=f"**{stats['total']}** cases from {period}" + (f" by {moderator.mention}" if moderator else ""),
+                color=0x8AA0AE
+            )
+
+            if stats['by_action']:
+                embed.add_field(
+                    name="By Action",
+                    value="\n".join(f"**{name}:** {count}" for name, count in sorted(stats['by_action'].items(), key=lambda item: -item[1])),
+                    inline=True
+                )
+
+            if stats['by_moderator'] and not moderator:
+                top = sorted(stats['by_moderator'].items(), key=lambda item: -item[1])[:MODSTATS_TOP_MODERATORS]
+                embed.add_field(
+                    name="Top Moderators",
+                    value="\n".join(f"<@{moderator_id}>: {count}" for moderator_id, count in top),
+                    inline=True
+                )
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await log_command_usage(self.bot, interaction, 'modstats', f'Moderator: {moderator} | Action: {action} | Period: {period}')
+        except Exception as e:
+            logger.error(f'Error getting moderation statistics: {e}')
+            await interaction.response.send_message('An error occurred while fetching statistics.', ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(CasesCog(bot))
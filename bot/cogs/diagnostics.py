@@ -0,0 +1,62 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import logging
+from bot.utils.permissions import has_moderator_role
+from bot.utils.loop_monitor import LOOP_MONITOR
+from bot.utils.command_logger import get_log_sink, log_command_usage
+
+logger = logging.getLogger(__name__)
+
+DIAGNOSTICS_STALLS_SHOWN = 5  # Most recent stalls listed in /diagnostics
+DIAGNOSTICS_STACK_FRAMES = 3  # Innermost frames shown per stall
+
+class DiagnosticsCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    def format_ms(self, seconds) -> str:
+        return 'n/a' if seconds is None else f'{seconds * 1000:.1f} ms'
+
+    @app_commands.command(name='diagnostics', description='Show event loop lag and recent blocking callbacks')
+    async def diagnostics(self, interaction: discord.Interaction):
+        if not has_moderator_role(interaction.user):
+            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
+            return
+
+        snapshot = LOOP_MONITOR.snapshot()
+        lag = snapshot['lag']
+        embed = discord.Embed(
+            title="Bot Diagnostics",
+            description=f"Gateway latency: **{self.format_ms(self.bot.latency)}**",
+            color=0x8AA0AE
+        )
+        embed.add_field(
+            name="Event Loop Lag",
+            value=f"**Last:** {self.format_ms(lag['last'])}\n**p50:** {self.format_ms(lag['p50'])}\n"
+                  f"**p99:** {self.format_ms(lag['p99'])}\n**Max:** {self.format_ms(lag['max'])}",
+            inline=False
+        )
+
+        for stall in snapshot['stalls'][:DIAGNOSTICS_STALLS_SHOWN]:
+            frames = '\n'.join(line.strip().splitlines()[0] for line in stall['stack'][-DIAGNOSTICS_STACK_FRAMES:])
+            embed.add_field(
+                name=f"{stall['duration']}s in {stall['coroutine']} at {stall['at']}",
+                value=f"```\n{frames[-950:] or 'no stack'}\n```",
+                inline=False
+            )
+        if not snapshot['stalls']:
+            embed.add_field(name="Blocking Callbacks", value=f"None over {snapshot['threshold']}s recorded.", inline=False)
+
+        sink = get_log_sink(self.bot)
+        embed.add_field(
+            name="Command Log Queue",
+            value=f"**Queued:** {sink.depth}\n**Sent:** {sink.sent}\n**Dropped:** {sink.dropped}",
+            inline=False
+        )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await log_command_usage(self.bot, interaction, 'diagnostics')
+
+async def setup(bot):
+    await bot.add_cog(DiagnosticsCog(bot))
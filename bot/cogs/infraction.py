@@ -3,16 +3,18 @@ from discord.ext import commands
 from discord import app_commands
 import logging
 from bot.utils.command_logger import log_command_usage
-from bot.utils.case_tracker import CaseTracker
+from bot.utils.case_tracker import get_case_tracker, maybe_await
+from bot.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 class InfractionCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.case_tracker = CaseTracker()
+        self.case_tracker = get_case_tracker(bot)
         self.infraction_role_id = 1393737607653097614
 
+    @traced()
     def has_infraction_permission(self, user: discord.Member) -> bool:
         """Check if user has the infraction role"""
         return any(role.id == self.infraction_role_id for role in user.roles)
@@ -81,7 +83,7 @@ class InfractionCog(commands.Cog):
             await thread.send(f"{staff_member.mention} Appeal Here")
             
             # Save case
-            self.case_tracker.save_case(case_number, 'infraction', staff_member.id, interaction.user.id, f'{punishment} - {reason}')
+            await maybe_await(self.case_tracker.save_case(case_number, 'infraction', staff_member.id, interaction.user.id, f'{punishment} - {reason}'))
             
             # Confirm to the user
             await interaction.response.send_message(f'✅ Infraction issued to {staff_member.mention}. Appeal thread created.', ephemeral=True)
@@ -8,13 +8,15 @@ import re
 
 logger = logging.getLogger(__name__)
 
+PING_PATTERN = re.compile(r'@everyone|@here', re.IGNORECASE)
+
 class MessagingCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     def contains_ping(self, message: str):
         # Check if the message contains @everyone or @here
-        return re.search(r'@everyone|@here', message, re.IGNORECASE) is not None
+        return PING_PATTERN.search(message) is not None
 
     @app_commands.command(name='say', description='Send a message as the bot')
     @app_commands.describe(message='The message to send')
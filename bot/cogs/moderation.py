@@ -2,8 +2,15 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
+import re
+from typing import Optional
 from bot.utils.permissions import has_moderator_role
-from bot.utils.case_tracker import CaseTracker
+from bot.utils.case_tracker import get_case_tracker, maybe_await
+from bot.utils.point_ledger import get_point_ledger
+from bot.utils.bulk_actions import run_bounded, ProgressMessage
+from bot.utils.purge_job import PurgeJob
+from bot.utils.lockdown import LockdownStore
+from bot.utils.scheduler import get_scheduler, JobRetry, JOB_UNBAN, JOB_UNLOCK, JOB_REMOVE_ROLE
 from bot.utils.command_logger import log_command_usage
 import datetime
 
@@ -13,16 +20,67 @@ LIMITED_ROLE_ID = 1393737607653097614
 LOCK_ROLE_ID = 1393754910088101958  # Role allowed to use /lock command
 COMMUNITY_MEMBER_ROLE_ID = 1393737552502194238  # Community member role to lock/unlock
 
+MASS_ACTION_MAX_TARGETS = 200  # Users one /massban or /masskick can act on (also Discord's bulk ban limit)
+USER_ID_PATTERN = re.compile(r'\d{15,20}')  # Raw IDs and the digits inside mentions
+PURGE_MAX_MESSAGES = 50_000  # Most messages one /purge deletes
+TEMP_MAX_MINUTES = 525_600  # Longest timed punishment (a year)
+
 class ModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.case_tracker = CaseTracker()
+        self.case_tracker = get_case_tracker(bot)
         self.checkmark_emoji = "<:checkmark:1384993844671545506>"
         self.fallback_checkmark = "✅"
-        self.user_points = {}
+        self.point_ledger = get_point_ledger(bot)
+        self.purge_jobs = {}  # channel_id -> running PurgeJob
+        self.lockdowns = LockdownStore()
+        self.lockdown_busy = set()  # guild_ids with a /lockdown or /unlockdown in progress
+        self.scheduler = get_scheduler(bot)
+        self.scheduler.register(JOB_UNBAN, self.scheduled_unban)
+        self.scheduler.register(JOB_UNLOCK, self.scheduled_unlock)
+        self.scheduler.register(JOB_REMOVE_ROLE, self.scheduled_remove_role)
         self.warn_points = 2
         self.ban_threshold = 12
 
+    async def cog_load(self):
+        # Jobs missed while the bot was offline run once it has logged in and cached its guilds
+        self.scheduler.start(ready=self.bot.wait_until_ready)
+
+    async def scheduled_unban(self, job):
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None:
+            raise JobRetry(f'guild {job.guild_id} not available')
+        try:
+            await guild.unban(discord.Object(id=job.target_id), reason="Temporary ban expired")
+        except discord.NotFound:
+            pass  # Already unbanned
+
+    async def scheduled_unlock(self, job):
+        channel = self.bot.get_channel(job.target_id)
+        if channel is None:
+            raise JobRetry(f'channel {job.target_id} not available')
+        role = channel.guild.get_role(COMMUNITY_MEMBER_ROLE_ID)
+        if role is None:
+            return  # The role is gone, nothing to unlock for
+        overwrite = channel.overwrites_for(role)
+        overwrite.send_messages = None
+        await channel.set_permissions(role, overwrite=overwrite, reason="Temporary lock expired")
+
+    async def scheduled_remove_role(self, job):
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None:
+            raise JobRetry(f'guild {job.guild_id} not available')
+        role = guild.get_role(job.extra_id)
+        if role is None:
+            return  # The role is gone
+        member = guild.get_member(job.target_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(job.target_id)
+            except discord.NotFound:
+                return  # Left the server, the role went with them
+        await member.remove_roles(role, reason="Timed role expired")
+
     def get_checkmark_emoji(self):
         try:
             return self.checkmark_emoji
@@ -30,16 +88,23 @@ class ModerationCog(commands.Cog):
             return self.fallback_checkmark
 
     def add_points(self, user_id: int, points: int) -> int:
-        current = self.user_points.get(user_id, 0)
-        new_total = current + points
-        self.user_points[user_id] = new_total
-        return new_total
+        return self.point_ledger.add_points(user_id, points)
 
     def remove_points(self, user_id: int, points: int) -> int:
-        current = self.user_points.get(user_id, 0)
-        new_total = max(current - points, 0)
-        self.user_points[user_id] = new_total
-        return new_total
+        return self.point_ledger.remove_points(user_id, points)
+
+    async def enforce_ban_threshold(self, member: discord.Member, total_points: int) -> str:
+        """Ban a member whose points reached the threshold; returns a line for the warning message ('' below it).
+        Used by /warn and by auto-mod warnings"""
+        if total_points < self.ban_threshold:
+            return ''
+        try:
+            await member.ban(reason=f"Reached {total_points} points (auto-ban)")
+            return f"\n🚨 {member.mention} has reached {total_points} points and has been permanently banned."
+        except discord.Forbidden:
+            return f"\n⚠️ I do not have permission to ban {member.mention}."
+        except Exception as e:
+            return f"\n⚠️ Failed to ban {member.mention}: {e}"
 
     async def send_dm(self, member: discord.Member, action: str, reason: str):
         try:
@@ -58,6 +123,88 @@ class ModerationCog(commands.Cog):
     def can_lock(self, member: discord.Member) -> bool:
         return any(role.id == LOCK_ROLE_ID for role in member.roles)
 
+    def collect_mass_targets(self, interaction: discord.Interaction, user_ids: Optional[str], joined_within: Optional[int]) -> tuple:
+        """Users listed in user_ids plus members who joined in the last joined_within minutes.
+        Returns (targets, number of protected users skipped, number left out over the target limit)."""
+        guild = interaction.guild
+        targets = {}
+        for match in USER_ID_PATTERN.findall(user_ids or ''):
+            user_id = int(match)
+            targets[user_id] = guild.get_member(user_id) or discord.Object(id=user_id)
+
+        if joined_within:
+            cutoff = discord.utils.utcnow() - datetime.timedelta(minutes=joined_within)
+            for member in guild.members:
+                if member.joined_at and member.joined_at >= cutoff and not member.bot:
+                    targets[member.id] = member
+
+        allowed = []
+        for target in targets.values():
+            if target.id in (interaction.user.id, guild.me.id):
+                continue
+            if isinstance(target, discord.Member) and (has_moderator_role(target) or target.top_role >= guild.me.top_role):
+                continue
+            allowed.append(target)
+        return allowed[:MASS_ACTION_MAX_TARGETS], len(targets) - len(allowed), max(0, len(allowed) - MASS_ACTION_MAX_TARGETS)
+
+    async def ban_many(self, guild: discord.Guild, targets: list, reason: str, delete_days: int, progress: ProgressMessage) -> list:
+        """Ban targets, returns the IDs that were banned"""
+        delete_seconds = delete_days * 86400
+        if guild.me.guild_permissions.manage_guild:
+            # One request for the whole list instead of one per user
+            try:
+                result = await guild.bulk_ban(targets, reason=reason, delete_message_seconds=delete_seconds)
+                progress.done = len(targets)
+                progress.failed = len(result.failed)
+                return [user.id for user in result.banned]
+            except discord.HTTPException as e:
+                logger.error(f"Bulk ban failed, banning one at a time: {e}")
+
+        results = await run_bounded(
+            targets,
+            lambda target: guild.ban(target, reason=reason, delete_message_seconds=delete_seconds),
+            on_done=progress.advance
+        )
+        return [target.id for target, error in results if error is None]
+
+    async def kick_many(self, guild: discord.Guild, targets: list, reason: str, progress: ProgressMessage) -> list:
+        """Kick targets, returns the IDs that were kicked"""
+        results = await run_bounded(targets, lambda target: guild.kick(target, reason=reason), on_done=progress.advance)
+        return [target.id for target, error in results if error is None]
+
+    async def run_mass_action(self, interaction: discord.Interaction, action: str, verb: str, user_ids: Optional[str],
+                              joined_within: Optional[int], reason: str, perform) -> None:
+        """Shared flow of /massban and /masskick: collect targets, act on them while editing
+        one progress message, then save every resulting case in a single write"""
+        targets, skipped, over_limit = self.collect_mass_targets(interaction, user_ids, joined_within)
+        if not targets:
+            await interaction.response.send_message(f'No users to {action}. Moderators, yourself and members above my role are skipped.', ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        starting = f"{verb.capitalize()} {len(targets)} users..."
+        if over_limit:
+            starting += f" ({over_limit} more are over the {MASS_ACTION_MAX_TARGETS} user limit and will be left out)"
+        message = await interaction.followup.send(starting, wait=True)
+        progress = ProgressMessage(message, verb.capitalize(), len(targets))
+        done_ids = await perform(targets, progress)
+
+        cases = [(self.case_tracker.get_next_case_number(), action, user_id, interaction.user.id, reason) for user_id in done_ids]
+        if cases:
+            await maybe_await(self.case_tracker.save_cases(cases))
+
+        summary = f"{self.get_checkmark_emoji()} {verb.capitalize()} finished: {len(done_ids)}/{len(targets)} users for: {reason}"
+        if len(done_ids) < len(targets):
+            summary += f"\n⚠️ {len(targets) - len(done_ids)} failed (missing permissions, already gone or not found)."
+        if skipped:
+            summary += f"\n{skipped} protected users were skipped."
+        if over_limit:
+            summary += f"\n⚠️ {over_limit} more users were left out: one command handles at most {MASS_ACTION_MAX_TARGETS}. Run it again for the rest."
+        if cases:
+            summary += f"\nCases #{cases[0][0]}-#{cases[-1][0]} recorded."
+        await progress.edit(summary)
+        await log_command_usage(self.bot, interaction, f'mass{action}', f'Users: {len(done_ids)}/{len(targets)} | Over limit: {over_limit} | Reason: {reason}')
+
     @app_commands.command(name='warn', description='Warn a member (adds 2 points)')
     @app_commands.describe(member='Member to warn', reason='Reason for the warning')
     async def warn(self, interaction: discord.Interaction, member: discord.Member, reason: str):
@@ -74,14 +221,8 @@ class ModerationCog(commands.Cog):
         emoji = self.get_checkmark_emoji()
         msg = f"{emoji} {member.mention} has been warned for {reason}. They now have {total_points}/12 points."
 
-        if total_points >= self.ban_threshold and not self.is_limited_moderator(interaction.user):
-            try:
-                await member.ban(reason=f"Reached {total_points} points (auto-ban)")
-                msg += f"\n🚨 {member.mention} has reached {total_points} points and has been permanently banned."
-            except discord.Forbidden:
-                msg += f"\n⚠️ I do not have permission to ban {member.mention}."
-            except Exception as e:
-                msg += f"\n⚠️ Failed to ban {member.mention}: {e}"
+        if not self.is_limited_moderator(interaction.user):
+            msg += await self.enforce_ban_threshold(member, total_points)
 
         await interaction.response.send_message(msg)
 
@@ -125,7 +266,7 @@ class ModerationCog(commands.Cog):
     @app_commands.command(name='points', description='Check the points of a member')
     @app_commands.describe(member='The member to check points for')
     async def points(self, interaction: discord.Interaction, member: discord.Member):
-        points = self.user_points.get(member.id, 0)
+        points = self.point_ledger.get_points(member.id)
         emoji = self.get_checkmark_emoji()
         await interaction.response.send_message(f"{emoji} {member.mention} has {points}/12 points.", ephemeral=True)
 
@@ -155,6 +296,80 @@ class ModerationCog(commands.Cog):
         except discord.Forbidden:
             await interaction.response.send_message('Failed to ban member: insufficient permissions.', ephemeral=True)
 
+    @app_commands.command(name='tempban', description='Ban a member for a limited time')
+    @app_commands.describe(member='Member to ban', duration='Duration in minutes', reason='Reason for the ban')
+    async def tempban(self, interaction: discord.Interaction, member: discord.Member, duration: int, reason: str):
+        if not self.can_execute(interaction):
+            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
+            return
+
+        if duration < 1 or duration > TEMP_MAX_MINUTES:
+            await interaction.response.send_message(f'Duration must be between 1 and {TEMP_MAX_MINUTES} minutes.', ephemeral=True)
+            return
+
+        if not interaction.guild.me.guild_permissions.ban_members:
+            await interaction.response.send_message('I do not have permission to ban members.', ephemeral=True)
+            return
+
+        if member.top_role >= interaction.guild.me.top_role:
+            await interaction.response.send_message('I cannot ban this member due to role hierarchy.', ephemeral=True)
+            return
+
+        try:
+            await self.send_dm(member, f"banned for {duration} minutes", reason)
+            await member.ban(reason=reason)
+            self.scheduler.schedule(JOB_UNBAN, duration * 60, interaction.guild.id, member.id)
+            await interaction.response.send_message(f"{self.get_checkmark_emoji()} {member.mention} has been banned for {duration} minutes. Reason: {reason}")
+        except discord.Forbidden:
+            await interaction.response.send_message('Failed to ban member: insufficient permissions.', ephemeral=True)
+
+    @app_commands.command(name='massban', description='Ban many users at once')
+    @app_commands.describe(
+        reason='Reason for the bans',
+        user_ids='User IDs or mentions, separated by spaces or commas',
+        joined_within='Also ban members who joined in the last N minutes',
+        delete_days='Days of messages to delete (0-7)'
+    )
+    async def massban(self, interaction: discord.Interaction, reason: str, user_ids: Optional[str] = None,
+                      joined_within: Optional[int] = None, delete_days: int = 0):
+        if not self.can_execute(interaction):
+            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
+            return
+
+        if delete_days < 0 or delete_days > 7:
+            await interaction.response.send_message('Delete days must be between 0 and 7.', ephemeral=True)
+            return
+
+        if not interaction.guild.me.guild_permissions.ban_members:
+            await interaction.response.send_message('I do not have permission to ban members.', ephemeral=True)
+            return
+
+        await self.run_mass_action(
+            interaction, 'ban', 'banning', user_ids, joined_within, reason,
+            lambda targets, progress: self.ban_many(interaction.guild, targets, reason, delete_days, progress)
+        )
+
+    @app_commands.command(name='masskick', description='Kick many members at once')
+    @app_commands.describe(
+        reason='Reason for the kicks',
+        user_ids='User IDs or mentions, separated by spaces or commas',
+        joined_within='Also kick members who joined in the last N minutes'
+    )
+    async def masskick(self, interaction: discord.Interaction, reason: str, user_ids: Optional[str] = None,
+                       joined_within: Optional[int] = None):
+        if not self.can_execute(interaction):
+            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
+            return
+
+        if not interaction.guild.me.guild_permissions.kick_members:
+            await interaction.response.send_message('I do not have permission to kick members.', ephemeral=True)
+            return
+
+        await self.run_mass_action(
+            interaction, 'kick', 'kicking', user_ids, joined_within, reason,
+            lambda targets, progress: self.kick_many(interaction.guild, targets, reason, progress)
+        )
+
     @app_commands.command(name='softban', description='Softban a member')
     @app_commands.describe(member='Member to softban', reason='Reason for the softban', delete_days='Days of messages to delete (0-7)')
     async def softban(self, interaction: discord.Interaction, member: discord.Member, reason: str, delete_days: int = 1):
@@ -242,32 +457,223 @@ class ModerationCog(commands.Cog):
             logger.error(f"Failed to unlock channel: {e}")
             await interaction.response.send_message("Failed to unlock the channel.", ephemeral=True)
 
-    @app_commands.command(name="purge", description="Purge a number of messages from the current channel")
-    @app_commands.describe(amount="Number of messages to delete (1-100)")
-    async def purge(self, interaction: discord.Interaction, amount: int):
+    @app_commands.command(name="templock", description="Lock the current channel for a limited time")
+    @app_commands.describe(duration="Duration in minutes")
+    async def templock(self, interaction: discord.Interaction, duration: int):
+        if not self.can_lock(interaction.user):
+            await interaction.response.send_message("You do not have permission to lock channels.", ephemeral=True)
+            return
+
+        if duration < 1 or duration > TEMP_MAX_MINUTES:
+            await interaction.response.send_message(f"Duration must be between 1 and {TEMP_MAX_MINUTES} minutes.", ephemeral=True)
+            return
+
+        role = interaction.guild.get_role(COMMUNITY_MEMBER_ROLE_ID)
+        if role is None:
+            await interaction.response.send_message("Community member role not found.", ephemeral=True)
+            return
+
+        channel = interaction.channel
+        overwrite = channel.overwrites_for(role)
+        overwrite.send_messages = False
+
+        try:
+            await channel.set_permissions(role, overwrite=overwrite)
+            self.scheduler.schedule(JOB_UNLOCK, duration * 60, interaction.guild.id, channel.id)
+            await interaction.response.send_message(f"{self.get_checkmark_emoji()} This channel has been locked for {role.name} for {duration} minutes.")
+        except Exception as e:
+            logger.error(f"Failed to lock channel: {e}")
+            await interaction.response.send_message("Failed to lock the channel.", ephemeral=True)
+
+    @app_commands.command(name="temprole", description="Give a member a role for a limited time")
+    @app_commands.describe(member="Member to give the role to", role="Role to give", duration="Duration in minutes")
+    async def temprole(self, interaction: discord.Interaction, member: discord.Member, role: discord.Role, duration: int):
+        if not self.can_execute(interaction):
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+            return
+
+        if duration < 1 or duration > TEMP_MAX_MINUTES:
+            await interaction.response.send_message(f"Duration must be between 1 and {TEMP_MAX_MINUTES} minutes.", ephemeral=True)
+            return
+
+        if role >= interaction.guild.me.top_role:
+            await interaction.response.send_message("I cannot manage this role due to role hierarchy.", ephemeral=True)
+            return
+
+        try:
+            await member.add_roles(role, reason=f"Timed role from {interaction.user}")
+            self.scheduler.schedule(JOB_REMOVE_ROLE, duration * 60, interaction.guild.id, member.id, role.id)
+            await interaction.response.send_message(f"{self.get_checkmark_emoji()} {member.mention} has been given {role.name} for {duration} minutes.")
+        except discord.Forbidden:
+            await interaction.response.send_message("Failed to give the role: insufficient permissions.", ephemeral=True)
+
+    @app_commands.command(name="lockdown", description="Lock every text channel in the server")
+    @app_commands.describe(reason="Reason for the lockdown")
+    async def lockdown(self, interaction: discord.Interaction, reason: str = "Server lockdown"):
+        if not self.can_lock(interaction.user):
+            await interaction.response.send_message("You do not have permission to lock channels.", ephemeral=True)
+            return
+
+        guild = interaction.guild
+        role = guild.get_role(COMMUNITY_MEMBER_ROLE_ID)
+        if role is None:
+            await interaction.response.send_message("Community member role not found.", ephemeral=True)
+            return
+
+        if guild.id in self.lockdown_busy or self.lockdowns.get(guild.id) is not None:
+            await interaction.response.send_message("The server is already locked down. Use /unlockdown first.", ephemeral=True)
+            return
+
+        channels = guild.text_channels
+        snapshot = {}
+        for channel in channels:
+            overwrite = channel.overwrites.get(role)
+            snapshot[channel.id] = tuple(permissions.value for permissions in overwrite.pair()) if overwrite is not None else None
+        try:
+            self.lockdowns.begin(guild.id, role.id, snapshot)
+        except Exception as e:
+            logger.error(f"Failed to save lockdown snapshot: {e}")
+            await interaction.response.send_message("Failed to save the current permissions, nothing was changed.", ephemeral=True)
+            return
+
+        async def lock_channel(channel: discord.TextChannel):
+            overwrite = channel.overwrites_for(role)
+            overwrite.send_messages = False
+            await channel.set_permissions(role, overwrite=overwrite, reason=reason)
+
+        self.lockdown_busy.add(guild.id)
+        try:
+            await interaction.response.defer()
+            message = await interaction.followup.send(f"Locking {len(channels)} channels...", wait=True)
+            progress = ProgressMessage(message, "Locking", len(channels))
+            results = await run_bounded(channels, lock_channel, on_done=progress.advance)
+        finally:
+            self.lockdown_busy.discard(guild.id)
+
+        failed = [channel for channel, error in results if error is not None]
+        summary = f"{self.get_checkmark_emoji()} Server locked down for {role.name}: {len(channels) - len(failed)}/{len(channels)} channels. Reason: {reason}"
+        if failed:
+            summary += f"\n⚠️ Could not lock: {', '.join(channel.mention for channel in failed[:20])}"
+        await progress.edit(summary)
+        await log_command_usage(self.bot, interaction, 'lockdown', f'Channels: {len(channels) - len(failed)}/{len(channels)} | Reason: {reason}')
+
+    @app_commands.command(name="unlockdown", description="Restore every channel changed by /lockdown")
+    async def unlockdown(self, interaction: discord.Interaction):
+        if not self.can_lock(interaction.user):
+            await interaction.response.send_message("You do not have permission to unlock channels.", ephemeral=True)
+            return
+
+        guild = interaction.guild
+        entry = self.lockdowns.get(guild.id)
+        if entry is None or guild.id in self.lockdown_busy:
+            await interaction.response.send_message("The server is not locked down.", ephemeral=True)
+            return
+
+        role = guild.get_role(entry['role_id'])
+        if role is None:
+            await interaction.response.send_message("Community member role not found.", ephemeral=True)
+            return
+
+        async def restore_channel(item):
+            channel_id, pair = item
+            channel = guild.get_channel(channel_id)
+            if channel is None:
+                return  # Deleted since the lockdown, nothing to restore
+            if pair is None:
+                await channel.set_permissions(role, overwrite=None, reason="Lockdown lifted")
+            else:
+                overwrite = discord.PermissionOverwrite.from_pair(discord.Permissions(pair[0]), discord.Permissions(pair[1]))
+                await channel.set_permissions(role, overwrite=overwrite, reason="Lockdown lifted")
+
+        items = list(entry['channels'].items())
+        self.lockdown_busy.add(guild.id)
+        try:
+            await interaction.response.defer()
+            message = await interaction.followup.send(f"Restoring {len(items)} channels...", wait=True)
+            progress = ProgressMessage(message, "Restoring", len(items))
+            results = await run_bounded(items, restore_channel, on_done=progress.advance)
+            self.lockdowns.restored(guild.id, [channel_id for (channel_id, _), error in results if error is None])
+        finally:
+            self.lockdown_busy.discard(guild.id)
+
+        failed = len(items) - sum(1 for _, error in results if error is None)
+        summary = f"{self.get_checkmark_emoji()} Lockdown lifted: {len(items) - failed}/{len(items)} channels restored."
+        if failed:
+            summary += f"\n⚠️ {failed} channels could not be restored; run /unlockdown again to retry them."
+        await progress.edit(summary)
+        await log_command_usage(self.bot, interaction, 'unlockdown', f'Channels: {len(items) - failed}/{len(items)}')
+
+    @app_commands.command(name="purge", description="Purge messages from the current channel")
+    @app_commands.describe(
+        amount=f"Number of messages to delete (1-{PURGE_MAX_MESSAGES})",
+        member="Only delete messages from this user",
+        pattern="Only delete messages matching this regular expression",
+        attachments="Only delete messages with attachments",
+        bots="Only delete messages sent by bots"
+    )
+    async def purge(self, interaction: discord.Interaction, amount: int, member: Optional[discord.User] = None,
+                    pattern: Optional[str] = None, attachments: bool = False, bots: bool = False):
         if not any(role.id == LIMITED_ROLE_ID for role in interaction.user.roles):
             await interaction.response.send_message(
                 "<:Denied:1370806202094583918> The command has failed", ephemeral=True
             )
             return
 
-        if amount < 1 or amount > 100:
+        if amount < 1 or amount > PURGE_MAX_MESSAGES:
             await interaction.response.send_message(
                 "<:Denied:1370806202094583918> The command has failed", ephemeral=True
             )
             return
 
         try:
-            deleted = await interaction.channel.purge(limit=amount)
-            await interaction.response.send_message(
-                f"<:checkmark:1384993844671545506> Successfully purged {len(deleted)} messages.",
-                ephemeral=True
-            )
+            regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+        except re.error:
+            await interaction.response.send_message("That pattern is not a valid regular expression.", ephemeral=True)
+            return
+
+        channel = interaction.channel
+        if channel.id in self.purge_jobs:
+            await interaction.response.send_message("A purge is already running in this channel.", ephemeral=True)
+            return
+
+        def check(message: discord.Message) -> bool:
+            if member is not None and message.author.id != member.id:
+                return False
+            if bots and not message.author.bot:
+                return False
+            if attachments and not message.attachments:
+                return False
+            if regex is not None and not regex.search(message.content):
+                return False
+            return True
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # Old messages go one per second, so a big purge outlives the 15 minute interaction token;
+        # report progress in a regular message instead of a followup that stops accepting edits
+        starting = f"Purging up to {amount} messages in {channel.mention}..."
+        try:
+            message = await interaction.user.send(starting)
+            where = "your DMs"
+        except discord.HTTPException:
+            message = await channel.send(starting)
+            where = "this channel"
+        await interaction.followup.send(f"Purge started, progress is shown in {where}.", ephemeral=True)
+        job = PurgeJob(channel, amount, lambda candidate: candidate.id != message.id and check(candidate),
+                       ProgressMessage(message, "Purging", amount))
+        self.purge_jobs[channel.id] = job
+        try:
+            deleted = await job.run()
+            summary = f"<:checkmark:1384993844671545506> Successfully purged {deleted} messages."
+            if job.failed:
+                summary += f" {job.failed} could not be deleted."
+            if job.matched < amount:
+                summary += f" Only {job.matched} of {job.scanned} scanned messages matched."
+            await job.progress.edit(summary)
         except Exception as e:
             logger.error(f"Failed to purge messages: {e}")
-            await interaction.response.send_message(
-                "<:Denied:1370806202094583918> The command has failed", ephemeral=True
-            )
+            await job.progress.edit(f"<:Denied:1370806202094583918> The command has failed after deleting {job.deleted} messages")
+        finally:
+            del self.purge_jobs[channel.id]
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(ModerationCog(bot))
@@ -1,6 +1,11 @@
 import discord
 from discord.ext import commands
 import logging
+import asyncio
+import time
+from bot.utils.raid_detector import JoinRateTracker
+from bot.utils.permissions import MODERATOR_ROLE_ID
+from bot.utils.command_logger import COMMAND_LOG_CHANNEL_ID
 
 logger = logging.getLogger(__name__)
 
@@ -12,10 +17,65 @@ class WelcomeCog(commands.Cog):
         self.fallback_wave_emoji = "👋"
         self.custom_person_emoji = "<:flst_person:1384991790838448209>"
         self.fallback_person_emoji = "👤"
+        self.raid_alert_channel_id = COMMAND_LOG_CHANNEL_ID  # Staff channel that gets raid alerts
+        self.raid_trackers = {}  # guild_id -> JoinRateTracker
+        self.raid_watchers = {}  # guild_id -> task ending the raid once joins calm down
+
+    async def send_raid_alert(self, content: str):
+        channel = self.bot.get_channel(self.raid_alert_channel_id)
+        if not channel:
+            logger.error(f'Raid alert channel not found: {self.raid_alert_channel_id}')
+            return
+        try:
+            await channel.send(content, allowed_mentions=discord.AllowedMentions(roles=True))
+        except discord.HTTPException as e:
+            logger.error(f'Failed to send raid alert: {e}')
+
+    def describe_joins(self, tracker: JoinRateTracker) -> str:
+        ages = ', '.join(f'{label}: {count}' for label, count in tracker.histogram() if count)
+        return f'{tracker.total} joins in the last {tracker.window}s (account ages {ages or "none"})'
+
+    async def watch_raid(self, guild: discord.Guild, tracker: JoinRateTracker):
+        """Tick the tracker while a raid lasts, so it can end even if nobody else joins"""
+        try:
+            while tracker.raiding:
+                await asyncio.sleep(10)
+                if tracker.tick(time.time()) == 'end':
+                    await self.end_raid(guild, tracker)
+        finally:
+            self.raid_watchers.pop(guild.id, None)
+
+    async def end_raid(self, guild: discord.Guild, tracker: JoinRateTracker):
+        logger.info(f'Raid over in {guild.name}: {tracker.raid_joins} joins')
+        await self.send_raid_alert(f"✅ Raid over in **{guild.name}**: {tracker.raid_joins} members joined during it. Welcome messages resumed.")
+
+    async def track_join(self, member: discord.Member) -> bool:
+        """Feed a join to the guild's raid tracker, returns whether a raid is going on"""
+        tracker = self.raid_trackers.get(member.guild.id)
+        if tracker is None:
+            tracker = self.raid_trackers[member.guild.id] = JoinRateTracker()
+
+        now = time.time()
+        account_age = now - member.created_at.timestamp()
+        state = tracker.record(now, account_age)
+        if state == 'start':
+            logger.warning(f'Raid detected in {member.guild.name}: {self.describe_joins(tracker)}')
+            await self.send_raid_alert(
+                f"🚨 <@&{MODERATOR_ROLE_ID}> Possible raid in **{member.guild.name}**: {self.describe_joins(tracker)}. "
+                f"Welcome messages are paused until joins calm down."
+            )
+            if member.guild.id not in self.raid_watchers:
+                self.raid_watchers[member.guild.id] = asyncio.create_task(self.watch_raid(member.guild, tracker))
+        elif state == 'end':
+            await self.end_raid(member.guild, tracker)
+        return tracker.raiding
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
-        """Send welcome message when a new member joins"""
+        """Send welcome message when a new member joins, unless a raid is going on"""
+        if await self.track_join(member):
+            return
+
         try:
             # Get the welcome channel
             welcome_channel = self.bot.get_channel(self.welcome_channel_id)
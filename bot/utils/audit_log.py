@@ -0,0 +1,231 @@
+import json
+import os
+import re
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIT_DIR = os.getenv('AUDIT_DIR', 'data/audit')
+AUDIT_SEGMENT_BYTES = int(os.getenv('AUDIT_SEGMENT_BYTES', str(4 * 1024 * 1024)))  # Segment size before rotating
+AUDIT_MAX_SEGMENTS = int(os.getenv('AUDIT_MAX_SEGMENTS', '50'))  # Oldest segments past this are deleted
+AUDIT_INDEX_CACHE = 8  # Sealed segment indexes kept in memory
+
+SEGMENT_PATTERN = re.compile(r'audit-(\d{6})\.jsonl$')
+
+# Record kinds
+AUDIT_COMMAND = 'command'  # An app command ran
+AUDIT_ACTION = 'action'  # A command reported what it did through log_command_usage
+AUDIT_CASE = 'case'  # A case was saved or deleted
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d')
+
+class SegmentIndex:
+    """Byte offsets of one segment's records by user ID, and the byte range of each UTC day"""
+
+    __slots__ = ('users', 'days', 'first_ts', 'last_ts')
+
+    def __init__(self):
+        self.users: Dict[int, List[int]] = {}  # user_id -> offsets, ascending
+        self.days: Dict[str, List[int]] = {}  # 'YYYY-MM-DD' -> [start offset, end offset)
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+
+    def add(self, offset: int, end: int, record: dict) -> None:
+        for user_id in {record.get('user_id'), record.get('target_id')}:
+            if user_id is not None:
+                self.users.setdefault(user_id, []).append(offset)
+        span = self.days.setdefault(_day(record['ts']), [offset, end])
+        span[1] = end
+        if self.first_ts is None:
+            self.first_ts = record['ts']
+        self.last_ts = record['ts']
+
+    def to_dict(self) -> dict:
+        return {'users': {str(user_id): offsets for user_id, offsets in self.users.items()},
+                'days': self.days, 'first_ts': self.first_ts, 'last_ts': self.last_ts}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SegmentIndex':
+        index = cls()
+        index.users = {int(user_id): offsets for user_id, offsets in data['users'].items()}
+        index.days = data['days']
+        index.first_ts = data['first_ts']
+        index.last_ts = data['last_ts']
+        return index
+
+class AuditLog:
+    """Append-only audit trail in size-rotated JSONL segments with a sidecar index per segment.
+
+    Records go to the active segment, whose index is kept in memory; on rotation
+    the index is written next to the segment as audit-NNNNNN.idx.json. Searches
+    walk segments newest first, skip those outside the time range using the
+    index's first and last timestamps, and seek straight to the matching records.
+    """
+
+    def __init__(self, directory: str = AUDIT_DIR, segment_bytes: int = AUDIT_SEGMENT_BYTES,
+                 max_segments: int = AUDIT_MAX_SEGMENTS):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.segments: Optional[List[int]] = None  # Segment numbers, oldest first; loaded on first use
+        self._active = None
+        self._active_index: Optional[SegmentIndex] = None
+        self._index_cache: 'OrderedDict[int, SegmentIndex]' = OrderedDict()
+
+    def _segment_file(self, number: int) -> str:
+        return os.path.join(self.directory, f'audit-{number:06d}.jsonl')
+
+    def _index_file(self, number: int) -> str:
+        return os.path.join(self.directory, f'audit-{number:06d}.idx.json')
+
+    def _open(self) -> None:
+        """Find the segments on disk and reopen the newest for appending"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.segments = sorted(int(match.group(1)) for match in map(SEGMENT_PATTERN.match, os.listdir(self.directory)) if match)
+        if not self.segments:
+            self.segments = [1]
+        active = self.segments[-1]
+        self._active_index = self._scan(active)
+        self._active = open(self._segment_file(active), 'ab')
+
+    def _scan(self, number: int) -> SegmentIndex:
+        """Build a segment's index by reading it"""
+        index = SegmentIndex()
+        path = self._segment_file(number)
+        if not os.path.exists(path):
+            return index
+        with open(path, 'rb') as f:
+            offset = 0
+            for line in f:
+                end = offset + len(line)
+                try:
+                    index.add(offset, end, json.loads(line))
+                except (json.JSONDecodeError, KeyError):
+                    logger.warning(f'Skipping unreadable audit record at byte {offset} of {path}')
+                offset = end
+        return index
+
+    def _sealed_index(self, number: int) -> SegmentIndex:
+        index = self._index_cache.get(number)
+        if index is not None:
+            self._index_cache.move_to_end(number)
+            return index
+        try:
+            with open(self._index_file(number), 'r') as f:
+                index = SegmentIndex.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            # Missing or damaged sidecar (e.g. a crash during rotation): rebuild it
+            index = self._scan(number)
+            self._write_index(number, index)
+        self._index_cache[number] = index
+        if len(self._index_cache) > AUDIT_INDEX_CACHE:
+            self._index_cache.popitem(last=False)
+        return index
+
+    def _write_index(self, number: int, index: SegmentIndex) -> None:
+        try:
+            temp_file = self._index_file(number) + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump(index.to_dict(), f)
+            os.replace(temp_file, self._index_file(number))
+        except Exception as e:
+            logger.error(f'Error writing audit index for segment {number}: {e}')
+
+    def _rotate(self) -> None:
+        sealed = self.segments[-1]
+        self._active.close()
+        self._write_index(sealed, self._active_index)
+        self.segments.append(sealed + 1)
+        self._active_index = SegmentIndex()
+        self._active = open(self._segment_file(sealed + 1), 'ab')
+
+        while len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            self._index_cache.pop(oldest, None)
+            for path in (self._segment_file(oldest), self._index_file(oldest)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def record(self, kind: str, user_id: Optional[int], name: str, target_id: Optional[int] = None, details: str = '') -> None:
+        """Append one audit record"""
+        try:
+            if self._active is None:
+                self._open()
+            entry = {'ts': round(time.time(), 3), 'kind': kind, 'user_id': user_id, 'name': name}
+            if target_id is not None:
+                entry['target_id'] = target_id
+            if details:
+                entry['details'] = details
+            line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+            offset = self._active.tell()
+            self._active.write(line)
+            self._active.flush()
+            self._active_index.add(offset, offset + len(line), entry)
+            if offset + len(line) >= self.segment_bytes:
+                self._rotate()
+        except Exception as e:
+            logger.error(f'Error writing audit record: {e}')
+
+    def _read(self, number: int, offsets: Iterator[int]) -> Iterator[dict]:
+        with open(self._segment_file(number), 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def _day_offsets(self, number: int, index: SegmentIndex, since: float, until: float) -> Iterator[int]:
+        """Offsets of a segment's records on the days overlapping [since, until), newest first"""
+        first_day, last_day = _day(since), _day(until)
+        spans = sorted(span for day, span in index.days.items() if first_day <= day <= last_day)
+        with open(self._segment_file(number), 'rb') as f:
+            for start, end in reversed(spans):
+                f.seek(start)
+                offsets = []
+                position = start
+                for line in f.read(end - start).splitlines(keepends=True):
+                    offsets.append(position)
+                    position += len(line)
+                yield from reversed(offsets)
+
+    def search(self, user_id: Optional[int] = None, since: Optional[float] = None, until: Optional[float] = None,
+               kind: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Records involving user_id (as actor or target) between since and until (Unix times),
+        newest first. Without a user, the day index picks the records to read."""
+        if self.segments is None:
+            self._open()
+        since = since if since is not None else 0.0
+        until = until if until is not None else time.time() + 1
+        results = []
+        for number in reversed(self.segments):
+            index = self._active_index if number == self.segments[-1] else self._sealed_index(number)
+            if index.last_ts is None or index.first_ts >= until:
+                continue
+            if index.last_ts < since:
+                break  # Segments are in time order, older ones can't match either
+
+            if user_id is not None:
+                offsets = reversed(index.users.get(user_id, []))
+            else:
+                offsets = self._day_offsets(number, index, since, until)
+            for entry in self._read(number, offsets):
+                if entry['ts'] >= until or (kind is not None and entry['kind'] != kind):
+                    continue
+                if entry['ts'] < since:
+                    break
+                results.append(entry)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def close(self) -> None:
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+
+AUDIT_LOG = AuditLog()  # Process-wide; opened on first use
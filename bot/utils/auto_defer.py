@@ -0,0 +1,113 @@
+import os
+import asyncio
+import logging
+from typing import Any, Optional
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger(__name__)
+
+# Discord drops an interaction that is not acknowledged within 3 seconds; defer once
+# a command has run this long without responding, leaving margin for the defer request.
+AUTO_DEFER_AFTER = float(os.getenv('AUTO_DEFER_AFTER', '2.0'))
+
+# The tree hooks discord.py internals (CommandTree._call and the slot caching Interaction.response);
+# pyproject pins discord.py to 2.5.x, and if a release drops either the stock behaviour is used
+AUTO_DEFER_SUPPORTED = (hasattr(app_commands.CommandTree, '_call')
+                        and '_cs_response' in getattr(discord.Interaction, '__slots__', ()))
+
+class AutoDeferResponse(discord.InteractionResponse):
+    """Interaction response that can be deferred behind the command's back.
+
+    Once deferred automatically, send_message goes to the followup webhook and a
+    later defer is a no-op, so handlers written for the plain response keep working.
+    An ephemeral reply or defer deletes the public thinking message first, so the
+    handler's followups stay private.
+    A lock stops the automatic defer and the handler's own reply from both reaching
+    Discord. Commands that answer with a modal must do so within the budget.
+    """
+
+    def __init__(self, parent: discord.Interaction):
+        super().__init__(parent)
+        self.lock = asyncio.Lock()
+        self.auto_deferred = False
+        self.thinking_deleted = False
+
+    async def auto_defer(self) -> bool:
+        """Defer with a thinking indicator if nothing has responded yet, returns whether it did"""
+        async with self.lock:
+            if self.is_done():
+                return False
+            await super().defer(thinking=True)
+            self.auto_deferred = True
+            return True
+
+    async def delete_thinking(self) -> None:
+        """Drop the public thinking message of an automatic defer, so the next followup
+        is sent as a new message instead of replacing it, and can be ephemeral"""
+        if self.thinking_deleted:
+            return
+        self.thinking_deleted = True
+        try:
+            await self._parent.delete_original_response()
+        except discord.HTTPException:
+            pass
+
+    async def defer(self, **kwargs) -> Any:
+        async with self.lock:
+            if not self.auto_deferred:
+                return await super().defer(**kwargs)
+        if kwargs.get('ephemeral'):
+            # The handler's followups are meant to be private; the thinking message would make the first one public
+            await self.delete_thinking()
+        return None
+
+    async def send_message(self, content: Optional[Any] = None, **kwargs) -> Any:
+        async with self.lock:
+            if not self.auto_deferred:
+                return await super().send_message(content, **kwargs)
+
+        interaction = self._parent
+        delete_after = kwargs.pop('delete_after', None)
+        if kwargs.get('ephemeral'):
+            # The thinking message is public; drop it so the reply stays private
+            await self.delete_thinking()
+        message = await interaction.followup.send(content, wait=True, **kwargs)
+        if delete_after is not None:
+            await message.delete(delay=delete_after)
+        return None
+
+class AutoDeferTree(app_commands.CommandTree):
+    """Command tree that defers any app command still unanswered after AUTO_DEFER_AFTER seconds.
+
+    Pass as tree_cls to the bot. Behaves like a plain CommandTree on discord.py versions
+    whose internals it doesn't recognise (see AUTO_DEFER_SUPPORTED).
+    """
+
+    def __init__(self, *args, defer_after: float = AUTO_DEFER_AFTER, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.defer_after = defer_after
+        if not AUTO_DEFER_SUPPORTED:
+            logger.warning(f'Automatic deferral disabled: not supported on discord.py {discord.__version__}')
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        if not AUTO_DEFER_SUPPORTED or interaction.type is not discord.InteractionType.application_command:
+            return await super()._call(interaction)  # Autocomplete answers can't be deferred
+
+        response = AutoDeferResponse(interaction)
+        interaction._cs_response = response  # cached slot behind Interaction.response
+        timer = asyncio.create_task(self._defer_later(interaction, response))
+        try:
+            await super()._call(interaction)
+        finally:
+            timer.cancel()
+
+    async def _defer_later(self, interaction: discord.Interaction, response: AutoDeferResponse) -> None:
+        await asyncio.sleep(self.defer_after)
+        try:
+            if await response.auto_defer():
+                name = interaction.command.qualified_name if interaction.command else 'unknown'
+                logger.info(f'Auto-deferred /{name} after {self.defer_after}s without a response')
+        except discord.HTTPException as e:
+            logger.error(f'Auto-defer failed: {e}')
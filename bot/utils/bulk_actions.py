@@ -0,0 +1,69 @@
+import asyncio
+import time
+import logging
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Requests in flight at once. Bans and kicks in one guild share a Discord rate-limit
+# bucket; discord.py waits on that bucket, and this keeps the queue behind it short.
+BULK_CONCURRENCY = 5
+PROGRESS_EDIT_INTERVAL = 2.0  # Minimum seconds between progress message edits
+
+async def run_bounded(items: Iterable[Any], worker: Callable[[Any], Awaitable[Any]], limit: int = BULK_CONCURRENCY,
+                      on_done: Optional[Callable[[Any, Optional[Exception]], Awaitable[None]]] = None) -> List[Tuple[Any, Optional[Exception]]]:
+    """Run worker on every item with at most limit running at once.
+    Returns (item, error) pairs in item order; error is None on success."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item):
+        async with semaphore:
+            try:
+                await worker(item)
+                error = None
+            except Exception as e:
+                error = e
+        if on_done is not None:
+            await on_done(item, error)
+        return item, error
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+class ProgressMessage:
+    """One message edited in place as a bulk action runs, at most once per interval.
+
+    Followup messages can only be edited for 15 minutes (the interaction token's
+    lifetime); actions that may run longer should pass a regular channel or DM message.
+    """
+
+    def __init__(self, message: discord.Message, label: str, total: int):
+        self.message = message
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self._last_edit = time.monotonic()
+
+    def render(self) -> str:
+        return f"{self.label}: {self.done}/{self.total} done" + (f", {self.failed} failed" if self.failed else "")
+
+    async def advance(self, item: Any, error: Optional[Exception]) -> None:
+        """Count a finished item; usable as the on_done callback of run_bounded"""
+        self.done += 1
+        if error is not None:
+            self.failed += 1
+        await self.refresh()
+
+    async def refresh(self) -> None:
+        """Show the current counts if the last edit is old enough"""
+        if time.monotonic() - self._last_edit >= PROGRESS_EDIT_INTERVAL:
+            await self.edit(self.render())
+
+    async def edit(self, content: str) -> None:
+        self._last_edit = time.monotonic()
+        try:
+            await self.message.edit(content=content)
+        except discord.HTTPException as e:
+            logger.error(f'Failed to update progress message: {e}')
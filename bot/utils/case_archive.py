@@ -0,0 +1,229 @@
+import json
+import mmap
+import os
+import zlib
+import logging
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BLOCK_SIZE = 64  # Cases compressed together in one block
+ARCHIVE_BLOCK_CACHE = 32  # Decoded blocks kept in memory
+
+# Case fields with a per-segment lookup table in the segment index
+INDEXED_FIELDS = ('target_id', 'moderator_id', 'action')
+
+class CaseArchive:
+    """Immutable, compressed segments of old cases.
+
+    Each segment is a .bin file of zlib-compressed blocks of cases plus a
+    .idx.json file holding the block offsets and case numbers per target,
+    moderator and action. Only the small manifest is read at startup; segment
+    indexes are read and segment files memory-mapped when a query reaches them.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, 'manifest.json')
+        self.segments: List[Dict[str, Any]] = []
+        self.deleted = set()
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._maps: Dict[str, tuple] = {}
+        self._blocks: OrderedDict = OrderedDict()
+        self._load_manifest()
+
+    def _load_manifest(self) -> None:
+        try:
+            if os.path.exists(self.manifest_file):
+                with open(self.manifest_file, 'r') as f:
+                    manifest = json.load(f)
+                self.segments = manifest.get('segments', [])
+                self.deleted = set(manifest.get('deleted', []))
+        except Exception as e:
+            logger.error(f'Error loading case archive manifest: {e}')
+
+    def _write_manifest(self) -> None:
+        temp_file = self.manifest_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump({'segments': self.segments, 'deleted': sorted(self.deleted)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.manifest_file)
+
+    @property
+    def last_case(self) -> int:
+        """Highest archived case number, 0 when the archive is empty"""
+        return self.segments[-1]['last_case'] if self.segments else 0
+
+    @property
+    def count(self) -> int:
+        """Number of archived cases that have not been deleted"""
+        return sum(segment['count'] for segment in self.segments) - len(self.deleted)
+
+    def write_segment(self, cases: List[Dict[str, Any]]) -> None:
+        """Archive cases (sorted by case number, all above last_case) as a new segment"""
+        if not cases:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = f'segment-{len(self.segments) + 1:06d}'
+        blocks = []
+        lookups = {field: {} for field in INDEXED_FIELDS}
+
+        with open(os.path.join(self.directory, name + '.bin'), 'wb') as f:
+            for start in range(0, len(cases), ARCHIVE_BLOCK_SIZE):
+                block = cases[start:start + ARCHIVE_BLOCK_SIZE]
+                data = zlib.compress(json.dumps(block, separators=(',', ':')).encode(), 6)
+                blocks.append([block[0]['case_number'], block[-1]['case_number'], f.tell(), len(data)])
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        for case_data in cases:
+            for field in INDEXED_FIELDS:
+                lookups[field].setdefault(str(case_data[field]), []).append(case_data['case_number'])
+
+        with open(os.path.join(self.directory, name + '.idx.json'), 'w') as f:
+            json.dump({'blocks': blocks, **lookups}, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+
+        timestamps = [case_data['timestamp'] for case_data in cases]
+        self.segments.append({
+            'name': name,
+            'first_case': cases[0]['case_number'],
+            'last_case': cases[-1]['case_number'],
+            'count': len(cases),
+            'oldest': min(timestamps),
+            'newest': max(timestamps)
+        })
+        # The manifest is replaced last, so a crash before this leaves the segment unused
+        self._write_manifest()
+        logger.info(f'Archived {len(cases)} cases into {name}')
+
+    def _index(self, segment: Dict[str, Any]) -> Dict[str, Any]:
+        name = segment['name']
+        if name not in self._indexes:
+            with open(os.path.join(self.directory, name + '.idx.json'), 'r') as f:
+                index = json.load(f)
+            index['block_starts'] = [block[0] for block in index['blocks']]
+            self._indexes[name] = index
+        return self._indexes[name]
+
+    def _map(self, segment: Dict[str, Any]) -> mmap.mmap:
+        name = segment['name']
+        if name not in self._maps:
+            f = open(os.path.join(self.directory, name + '.bin'), 'rb')
+            self._maps[name] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return self._maps[name][1]
+
+    def _block(self, segment: Dict[str, Any], block: list) -> List[Dict[str, Any]]:
+        """Decode a block, keeping recently used ones cached"""
+        key = (segment['name'], block[2])
+        cached = self._blocks.get(key)
+        if cached is not None:
+            self._blocks.move_to_end(key)
+            return cached
+
+        data = self._map(segment)[block[2]:block[2] + block[3]]
+        cases = json.loads(zlib.decompress(data))
+        self._blocks[key] = cases
+        if len(self._blocks) > ARCHIVE_BLOCK_CACHE:
+            self._blocks.popitem(last=False)
+        return cases
+
+    def _segment_for(self, case_number: int) -> Optional[Dict[str, Any]]:
+        position = bisect_right([segment['first_case'] for segment in self.segments], case_number) - 1
+        if position >= 0 and case_number <= self.segments[position]['last_case']:
+            return self.segments[position]
+        return None
+
+    def get(self, case_number: int) -> Optional[Dict[str, Any]]:
+        """Decode one archived case, or None if it is not archived"""
+        if case_number in self.deleted:
+            return None
+        segment = self._segment_for(case_number)
+        if segment is None:
+            return None
+
+        index = self._index(segment)
+        blocks = index['blocks']
+        position = bisect_right(index['block_starts'], case_number) - 1
+        if position < 0 or case_number > blocks[position][1]:
+            return None
+        for case_data in self._block(segment, blocks[position]):
+            if case_data['case_number'] == case_number:
+                return dict(case_data)
+        return None
+
+    def case_numbers(self, field: str, value: Any) -> List[int]:
+        """Archived case numbers whose field equals value, in ascending order"""
+        numbers = []
+        for segment in self.segments:
+            numbers.extend(self._index(segment)[field].get(str(value), ()))
+        return [case_number for case_number in numbers if case_number not in self.deleted]
+
+    def iter_cases(self, filters: Dict[str, Any], since: Optional[str] = None, until: Optional[str] = None,
+                   cursor: Optional[int] = None, newest_first: bool = True) -> Iterator[Dict[str, Any]]:
+        """Yield archived cases matching filters (field -> value) in case number order.
+
+        since/until are ISO timestamps compared as text; segments entirely
+        outside the range are skipped without being read.
+        """
+        segments = reversed(self.segments) if newest_first else iter(self.segments)
+        for segment in segments:
+            if cursor is not None:
+                if newest_first and segment['first_case'] >= cursor:
+                    continue
+                if not newest_first and segment['last_case'] <= cursor:
+                    continue
+            if (since and segment['newest'] < since) or (until and segment['oldest'] >= until):
+                continue
+
+            index = self._index(segment)
+            candidates = [index[field].get(str(value), []) for field, value in filters.items()]
+            if candidates:
+                numbers = min(candidates, key=len)
+                if cursor is not None:
+                    numbers = numbers[:bisect_left(numbers, cursor)] if newest_first else numbers[bisect_right(numbers, cursor):]
+                case_iter = (self.get(case_number) for case_number in (reversed(numbers) if newest_first else numbers))
+            else:
+                blocks = reversed(index['blocks']) if newest_first else index['blocks']
+                case_iter = (
+                    case_data
+                    for block in blocks
+                    for case_data in (reversed(self._block(segment, block)) if newest_first else self._block(segment, block))
+                )
+
+            for case_data in case_iter:
+                if case_data is None or case_data['case_number'] in self.deleted:
+                    continue
+                if cursor is not None and (case_data['case_number'] >= cursor if newest_first else case_data['case_number'] <= cursor):
+                    continue
+                if any(case_data[field] != value for field, value in filters.items()):
+                    continue
+                if (since and case_data['timestamp'] < since) or (until and case_data['timestamp'] >= until):
+                    continue
+                yield dict(case_data)
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Yield every archived case that has not been deleted"""
+        return self.iter_cases({}, newest_first=False)
+
+    def delete(self, case_number: int) -> Optional[Dict[str, Any]]:
+        """Tombstone an archived case, returning its data if it existed"""
+        case_data = self.get(case_number)
+        if case_data is None:
+            return None
+        self.deleted.add(case_number)
+        self._write_manifest()
+        return case_data
+
+    def close(self) -> None:
+        for f, mapped in self._maps.values():
+            mapped.close()
+            f.close()
+        self._maps.clear()
+        self._blocks.clear()
@@ -0,0 +1,176 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b'CASEIDX1'
+FOOTER = struct.Struct('<Q8s')  # header offset, magic
+
+# One entry per case, in case number order: (case_number, json_line, target_id, moderator_id, action)
+CaseEntry = Tuple[int, bytes, int, int, str]
+
+def _grouped(keys: array, numbers: array) -> Tuple[array, array, array]:
+    """Group case numbers by key: sorted unique keys, start offsets and the grouped numbers"""
+    # sorted() is stable, so numbers stay ascending within each key
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    unique_keys = array('Q')
+    starts = array('Q')
+    grouped = array('Q')
+    for position in order:
+        key = keys[position]
+        if not unique_keys or unique_keys[-1] != key:
+            unique_keys.append(key)
+            starts.append(len(grouped))
+        grouped.append(numbers[position])
+    starts.append(len(grouped))
+    return unique_keys, starts, grouped
+
+def write_case_file(path: str, entries: Iterable[CaseEntry]) -> None:
+    """Write an indexed case file to path (via a temp file and rename).
+
+    Layout: one JSON line per case, then 8-byte aligned little-endian arrays
+    (case numbers, record offsets, per-case keys and per-key groups), then a
+    JSON header describing them, then a fixed footer pointing at the header.
+    """
+    numbers = array('Q')
+    offsets = array('Q')
+    targets = array('Q')
+    moderators = array('Q')
+    action_ids = array('Q')
+    action_table: Dict[str, int] = {}
+
+    temp_file = path + '.tmp'
+    with open(temp_file, 'wb') as f:
+        for case_number, line, target_id, moderator_id, action in entries:
+            numbers.append(case_number)
+            offsets.append(f.tell())
+            targets.append(target_id)
+            moderators.append(moderator_id)
+            action_ids.append(action_table.setdefault(action, len(action_table)))
+            f.write(line)
+        offsets.append(f.tell())
+
+        sections: Dict[str, list] = {}
+
+        def write_section(name: str, values: array) -> None:
+            f.write(b'\0' * (-f.tell() % 8))
+            sections[name] = [f.tell(), len(values) * values.itemsize]
+            f.write(values.tobytes())
+
+        write_section('numbers', numbers)
+        write_section('offsets', offsets)
+        write_section('targets', targets)
+        write_section('moderators', moderators)
+        write_section('actions', action_ids)
+        for field, keys in (('target_id', targets), ('moderator_id', moderators), ('action', action_ids)):
+            unique_keys, starts, grouped = _grouped(keys, numbers)
+            write_section(f'{field}.keys', unique_keys)
+            write_section(f'{field}.starts', starts)
+            write_section(f'{field}.numbers', grouped)
+
+        header = json.dumps({
+            'count': len(numbers),
+            'highest': numbers[-1] if numbers else 0,
+            'actions': list(action_table),
+            'sections': sections
+        }).encode()
+        header_offset = f.tell()
+        f.write(header)
+        f.write(FOOTER.pack(header_offset, MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_file, path)
+
+class CaseFile:
+    """Read-only, memory-mapped view of an indexed case file.
+
+    Opening it reads only the footer and header; case numbers, keys and
+    per-key groups are read straight from the mapping and records are
+    decoded one at a time when asked for.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._map)
+        self._views: List[memoryview] = [self._buffer]
+
+        header_offset, magic = FOOTER.unpack_from(self._map, len(self._map) - FOOTER.size)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not an indexed case file')
+        header = json.loads(self._map[header_offset:len(self._map) - FOOTER.size])
+
+        self.count: int = header['count']
+        self.highest: int = header['highest']
+        self.action_names: List[str] = header['actions']
+        self._action_ids = {name: action_id for action_id, name in enumerate(self.action_names)}
+        self._sections = header['sections']
+
+        self.numbers = self._section('numbers')
+        self._offsets = self._section('offsets')
+        self._targets = self._section('targets')
+        self._moderators = self._section('moderators')
+        self._actions = self._section('actions')
+        self._groups = {
+            field: (self._section(f'{field}.keys'), self._section(f'{field}.starts'), self._section(f'{field}.numbers'))
+            for field in ('target_id', 'moderator_id', 'action')
+        }
+
+    def _section(self, name: str) -> memoryview:
+        offset, length = self._sections[name]
+        view = self._buffer[offset:offset + length].cast('Q')
+        self._views.append(view)
+        return view
+
+    def position(self, case_number: int) -> Optional[int]:
+        """Index of a case number in the file, or None if it is not stored"""
+        position = bisect_left(self.numbers, case_number)
+        if position < len(self.numbers) and self.numbers[position] == case_number:
+            return position
+        return None
+
+    def line(self, position: int) -> bytes:
+        """Raw JSON line of the case at position"""
+        return self._map[self._offsets[position]:self._offsets[position + 1]]
+
+    def case(self, position: int) -> Dict[str, Any]:
+        """Decode the case at position"""
+        return json.loads(self.line(position))
+
+    def keys(self, position: int) -> Tuple[int, int, str]:
+        """(target_id, moderator_id, action) of the case at position, without decoding it"""
+        return self._targets[position], self._moderators[position], self.action_names[self._actions[position]]
+
+    def group(self, field: str, value: Any) -> array:
+        """Case numbers whose field equals value, ascending, copied into a growable array"""
+        if field == 'action':
+            value = self._action_ids.get(value)
+            if value is None:
+                return array('Q')
+        keys, starts, numbers = self._groups[field]
+        position = bisect_left(keys, value)
+        if position >= len(keys) or keys[position] != value:
+            return array('Q')
+        return array('Q', numbers[starts[position]:starts[position + 1]].tobytes())
+
+    def iter_entries(self, skip=frozenset()) -> Iterator[CaseEntry]:
+        """Yield stored cases as write_case_file entries, without decoding them"""
+        for position, case_number in enumerate(self.numbers):
+            if case_number in skip:
+                continue
+            target_id, moderator_id, action = self.keys(position)
+            yield case_number, self.line(position), target_id, moderator_id, action
+
+    def close(self) -> None:
+        # Slices first: the mapping cannot close while any view of it is alive
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._map.close()
+        self._file.close()
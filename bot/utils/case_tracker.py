@@ -1,28 +1,402 @@
 import json
 import os
+import asyncio
+import contextvars
+import inspect
+import time
 import logging
-from datetime import datetime
-from typing import Dict, Any
+import sys
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from collections.abc import MutableMapping
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, List, Optional
+from bot.utils.case_archive import CaseArchive
+from bot.utils.case_file import CaseFile, write_case_file
+from bot.utils.audit_log import AUDIT_LOG, AUDIT_CASE
+from bot.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Storage modes
+STORAGE_JSON = 'json'  # Rewrite the whole snapshot on every change
+STORAGE_JOURNAL = 'journal'  # Append one record per change, compact in the background
+STORAGE_WRITE_BEHIND = 'write_behind'  # Mark dirty on change, flush coalesced snapshots in the background
+STORAGE_INDEXED = 'indexed'  # Journal changes into an indexed case file that is read lazily at startup
+
+# Modes that append changes to the journal instead of rewriting the snapshot
+JOURNALED_STORAGE = (STORAGE_JOURNAL, STORAGE_INDEXED)
+
+# Storage mode used when none is passed explicitly
+CASE_STORAGE = os.getenv('CASE_STORAGE', STORAGE_JSON)
+
+# Case store backends
+BACKEND_JSON = 'json'
+BACKEND_SQLITE = 'sqlite'
+
+CASE_BACKEND = os.getenv('CASE_BACKEND', BACKEND_JSON)
+CASE_DB_FILE = os.getenv('CASE_DB_FILE', 'data/cases.db')
+
+JOURNAL_FSYNC_BATCH = 16  # fsync after this many appended records
+JOURNAL_FSYNC_INTERVAL = 5.0  # ...or when this many seconds passed since the last fsync
+JOURNAL_COMPACT_THRESHOLD = 1000  # Records in the journal before a snapshot is written
+
+# Cases older than this many days move to compressed archive segments at startup (0 disables)
+ARCHIVE_AFTER_DAYS = int(os.getenv('CASE_ARCHIVE_DAYS', '0'))
+
+WRITE_BEHIND_INTERVAL = float(os.getenv('CASE_FLUSH_INTERVAL', '5'))  # Seconds between write-behind flushes
+WRITE_BEHIND_MAX_PENDING = int(os.getenv('CASE_FLUSH_MAX_PENDING', '50'))  # Flush early after this many changes
+
+class CaseRecord:
+    """Compact in-memory form of a case.
+
+    Action names are interned, IDs are ints and the creation time is a single
+    UTC epoch timestamp; the ISO and display strings are only built by to_dict.
+    """
+
+    __slots__ = ('case_number', 'action', 'target_id', 'moderator_id', 'reason', 'timestamp')
+
+    def __init__(self, case_number: int, action: str, target_id: int, moderator_id: int, reason: str, timestamp: float):
+        self.case_number = case_number
+        self.action = sys.intern(action)
+        self.target_id = target_id
+        self.moderator_id = moderator_id
+        self.reason = reason
+        self.timestamp = timestamp
+
+    @property
+    def created(self) -> datetime:
+        """Creation time as a naive UTC datetime, matching the stored ISO format"""
+        return datetime.fromtimestamp(self.timestamp, timezone.utc).replace(tzinfo=None)
+
+    @property
+    def day(self) -> str:
+        """UTC day the case was created on, as YYYY-MM-DD"""
+        return self.created.date().isoformat()
+
+    @classmethod
+    def from_dict(cls, case_data: Dict[str, Any]) -> 'CaseRecord':
+        """Build a record from the JSON case format"""
+        timestamp = case_data.get('timestamp')
+        if timestamp:
+            epoch = datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+        else:
+            epoch = 0.0
+        return cls(
+            int(case_data['case_number']),
+            case_data.get('action', ''),
+            int(case_data.get('target_id', 0)),
+            int(case_data.get('moderator_id', 0)),
+            case_data.get('reason', ''),
+            epoch
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the JSON case format used by cases.json and callers"""
+        created = self.created
+        return {
+            'case_number': self.case_number,
+            'action': self.action,
+            'target_id': self.target_id,
+            'moderator_id': self.moderator_id,
+            'reason': self.reason,
+            'timestamp': created.isoformat(),
+            'created_at': created.strftime('%Y-%m-%d %H:%M:%S UTC')
+        }
+
+def _record_entry(record: CaseRecord) -> tuple:
+    """Indexed case file entry for a record"""
+    line = (json.dumps(record.to_dict()) + '\n').encode()
+    return record.case_number, line, record.target_id, record.moderator_id, record.action
+
+class LazyCases(MutableMapping):
+    """Case records backed by an indexed case file and decoded when accessed.
+
+    Changes made since the file was written are kept in an overlay; base cases
+    that were replaced or deleted are listed in `deleted`.
+    """
+
+    def __init__(self, base: Optional[CaseFile], overlay: Optional[Dict[int, CaseRecord]] = None, deleted=None):
+        self.base = base
+        self.overlay: Dict[int, CaseRecord] = overlay if overlay is not None else {}
+        self.deleted = deleted if deleted is not None else set()
+
+    def _base_position(self, case_number: int) -> Optional[int]:
+        if self.base is None or case_number in self.deleted:
+            return None
+        return self.base.position(case_number)
+
+    def __getitem__(self, case_number: int) -> CaseRecord:
+        record = self.overlay.get(case_number)
+        if record is not None:
+            return record
+        position = self._base_position(case_number)
+        if position is None:
+            raise KeyError(case_number)
+        return CaseRecord.from_dict(self.base.case(position))
+
+    def __setitem__(self, case_number: int, record: CaseRecord) -> None:
+        if self._base_position(case_number) is not None:
+            self.deleted.add(case_number)
+        self.overlay[case_number] = record
+
+    def __delitem__(self, case_number: int) -> None:
+        if case_number in self.overlay:
+            del self.overlay[case_number]
+        elif self._base_position(case_number) is not None:
+            self.deleted.add(case_number)
+        else:
+            raise KeyError(case_number)
+
+    def __contains__(self, case_number) -> bool:
+        return case_number in self.overlay or self._base_position(case_number) is not None
+
+    def __len__(self) -> int:
+        base_count = self.base.count if self.base is not None else 0
+        return base_count - len(self.deleted) + len(self.overlay)
+
+    def __iter__(self) -> Iterator[int]:
+        """Case numbers in ascending order"""
+        base_numbers = self.base.numbers if self.base is not None else ()
+        live = (case_number for case_number in base_numbers if case_number not in self.deleted)
+        return heapq.merge(live, sorted(self.overlay))
+
+    @property
+    def highest(self) -> int:
+        """Highest stored case number, 0 when empty"""
+        highest = max(self.overlay, default=0)
+        if self.base is not None:
+            for case_number in reversed(self.base.numbers):
+                if case_number not in self.deleted:
+                    return max(highest, case_number)
+        return highest
+
+    def snapshot(self) -> 'LazyCases':
+        """Copy of the current state that later changes do not affect"""
+        return LazyCases(self.base, dict(self.overlay), set(self.deleted))
+
+    def entries(self) -> Iterator[tuple]:
+        """Indexed case file entries in case number order; base records are copied without decoding"""
+        base_entries = self.base.iter_entries(skip=self.deleted) if self.base is not None else ()
+        overlay_entries = (_record_entry(self.overlay[case_number]) for case_number in sorted(self.overlay))
+        return heapq.merge(base_entries, overlay_entries, key=lambda entry: entry[0])
+
+    def close(self) -> None:
+        if self.base is not None:
+            self.base.close()
+            self.base = None
+
+class LazyIndex(dict):
+    """Secondary index whose case number lists are read from an indexed case file
+    the first time a key is used. field None indexes every case under 'all'."""
+
+    def __init__(self, base: Optional[CaseFile], field: Optional[str]):
+        super().__init__()
+        self.base = base
+        self.field = field
+
+    def _from_base(self, key: Any) -> array:
+        if self.base is None:
+            return array('Q')
+        if self.field is None:
+            return array('Q', self.base.numbers.tobytes())
+        return self.base.group(self.field, key)
+
+    def get(self, key: Any, default=None):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        numbers = self._from_base(key)
+        if not numbers:
+            return default
+        dict.__setitem__(self, key, numbers)
+        return numbers
+
+    def setdefault(self, key: Any, default=None):
+        numbers = self.get(key)
+        if numbers is None:
+            numbers = default if default is not None else []
+            dict.__setitem__(self, key, numbers)
+        return numbers
+
+    def __delitem__(self, key: Any) -> None:
+        # Keep an empty entry so the stale list is not read from the file again
+        dict.__setitem__(self, key, [])
+
 class CaseTracker:
-    def __init__(self, data_file: str = 'data/cases.json'):
+    def __init__(self, data_file: str = 'data/cases.json', storage: Optional[str] = None):
         self.data_file = data_file
+        self.storage = storage or CASE_STORAGE
+        self.journal_file = os.path.splitext(data_file)[0] + '.journal.jsonl'
+        self.stats_file = os.path.splitext(data_file)[0] + '.stats.json'
+        self.index_file = os.path.splitext(data_file)[0] + '.idx'
+        self.archive = CaseArchive(os.path.join(os.path.dirname(data_file), 'case_archive'))
+        self.compacting_file = self.journal_file + '.compacting'
+        self._journal = None
+        self._journal_records = 0
+        self._unsynced_records = 0
+        self._last_fsync = time.monotonic()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Write-behind state
+        self._pending_changes = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._dirty_event: Optional[asyncio.Event] = None
+        self._flush_now_event: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_sequence = 0
+        self._written_sequence = 0
+        self.flush_count = 0
+        self.absorbed_saves = 0  # Changes written by write-behind flushes in total
+        self.flush_history = deque(maxlen=100)  # Changes absorbed by each recent flush
+
+        # Changes replayed from the journal as (previous, new) records, and the case count and
+        # highest case number of the snapshot they were replayed onto
+        self._replayed: List[tuple] = []
+        self._snapshot_watermark = (self.archive.count, self.archive.last_case)
+        self._index_loaded = False
+
         self.cases = self._load_cases()
         self.next_case_number = self._get_highest_case_number() + 1
 
-    def _load_cases(self) -> Dict[str, Any]:
-        """Load cases from JSON file"""
+        # Secondary indexes: key -> case numbers sorted ascending
+        self._all_index: Dict[str, List[int]] = {}
+        self._target_index: Dict[int, List[int]] = {}
+        self._moderator_index: Dict[int, List[int]] = {}
+        self._action_index: Dict[str, List[int]] = {}
+        self._build_indexes()
+        self._drop_archived_leftovers()
+
+        # Statistics rollups: day -> action -> moderator_id -> case count
+        self._rollups: Dict[str, Dict[str, Dict[int, int]]] = self._load_rollups()
+        self._replayed = []
+
+        if self._index_loaded:
+            # Left by the indexed mode, which does not keep the JSON snapshot current
+            self._save_cases()
+            self._remove_index_file()
+
+        if self.storage not in JOURNALED_STORAGE and self._journal_records:
+            # Fold journal entries left by the journal mode back into the snapshot
+            self._save_cases()
+            self._remove_journal_files()
+
+        if self.storage == STORAGE_INDEXED and self.cases.overlay and self.cases.base is None:
+            # First start in indexed mode: convert the JSON snapshot in the background
+            self.compact()
+
+        if ARCHIVE_AFTER_DAYS > 0:
+            self.archive_old_cases(ARCHIVE_AFTER_DAYS)
+
+    def _load_cases(self) -> MutableMapping:
+        """Load cases from the snapshot and replay any journal on top of it"""
+        if self.storage == STORAGE_INDEXED:
+            cases = self._open_index_file()
+        else:
+            cases = self._read_index_file() if os.path.exists(self.index_file) else None
+            self._index_loaded = cases is not None
+        if cases is None:
+            cases = self._read_json_snapshot()
+            if self.storage == STORAGE_INDEXED:
+                cases = LazyCases(None, cases)
+
+        highest = cases.highest if isinstance(cases, LazyCases) else max(cases, default=0)
+        self._snapshot_watermark = (len(cases) + self.archive.count, max(highest, self.archive.last_case))
+
+        # A leftover compacting file means a compaction was interrupted; it is older than the journal
+        for journal_file in (self.compacting_file, self.journal_file):
+            self._journal_records += self._replay_journal(journal_file, cases)
+        return cases
+
+    def _read_json_snapshot(self) -> Dict[int, CaseRecord]:
+        records = {}
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            else:
-                return {}
+            if not os.path.exists(self.data_file):
+                return records
+            with open(self.data_file, 'r') as f:
+                cases = json.load(f)
         except Exception as e:
             logger.error(f'Error loading cases: {e}')
-            return {}
+            return records
+
+        for case_id, case_data in cases.items():
+            try:
+                record = CaseRecord.from_dict(case_data)
+                records[record.case_number] = record
+            except Exception as e:
+                logger.error(f'Skipping unreadable case {case_id}: {e}')
+        return records
+
+    def _open_index_file(self) -> Optional[LazyCases]:
+        """Map the indexed case file, reading only its header"""
+        if not os.path.exists(self.index_file):
+            return None
+        try:
+            return LazyCases(CaseFile(self.index_file))
+        except Exception as e:
+            logger.error(f'Error opening indexed case file: {e}')
+            return None
+
+    def _read_index_file(self) -> Optional[Dict[int, CaseRecord]]:
+        """Decode every case in the indexed case file"""
+        cases = self._open_index_file()
+        if cases is None:
+            return None
+        try:
+            return {case_number: cases[case_number] for case_number in cases}
+        except Exception as e:
+            logger.error(f'Error reading indexed case file: {e}')
+            return None
+        finally:
+            cases.close()
+
+    def _remove_index_file(self) -> None:
+        try:
+            os.remove(self.index_file)
+        except Exception as e:
+            logger.error(f'Error removing {self.index_file}: {e}')
+        self._index_loaded = False
+
+    def _replay_journal(self, journal_file: str, cases: MutableMapping) -> int:
+        """Apply journal records to cases, returns the number of records applied"""
+        if not os.path.exists(journal_file):
+            return 0
+
+        applied = 0
+        try:
+            with open(journal_file, 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Only the last line can be torn by a crash mid-write
+                        logger.warning(f'Skipping unreadable record on line {line_number} of {journal_file}')
+                        continue
+
+                    if record.get('op') == 'save':
+                        case = CaseRecord.from_dict(record['case'])
+                        self._replayed.append((cases.get(case.case_number), case))
+                        cases[case.case_number] = case
+                    elif record.get('op') == 'delete':
+                        previous = cases.pop(int(record['case_number']), None)
+                        if previous is None and record.get('archived'):
+                            # An archived case; the record carries it so the rollups can drop it too
+                            previous = CaseRecord.from_dict(record['archived'])
+                        if previous is not None:
+                            self._replayed.append((previous, None))
+                    applied += 1
+        except Exception as e:
+            logger.error(f'Error replaying journal {journal_file}: {e}')
+
+        return applied
 
     def _save_cases(self) -> None:
         """Save cases to JSON file"""
@@ -31,119 +405,727 @@ class CaseTracker:
             os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
             
             with open(self.data_file, 'w') as f:
-                json.dump(self.cases, f, indent=2)
+                json.dump(self._serialize(self.cases), f, indent=2)
+            self._write_rollups_file(self._rollups, len(self.cases), max(self.cases, default=0))
         except Exception as e:
             logger.error(f'Error saving cases: {e}')
 
+    def _load_rollups(self) -> Dict[str, Dict[str, Dict[int, int]]]:
+        """Load persisted rollups and apply replayed journal changes to them,
+        rebuilding them when they do not match the snapshot they were written with"""
+        try:
+            if os.path.exists(self.stats_file):
+                with open(self.stats_file, 'r') as f:
+                    stored = json.load(f)
+                if (stored.get('case_count'), stored.get('highest_case')) == self._snapshot_watermark:
+                    self._rollups = {
+                        day: {
+                            action: {int(moderator_id): count for moderator_id, count in moderators.items()}
+                            for action, moderators in actions.items()
+                        }
+                        for day, actions in stored.get('days', {}).items()
+                    }
+                    for previous, record in self._replayed:
+                        if previous is not None:
+                            self._rollup_case(previous, -1)
+                        if record is not None:
+                            self._rollup_case(record, 1)
+                    return self._rollups
+        except Exception as e:
+            logger.error(f'Error loading case statistics: {e}')
+
+        # Missing or stale (e.g. written before an interrupted archival): rebuild once
+        self._rollups = {}
+        for case_data in self.archive.iter_all():
+            self._rollup_case(CaseRecord.from_dict(case_data), 1)
+        for record in self.cases.values():
+            self._rollup_case(record, 1)
+        if self.storage not in JOURNALED_STORAGE:
+            self._write_rollups_file(self._rollups, len(self.cases), self._get_highest_case_number())
+        return self._rollups
+
+    def _write_rollups_file(self, rollups: Dict[str, Any], case_count: int, highest_case: int,
+                            archive_watermark: Optional[tuple] = None) -> None:
+        """Atomically write rollups along with the hot case count and highest case number they cover.
+        archive_watermark is the archive's (count, last case) when the rollups were copied, default now."""
+        archive_count, archive_last = archive_watermark or (self.archive.count, self.archive.last_case)
+        try:
+            os.makedirs(os.path.dirname(self.stats_file), exist_ok=True)
+            temp_file = self.stats_file + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump({
+                    'case_count': case_count + archive_count,
+                    'highest_case': max(highest_case, archive_last),
+                    'days': rollups
+                }, f)
+            os.replace(temp_file, self.stats_file)
+        except Exception as e:
+            logger.error(f'Error saving case statistics: {e}')
+
+    def _rollup_case(self, record: CaseRecord, delta: int) -> None:
+        """Add (delta=1) or remove (delta=-1) a case from the statistics rollups"""
+        actions = self._rollups.setdefault(record.day, {})
+        moderators = actions.setdefault(record.action, {})
+        count = moderators.get(record.moderator_id, 0) + delta
+        if count > 0:
+            moderators[record.moderator_id] = count
+            return
+
+        moderators.pop(record.moderator_id, None)
+        if not moderators:
+            del actions[record.action]
+        if not actions:
+            del self._rollups[record.day]
+
+    def _copy_rollups(self) -> Dict[str, Dict[str, Dict[int, int]]]:
+        return {day: {action: dict(moderators) for action, moderators in actions.items()}
+                for day, actions in self._rollups.items()}
+
+    @staticmethod
+    def _serialize(cases: Dict[int, CaseRecord]) -> Dict[str, Any]:
+        """Convert records to the cases.json layout"""
+        return {str(case_number): record.to_dict() for case_number, record in cases.items()}
+
+    def _persist(self, *records: Dict[str, Any]) -> None:
+        """Persist changes using the configured storage mode, writing a batch of them at once"""
+        if self.storage in JOURNALED_STORAGE:
+            self._append_journal(records)
+        elif self.storage == STORAGE_WRITE_BEHIND:
+            self._mark_dirty()
+        else:
+            self._save_cases()
+
+    def _next_snapshot(self) -> tuple:
+        """Copy the cases and rollups for writing, tagged with an increasing sequence number and
+        the archive's watermark at the same moment, since the archive can change before the write"""
+        self._snapshot_sequence += 1
+        cases = self.cases.snapshot() if isinstance(self.cases, LazyCases) else dict(self.cases)
+        return (self._snapshot_sequence, cases, self._copy_rollups(),
+                (self.archive.count, self.archive.last_case))
+
+    def _write_snapshot_file(self, sequence: int, snapshot: MutableMapping, rollups: Dict[str, Any],
+                             archive_watermark: tuple) -> bool:
+        """Write a snapshot to a temp file and rename it over the data file (the
+        indexed case file in indexed mode). Snapshots older than the last one written are skipped."""
+        with self._snapshot_lock:
+            if sequence <= self._written_sequence:
+                return False
+
+            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+            if isinstance(snapshot, LazyCases):
+                write_case_file(self.index_file, snapshot.entries())
+                highest = snapshot.highest
+            else:
+                temp_file = self.data_file + '.tmp'
+                with open(temp_file, 'w') as f:
+                    json.dump(self._serialize(snapshot), f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.data_file)
+                highest = max(snapshot, default=0)
+            self._write_rollups_file(rollups, len(snapshot), highest, archive_watermark)
+            self._written_sequence = sequence
+            return True
+
+    def _mark_dirty(self) -> None:
+        """Record a pending change and wake the write-behind flusher"""
+        self._pending_changes += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, tests): nothing can flush later, so write now
+            self._flush_blocking()
+            return
+
+        if self._flush_task is None or self._flush_task.done():
+            self._dirty_event = asyncio.Event()
+            self._flush_now_event = asyncio.Event()
+            # Outlives the command that made the first change, so don't inherit its metrics and trace context
+            self._flush_task = asyncio.create_task(self._flush_loop(), context=contextvars.Context())
+
+        self._dirty_event.set()
+        if self._pending_changes >= WRITE_BEHIND_MAX_PENDING:
+            self._flush_now_event.set()
+
+    async def _flush_loop(self) -> None:
+        """Flush at most once per interval, or early once enough changes are pending"""
+        while True:
+            await self._dirty_event.wait()
+            try:
+                await asyncio.wait_for(self._flush_now_event.wait(), timeout=WRITE_BEHIND_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    @traced()
+    async def flush(self) -> int:
+        """Write pending write-behind changes, returns how many changes the flush absorbed"""
+        async with self._flush_lock:
+            if self._dirty_event is not None:
+                self._dirty_event.clear()
+                self._flush_now_event.clear()
+
+            absorbed = self._pending_changes
+            if not absorbed:
+                return 0
+
+            self._pending_changes = 0
+            snapshot = self._next_snapshot()
+            try:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._write_snapshot_file, *snapshot)
+            except Exception as e:
+                logger.error(f'Error flushing cases: {e}')
+                # Keep the changes pending so the next flush retries them
+                self._pending_changes += absorbed
+                self._dirty_event.set()
+                return 0
+
+            self._record_flush(absorbed)
+            return absorbed
+
+    def _flush_blocking(self, force: bool = False) -> int:
+        """Write pending write-behind changes on the calling thread"""
+        absorbed = self._pending_changes
+        if not absorbed and not force:
+            return 0
+
+        try:
+            self._write_snapshot_file(*self._next_snapshot())
+        except Exception as e:
+            logger.error(f'Error flushing cases: {e}')
+            return 0
+
+        self._pending_changes = 0
+        self._record_flush(absorbed)
+        return absorbed
+
+    def _record_flush(self, absorbed: int) -> None:
+        self.flush_count += 1
+        self.absorbed_saves += absorbed
+        self.flush_history.append(absorbed)
+        logger.debug(f'Flushed cases to {self.data_file}, absorbed {absorbed} changes')
+
+    def _append_journal(self, records: tuple) -> None:
+        """Append records to the journal, fsyncing in batches"""
+        try:
+            with self._lock:
+                if self._journal is None:
+                    os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+                    self._journal = open(self.journal_file, 'a')
+
+                self._journal.write(''.join(json.dumps(record) + '\n' for record in records))
+                self._journal.flush()
+                self._journal_records += len(records)
+                self._unsynced_records += len(records)
+
+                if (self._unsynced_records >= JOURNAL_FSYNC_BATCH
+                        or time.monotonic() - self._last_fsync >= JOURNAL_FSYNC_INTERVAL):
+                    self._fsync_journal()
+
+            if self._journal_records >= JOURNAL_COMPACT_THRESHOLD:
+                self.compact()
+        except Exception as e:
+            logger.error(f'Error appending to case journal: {e}')
+
+    def _fsync_journal(self) -> None:
+        """Force buffered journal records to disk (caller holds the lock)"""
+        if self._journal is not None and self._unsynced_records:
+            os.fsync(self._journal.fileno())
+        self._unsynced_records = 0
+        self._last_fsync = time.monotonic()
+
+    @traced()
+    def compact(self) -> bool:
+        """Write a fresh snapshot in a background thread and start a new journal.
+        Returns False if a compaction is already running."""
+        with self._lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return False
+
+            if self._journal is not None:
+                self._fsync_journal()
+                self._journal.close()
+                self._journal = None
+
+            if os.path.exists(self.journal_file):
+                if os.path.exists(self.compacting_file):
+                    # Keep the older records ahead of the newer ones
+                    with open(self.compacting_file, 'a') as old, open(self.journal_file, 'r') as new:
+                        old.write(new.read())
+                    os.remove(self.journal_file)
+                else:
+                    os.replace(self.journal_file, self.compacting_file)
+
+            self._journal_records = 0
+            self._compaction_thread = threading.Thread(
+                target=self._write_snapshot, args=self._next_snapshot(), name='case-compaction', daemon=True
+            )
+            self._compaction_thread.start()
+            return True
+
+    def _write_snapshot(self, sequence: int, snapshot: MutableMapping, rollups: Dict[str, Any],
+                        archive_watermark: tuple) -> None:
+        """Atomically replace the snapshot file, then drop the compacted journal"""
+        try:
+            self._write_snapshot_file(sequence, snapshot, rollups, archive_watermark)
+
+            if os.path.exists(self.compacting_file):
+                os.remove(self.compacting_file)
+            snapshot_file = self.index_file if isinstance(snapshot, LazyCases) else self.data_file
+            logger.info(f'Case journal compacted into {snapshot_file} ({len(snapshot)} cases)')
+        except Exception as e:
+            logger.error(f'Error compacting case journal: {e}')
+
+    def _remove_journal_files(self) -> None:
+        """Delete journal files once their contents are part of the snapshot"""
+        for journal_file in (self.compacting_file, self.journal_file):
+            try:
+                if os.path.exists(journal_file):
+                    os.remove(journal_file)
+            except Exception as e:
+                logger.error(f'Error removing {journal_file}: {e}')
+        self._journal_records = 0
+
+    def close(self) -> None:
+        """Sync the journal, write pending write-behind changes and wait for background writes"""
+        if self.storage == STORAGE_WRITE_BEHIND:
+            # A flush cut short by the cancel may not have reached disk, so rewrite in that case too;
+            # the sequence check keeps the older in-flight write from landing on top of this one
+            in_flight = self._flush_lock.locked()
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+                self._flush_task = None
+            self._flush_blocking(force=in_flight)
+
+        with self._lock:
+            if self._journal is not None:
+                self._fsync_journal()
+                self._journal.close()
+                self._journal = None
+            thread = self._compaction_thread
+
+        if thread is not None:
+            thread.join()
+
+        if isinstance(self.cases, LazyCases):
+            self.cases.close()
+        self.archive.close()
+
+    def _persist_snapshot(self) -> None:
+        """Write the full hot set now, whatever the storage mode"""
+        if self.storage in JOURNALED_STORAGE:
+            self.compact()
+        elif self.storage == STORAGE_WRITE_BEHIND:
+            self._flush_blocking(force=True)
+        else:
+            self._save_cases()
+
+    def archive_old_cases(self, max_age_days: int) -> int:
+        """Move cases older than max_age_days into a new archive segment, returns how many moved.
+
+        Only a run of the lowest case numbers is archived, stopping at the first
+        recent case, so every archived case number is below every hot one.
+        """
+        try:
+            cutoff = time.time() - max_age_days * 86400
+            expired = []
+            for case_number in self._all_index.get('all', ()):
+                record = self.cases[case_number]
+                if record.timestamp >= cutoff:
+                    break
+                expired.append(record)
+
+            if not expired:
+                return 0
+
+            self.archive.write_segment([record.to_dict() for record in expired])
+            for record in expired:
+                # Rollups keep counting archived cases, so only the hot set changes
+                self._unindex_case(self.cases.pop(record.case_number))
+            self._persist_snapshot()
+            logger.info(f'Archived {len(expired)} cases older than {max_age_days} days')
+            return len(expired)
+        except Exception as e:
+            logger.error(f'Error archiving old cases: {e}')
+            return 0
+
+    def _build_indexes(self) -> None:
+        """Build the secondary indexes from the loaded cases"""
+        if not isinstance(self.cases, LazyCases) or self.cases.base is None:
+            # Everything is in memory already (without an indexed file, LazyCases holds it all in its overlay)
+            for case_number in sorted(self.cases):
+                self._index_case(self.cases[case_number])
+            return
+
+        # Read from the indexed case file key by key, then bring up to date with the journal
+        base = self.cases.base
+        self._all_index = LazyIndex(base, None)
+        self._target_index = LazyIndex(base, 'target_id')
+        self._moderator_index = LazyIndex(base, 'moderator_id')
+        self._action_index = LazyIndex(base, 'action')
+        for previous, record in self._replayed:
+            if previous is not None:
+                self._unindex_case(previous)
+            if record is not None:
+                self._index_case(record)
+
+    def _drop_archived_leftovers(self) -> None:
+        """Drop cases still in the snapshot after an archival interrupted before it was rewritten"""
+        if not self.archive.segments:
+            return
+        numbers = self._all_index.get('all', ())
+        for case_number in list(numbers[:bisect_right(numbers, self.archive.last_case)]):
+            self._unindex_case(self.cases.pop(case_number))
+
+    def _index_entries(self, record: CaseRecord):
+        """Yield (index, key) pairs a case belongs to"""
+        yield self._all_index, 'all'
+        yield self._target_index, record.target_id
+        yield self._moderator_index, record.moderator_id
+        yield self._action_index, record.action
+
+    def _index_case(self, record: CaseRecord) -> None:
+        """Add a case to the secondary indexes"""
+        case_number = record.case_number
+        for index, key in self._index_entries(record):
+            numbers = index.setdefault(key, [])
+            # Case numbers mostly arrive in order, so this is usually an append
+            if not numbers or numbers[-1] < case_number:
+                numbers.append(case_number)
+            else:
+                insort(numbers, case_number)
+
+    def _unindex_case(self, record: CaseRecord) -> None:
+        """Remove a case from the secondary indexes"""
+        case_number = record.case_number
+        for index, key in self._index_entries(record):
+            numbers = index.get(key)
+            if not numbers:
+                continue
+            position = bisect_left(numbers, case_number)
+            if position < len(numbers) and numbers[position] == case_number:
+                del numbers[position]
+            if not numbers:
+                del index[key]
+
+    def _cases_from_index(self, index: Dict[Any, List[int]], key: Any, field: str) -> list:
+        """Resolve an index entry to case data, sorted by case number, including archived matches"""
+        archived = [self.archive.get(case_number) for case_number in self.archive.case_numbers(field, key)]
+        # Archived case numbers are all lower than hot ones, so this stays sorted
+        return archived + [self.cases[case_number].to_dict() for case_number in index.get(key, ())]
+
+    async def iter_cases(self, target_id: Optional[int] = None, moderator_id: Optional[int] = None,
+                         action: Optional[str] = None, since: Optional[datetime] = None,
+                         until: Optional[datetime] = None, cursor: Optional[int] = None,
+                         newest_first: bool = True):
+        """Yield matching cases one at a time in case number order.
+
+        cursor is the case number of the last case already seen; iteration resumes
+        after it. Archived cases are numbered below hot ones, so they are read
+        after the hot set when walking newest first and before it otherwise.
+        """
+        filters = {field: value for field, value in (('target_id', target_id), ('moderator_id', moderator_id), ('action', action))
+                   if value is not None}
+        hot = self._iter_hot(filters, since, until, cursor, newest_first)
+        archived = self._iter_archived(filters, since, until, cursor, newest_first)
+        for source in ((hot, archived) if newest_first else (archived, hot)):
+            async for case_data in source:
+                yield case_data
+
+    async def _iter_archived(self, filters: Dict[str, Any], since: Optional[datetime], until: Optional[datetime],
+                             cursor: Optional[int], newest_first: bool):
+        """Yield archived matches, decoding segments only as the caller reaches them"""
+        if not self.archive.segments:
+            return
+        since_iso = _to_naive_utc(since).isoformat() if since else None
+        until_iso = _to_naive_utc(until).isoformat() if until else None
+        for count, case_data in enumerate(self.archive.iter_cases(filters, since_iso, until_iso, cursor, newest_first), 1):
+            yield case_data
+            if count % 64 == 0:
+                await asyncio.sleep(0)
+
+    async def _iter_hot(self, filters: Dict[str, Any], since: Optional[datetime], until: Optional[datetime],
+                        cursor: Optional[int], newest_first: bool):
+        """Walk the smallest matching index, re-seeking it on every step so cases
+        saved or deleted while the iterator is suspended are handled"""
+        target_id = filters.get('target_id')
+        moderator_id = filters.get('moderator_id')
+        action = filters.get('action')
+        candidates = [(self._all_index, 'all')]
+        if target_id is not None:
+            candidates.append((self._target_index, target_id))
+        if moderator_id is not None:
+            candidates.append((self._moderator_index, moderator_id))
+        if action is not None:
+            candidates.append((self._action_index, action))
+        index, key = min(candidates, key=lambda candidate: len(candidate[0].get(candidate[1], ())))
+
+        since_epoch = _to_epoch(since) if since else None
+        until_epoch = _to_epoch(until) if until else None
+        last = cursor
+        scanned = 0
+
+        while True:
+            numbers = index.get(key, ())
+            if newest_first:
+                position = (bisect_left(numbers, last) if last is not None else len(numbers)) - 1
+                if position < 0:
+                    return
+            else:
+                position = bisect_right(numbers, last) if last is not None else 0
+                if position >= len(numbers):
+                    return
+            last = numbers[position]
+
+            scanned += 1
+            if scanned % 256 == 0:
+                # Sparse filters can scan far between matches; let other tasks run
+                await asyncio.sleep(0)
+
+            record = self.cases.get(last)
+            if record is None:
+                continue
+            if target_id is not None and record.target_id != target_id:
+                continue
+            if moderator_id is not None and record.moderator_id != moderator_id:
+                continue
+            if action is not None and record.action != action:
+                continue
+            if since_epoch is not None and record.timestamp < since_epoch:
+                continue
+            if until_epoch is not None and record.timestamp >= until_epoch:
+                continue
+            yield record.to_dict()
+
     def _get_highest_case_number(self) -> int:
         """Get the highest existing case number"""
         try:
             if not self.cases:
-                return 0
+                return self.archive.last_case
             
-            case_numbers = [int(case_id) for case_id in self.cases.keys() if case_id.isdigit()]
-            return max(case_numbers) if case_numbers else 0
+            if isinstance(self.cases, LazyCases):
+                return self.cases.highest
+            return max(self.cases)
         except Exception as e:
             logger.error(f'Error getting highest case number: {e}')
             return 0
 
+    @traced()
     def get_next_case_number(self) -> int:
         """Get the next available case number"""
-        case_number = self.next_case_number
-        self.next_case_number += 1
-        return case_number
+        with self._lock:
+            case_number = self.next_case_number
+            self.next_case_number += 1
+            return case_number
+
+    def _store_case(self, case_number: int, action: str, target_id: int, moderator_id: int, reason: str) -> Dict[str, Any]:
+        """Add or replace a case in memory, returns the journal record for it"""
+        record = CaseRecord(case_number, action, target_id, moderator_id, reason, time.time())
 
+        previous = self.cases.get(case_number)
+        if previous:
+            self._unindex_case(previous)
+            self._rollup_case(previous, -1)
+        self.cases[case_number] = record
+        self._index_case(record)
+        self._rollup_case(record, 1)
+        AUDIT_LOG.record(AUDIT_CASE, moderator_id, f'save {action}', target_id, f'#{case_number} {reason}')
+        return {'op': 'save', 'case': record.to_dict()}
+
+    @traced()
     def save_case(self, case_number: int, action: str, target_id: int, moderator_id: int, reason: str) -> None:
         """Save a moderation case"""
         try:
-            case_data = {
-                'case_number': case_number,
-                'action': action,
-                'target_id': target_id,
-                'moderator_id': moderator_id,
-                'reason': reason,
-                'timestamp': datetime.utcnow().isoformat(),
-                'created_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
-            }
-            
-            self.cases[str(case_number)] = case_data
-            self._save_cases()
-            
+            self._persist(self._store_case(case_number, action, target_id, moderator_id, reason))
             logger.info(f'Case #{case_number} saved: {action} by {moderator_id} on {target_id}')
             
         except Exception as e:
             logger.error(f'Error saving case #{case_number}: {e}')
 
+    @traced()
+    def save_cases(self, cases: List[tuple]) -> int:
+        """Save many (case_number, action, target_id, moderator_id, reason) cases with a single write,
+        returns how many were saved"""
+        try:
+            self._persist(*[self._store_case(*case) for case in cases])
+            logger.info(f'Saved {len(cases)} cases')
+            return len(cases)
+        except Exception as e:
+            logger.error(f'Error saving {len(cases)} cases: {e}')
+            return 0
+
+    @traced()
     def get_case(self, case_number: int) -> Dict[str, Any]:
         """Get a specific case by number"""
         try:
-            return self.cases.get(str(case_number), {})
+            record = self.cases.get(int(case_number))
+            if record:
+                return record.to_dict()
+            return self.archive.get(int(case_number)) or {}
         except Exception as e:
             logger.error(f'Error getting case #{case_number}: {e}')
             return {}
 
+    @traced()
     def get_cases_by_target(self, target_id: int) -> list:
         """Get all cases for a specific target"""
         try:
-            target_cases = []
-            for case_data in self.cases.values():
-                if case_data.get('target_id') == target_id:
-                    target_cases.append(case_data)
-            
-            # Sort by case number
-            target_cases.sort(key=lambda x: x.get('case_number', 0))
-            return target_cases
-            
+            return self._cases_from_index(self._target_index, target_id, 'target_id')
         except Exception as e:
             logger.error(f'Error getting cases for target {target_id}: {e}')
             return []
 
+    @traced()
     def get_cases_by_moderator(self, moderator_id: int) -> list:
         """Get all cases by a specific moderator"""
         try:
-            moderator_cases = []
-            for case_data in self.cases.values():
-                if case_data.get('moderator_id') == moderator_id:
-                    moderator_cases.append(case_data)
-            
-            # Sort by case number
-            moderator_cases.sort(key=lambda x: x.get('case_number', 0))
-            return moderator_cases
-            
+            return self._cases_from_index(self._moderator_index, moderator_id, 'moderator_id')
         except Exception as e:
             logger.error(f'Error getting cases by moderator {moderator_id}: {e}')
             return []
 
+    @traced()
     def get_total_cases(self) -> int:
         """Get total number of cases"""
-        return len(self.cases)
+        return len(self.cases) + self.archive.count
 
+    @traced()
     def get_cases_by_action(self, action: str) -> list:
         """Get all cases of a specific action type"""
         try:
-            action_cases = []
-            for case_data in self.cases.values():
-                if case_data.get('action') == action:
-                    action_cases.append(case_data)
-            
-            # Sort by case number
-            action_cases.sort(key=lambda x: x.get('case_number', 0))
-            return action_cases
-            
+            return self._cases_from_index(self._action_index, action, 'action')
         except Exception as e:
             logger.error(f'Error getting cases by action {action}: {e}')
             return []
 
+    @traced()
+    def get_case_stats(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                       moderator_id: Optional[int] = None, action: Optional[str] = None) -> Dict[str, Any]:
+        """Count cases per action and per moderator from the daily rollups.
+
+        Bounds are whole UTC days (until is exclusive), so the cost depends on the
+        number of days with cases, not on the number of cases.
+        """
+        since_day, until_day = _day_bounds(since, until)
+        by_action: Dict[str, int] = {}
+        by_moderator: Dict[int, int] = {}
+        total = 0
+
+        for day, actions in self._rollups.items():
+            if (since_day and day < since_day) or (until_day and day >= until_day):
+                continue
+            for action_name, moderators in actions.items():
+                if action is not None and action_name != action:
+                    continue
+                for moderator, count in moderators.items():
+                    if moderator_id is not None and moderator != moderator_id:
+                        continue
+                    by_action[action_name] = by_action.get(action_name, 0) + count
+                    by_moderator[moderator] = by_moderator.get(moderator, 0) + count
+                    total += count
+
+        return {'total': total, 'by_action': by_action, 'by_moderator': by_moderator}
+
+    @traced()
     def delete_case(self, case_number: int) -> bool:
         """Delete a case (admin only)"""
         try:
-            if str(case_number) in self.cases:
-                del self.cases[str(case_number)]
-                self._save_cases()
+            if case_number in self.cases:
+                record = self.cases.pop(case_number)
+                self._unindex_case(record)
+                self._rollup_case(record, -1)
+                self._persist({'op': 'delete', 'case_number': case_number})
+                AUDIT_LOG.record(AUDIT_CASE, None, f'delete {record.action}', record.target_id, f'#{case_number}')
                 logger.info(f'Case #{case_number} deleted')
                 return True
+
+            archived = self.archive.delete(case_number)
+            if archived:
+                self._rollup_case(CaseRecord.from_dict(archived), -1)
+                self._persist({'op': 'delete', 'case_number': case_number, 'archived': archived})
+                AUDIT_LOG.record(AUDIT_CASE, None, f"delete {archived['action']}", archived['target_id'], f'#{case_number}')
+                logger.info(f'Archived case #{case_number} deleted')
+                return True
             return False
             
         except Exception as e:
             logger.error(f'Error deleting case #{case_number}: {e}')
             return False
+
+def _to_naive_utc(moment: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC, leaving naive ones (already UTC) alone"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def _to_epoch(moment: datetime) -> float:
+    """Epoch seconds for a datetime, treating naive values as UTC like the stored timestamps"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+def _day_bounds(since: Optional[datetime], until: Optional[datetime]) -> tuple:
+    """UTC YYYY-MM-DD strings for optional datetime bounds"""
+    def day(moment):
+        if moment is None:
+            return None
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc)
+        return moment.date().isoformat()
+
+    return day(since), day(until)
+
+def create_case_tracker(backend: Optional[str] = None, data_file: str = 'data/cases.json'):
+    """Build the case store selected by CASE_BACKEND"""
+    backend = backend or CASE_BACKEND
+    if backend == BACKEND_SQLITE:
+        from bot.utils.sqlite_case_tracker import SQLiteCaseTracker
+
+        fresh = not os.path.exists(CASE_DB_FILE)
+        tracker = SQLiteCaseTracker(CASE_DB_FILE)
+        if fresh:
+            # New database: bring over the JSON store's history once. Load it in full so cases still
+            # in its journal, indexed file or archive segments come along, not just cases.json
+            source = CaseTracker(data_file)
+            try:
+                tracker.import_case_tracker_blocking(source)
+            except Exception:
+                # Leave no half-imported database behind, or the next start would skip the import
+                tracker.close()
+                for path in (CASE_DB_FILE, CASE_DB_FILE + '-wal', CASE_DB_FILE + '-shm'):
+                    if os.path.exists(path):
+                        os.remove(path)
+                raise
+            finally:
+                source.close()
+        return tracker
+
+    return CaseTracker(data_file)
+
+def get_case_tracker(bot):
+    """Get the process-wide case store attached to the bot, creating it on first use"""
+    tracker = getattr(bot, 'case_tracker', None)
+    if tracker is None:
+        tracker = create_case_tracker()
+        bot.case_tracker = tracker
+    return tracker
+
+async def maybe_await(result):
+    """Resolve a case store call whether the backend is sync (JSON) or async (SQLite)"""
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+async def fetch_case_page(store, limit: int = 10, cursor: Optional[int] = None, **filters) -> tuple:
+    """Collect one page from store.iter_cases.
+
+    Returns (cases, next_cursor); next_cursor is None on the last page.
+    """
+    cases = []
+    async with aclosing(store.iter_cases(cursor=cursor, **filters)) as matches:
+        async for case_data in matches:
+            if len(cases) == limit:
+                return cases, cases[-1]['case_number']
+            cases.append(case_data)
+    return cases, None
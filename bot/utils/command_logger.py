@@ -1,49 +1,138 @@
 import discord
+import asyncio
+import contextvars
 import logging
+from collections import deque
+from typing import Optional
+from bot.utils.audit_log import AUDIT_LOG, AUDIT_ACTION
 
 logger = logging.getLogger(__name__)
 
 COMMAND_LOG_CHANNEL_ID = 1393756933957226506
+LOG_BATCH_SIZE = 10  # Most embeds Discord accepts in one message
+LOG_FLUSH_INTERVAL = 2.0  # Seconds the oldest queued embed may wait before a partial batch is sent
+LOG_BATCH_CHARS = 6000  # Discord's limit on the combined text of a message's embeds
+LOG_QUEUE_MAX = 500  # Queued embeds before the oldest are dropped
+
+class CommandLogSink:
+    """Queue of command log embeds, sent to the log channel in batches by one background task.
+
+    A batch goes out once LOG_BATCH_SIZE embeds are queued or the oldest has waited
+    LOG_FLUSH_INTERVAL seconds. When the channel can't keep up and the queue is full,
+    the oldest embed is dropped so recent activity is kept.
+    """
+
+    def __init__(self, bot, channel_id: int = COMMAND_LOG_CHANNEL_ID, max_queued: int = LOG_QUEUE_MAX):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.queue = deque(maxlen=max_queued)
+        self.dropped = 0
+        self.sent = 0
+        self._ready: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._draining = False
+
+    @property
+    def depth(self) -> int:
+        return len(self.queue)
+
+    def put(self, embed: discord.Embed) -> None:
+        """Queue an embed and return at once"""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1  # deque(maxlen) evicts the oldest on append
+        self.queue.append(embed)
+        if self._worker is None or self._worker.done():
+            self._ready = asyncio.Event()
+            # Empty context, so batches aren't counted against (or traced under) whichever command queued first
+            self._worker = asyncio.create_task(self._run(), context=contextvars.Context())
+        if len(self.queue) >= LOG_BATCH_SIZE:
+            self._ready.set()
+
+    async def _run(self) -> None:
+        while self.queue:
+            if len(self.queue) < LOG_BATCH_SIZE and not self._draining:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout=LOG_FLUSH_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+            self._ready.clear()
+            await self._send_batch()
+
+    async def _send_batch(self) -> None:
+        batch = []
+        size = 0
+        while self.queue and len(batch) < LOG_BATCH_SIZE and (not batch or size + len(self.queue[0]) <= LOG_BATCH_CHARS):
+            embed = self.queue.popleft()
+            size += len(embed)
+            batch.append(embed)
+        if not batch:
+            return
+        try:
+            log_channel = self.bot.get_channel(self.channel_id)
+            if log_channel:
+                await log_channel.send(embeds=batch)
+                self.sent += len(batch)
+        except Exception as e:
+            logger.error(f"Failed to log command usage: {e}")
+
+    async def drain(self) -> None:
+        """Send everything still queued without waiting out the flush interval, for shutdown"""
+        self._draining = True
+        if self._worker is not None and not self._worker.done():
+            self._ready.set()
+            await self._worker
+        while self.queue:
+            await self._send_batch()
+
+def get_log_sink(bot) -> CommandLogSink:
+    """Get the command log sink attached to the bot, creating it on first use"""
+    sink = getattr(bot, 'command_log_sink', None)
+    if sink is None:
+        sink = CommandLogSink(bot)
+        bot.command_log_sink = sink
+        # Imported here: metrics pulls in the auto-defer and tracing settings, which main.py reads after load_dotenv
+        from bot.utils.metrics import REGISTRY
+        REGISTRY.log_sink = sink  # Queue depth and drops on /metrics
+    return sink
 
 async def log_command_usage(bot, interaction: discord.Interaction, command_name: str, additional_info: str = ""):
-    """Log command usage to the designated channel"""
+    """Log command usage to the designated channel and the audit log; the embed is queued and sent in a batch"""
     try:
-        log_channel = bot.get_channel(COMMAND_LOG_CHANNEL_ID)
-        if log_channel:
-            embed = discord.Embed(
-                title="🔧 Command Used",
-                color=discord.Color.blue(),
-                timestamp=discord.utils.utcnow()
-            )
-            
-            embed.add_field(
-                name="Command", 
-                value=f"`/{command_name}`", 
-                inline=True
-            )
-            
-            embed.add_field(
-                name="User", 
-                value=f"{interaction.user.mention} ({interaction.user.name})", 
-                inline=True
-            )
-            
+        embed = discord.Embed(
+            title="🔧 Command Used",
+            color=discord.Color.blue(),
+            timestamp=discord.utils.utcnow()
+        )
+
+        embed.add_field(
+            name="Command",
+            value=f"`/{command_name}`",
+            inline=True
+        )
+
+        embed.add_field(
+            name="User",
+            value=f"{interaction.user.mention} ({interaction.user.name})",
+            inline=True
+        )
+
+        embed.add_field(
+            name="Channel",
+            value=f"{interaction.channel.mention}",
+            inline=True
+        )
+
+        if additional_info:
             embed.add_field(
-                name="Channel", 
-                value=f"{interaction.channel.mention}", 
-                inline=True
+                name="Details",
+                value=additional_info,
+                inline=False
             )
-            
-            if additional_info:
-                embed.add_field(
-                    name="Details", 
-                    value=additional_info, 
-                    inline=False
-                )
-            
-            embed.set_footer(text=f"User ID: {interaction.user.id}")
-            
-            await log_channel.send(embed=embed)
-            
+
+        embed.set_footer(text=f"User ID: {interaction.user.id}")
+
+        get_log_sink(bot).put(embed)
+        AUDIT_LOG.record(AUDIT_ACTION, interaction.user.id, command_name, details=additional_info)
+
     except Exception as e:
-        logger.error(f"Failed to log command usage: {e}")
\ No newline at end of file
+        logger.error(f"Failed to log command usage: {e}")
@@ -0,0 +1,84 @@
+import json
+import os
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOCKDOWN_FILE = os.getenv('LOCKDOWN_FILE', 'data/lockdown.json')
+
+# A channel's overwrite for the locked role before the lockdown, as (allow, deny)
+# permission values, or None when the channel had no overwrite for it
+Snapshot = Dict[int, Optional[Tuple[int, int]]]
+
+class LockdownStore:
+    """Overwrite snapshots of guilds in lockdown, persisted so /unlockdown works after a restart.
+
+    A snapshot is written before any channel is changed, and channels are dropped
+    from it only once they are restored.
+    """
+
+    def __init__(self, data_file: str = LOCKDOWN_FILE):
+        self.data_file = data_file
+        self.snapshots: Dict[int, dict] = self._load()  # guild_id -> {'role_id': int, 'channels': Snapshot}
+
+    def _load(self) -> Dict[int, dict]:
+        """Load snapshots from JSON file"""
+        try:
+            if os.path.exists(self.data_file):
+                with open(self.data_file, 'r') as f:
+                    data = json.load(f)
+                return {
+                    int(guild_id): {
+                        'role_id': entry['role_id'],
+                        'channels': {int(channel_id): tuple(pair) if pair is not None else None
+                                     for channel_id, pair in entry['channels'].items()}
+                    }
+                    for guild_id, entry in data.items()
+                }
+        except Exception as e:
+            logger.error(f'Error loading lockdown snapshots: {e}')
+        return {}
+
+    def _save(self) -> None:
+        data = {
+            str(guild_id): {
+                'role_id': entry['role_id'],
+                'channels': {str(channel_id): list(pair) if pair is not None else None
+                             for channel_id, pair in entry['channels'].items()}
+            }
+            for guild_id, entry in self.snapshots.items()
+        }
+        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+        temp_file = self.data_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.data_file)
+
+    def get(self, guild_id: int) -> Optional[dict]:
+        return self.snapshots.get(guild_id)
+
+    def begin(self, guild_id: int, role_id: int, channels: Snapshot) -> None:
+        """Persist the pre-lockdown state of a guild; raises if it cannot be written"""
+        self.snapshots[guild_id] = {'role_id': role_id, 'channels': dict(channels)}
+        try:
+            self._save()
+        except Exception:
+            del self.snapshots[guild_id]
+            raise
+
+    def restored(self, guild_id: int, channel_ids) -> None:
+        """Drop restored channels, and the guild once none are left"""
+        entry = self.snapshots.get(guild_id)
+        if entry is None:
+            return
+        for channel_id in channel_ids:
+            entry['channels'].pop(channel_id, None)
+        if not entry['channels']:
+            del self.snapshots[guild_id]
+        try:
+            self._save()
+        except Exception as e:
+            logger.error(f'Error saving lockdown snapshots: {e}')
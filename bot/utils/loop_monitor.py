@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import asyncio
+import datetime
+import logging
+import threading
+import traceback
+from collections import deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+LOOP_SAMPLE_INTERVAL = 0.1  # Seconds between heartbeats of the loop
+LOOP_STALL_THRESHOLD = float(os.getenv('LOOP_STALL_THRESHOLD', '0.25'))  # Seconds without a heartbeat that count as blocked
+LOOP_LAG_HISTORY = 600  # Lag samples kept for the summary (a minute at the sample interval)
+LOOP_STALL_HISTORY = 20  # Recent stalls kept
+STACK_DEPTH = 12  # Innermost frames kept per stack sample
+
+class LoopMonitor:
+    """Samples event-loop lag and catches callbacks that block the loop.
+
+    A task on the loop beats every LOOP_SAMPLE_INTERVAL and records how late each
+    beat was. A watchdog thread checks the beat; once it is LOOP_STALL_THRESHOLD
+    late, the watchdog samples the loop thread's stack and notes the task that is
+    running, then records the stall's full duration (to within one sample
+    interval) when the beat resumes.
+    """
+
+    def __init__(self, threshold: float = LOOP_STALL_THRESHOLD):
+        self.threshold = threshold
+        self.lags = deque(maxlen=LOOP_LAG_HISTORY)
+        self.stalls = deque(maxlen=LOOP_STALL_HISTORY)
+        self.lock = threading.Lock()
+        self._beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start sampling the running loop"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name='loop-watchdog', daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + LOOP_SAMPLE_INTERVAL
+            await asyncio.sleep(LOOP_SAMPLE_INTERVAL)
+            now = time.monotonic()
+            self._beat = now
+            with self.lock:
+                self.lags.append(max(0.0, now - expected))
+
+    def _watch(self) -> None:
+        stall = None
+        while not self._stop.wait(LOOP_SAMPLE_INTERVAL):
+            beat = self._beat
+            late = time.monotonic() - beat
+            if stall is None and late >= self.threshold:
+                stall = self._sample(beat)
+            elif stall is not None and beat != stall['beat']:
+                # The loop is running again; the stall lasted until this beat
+                stall['duration'] = round(beat - stall.pop('beat') - LOOP_SAMPLE_INTERVAL, 3)
+                with self.lock:
+                    self.stalls.append(stall)
+                logger.warning(f"Event loop blocked for {stall['duration']}s in {stall['coroutine']} ({stall['task']})")
+                stall = None
+
+    def _sample(self, beat: float) -> dict:
+        """What the loop thread is doing right now"""
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        coroutine = task.get_coro() if task is not None else None
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-STACK_DEPTH:] if frame is not None else []
+        return {
+            'beat': beat,
+            'at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'task': task.get_name() if task is not None else None,
+            'coroutine': getattr(coroutine, '__qualname__', None) or 'callback',
+            'stack': [line.rstrip() for line in stack]
+        }
+
+    def snapshot(self) -> dict:
+        """Lag summary and recent stalls, newest first"""
+        with self.lock:
+            last = self.lags[-1] if self.lags else None
+            lags = sorted(self.lags)
+            stalls = list(reversed(self.stalls))
+        return {
+            'lag': {
+                'samples': len(lags),
+                'last': round(last, 4) if last is not None else None,
+                'p50': round(lags[len(lags) // 2], 4) if lags else None,
+                'p99': round(lags[int(len(lags) * 0.99)], 4) if lags else None,
+                'max': round(lags[-1], 4) if lags else None
+            },
+            'threshold': self.threshold,
+            'stalls': stalls
+        }
+
+LOOP_MONITOR = LoopMonitor()  # Process-wide, shared with the keep-alive server
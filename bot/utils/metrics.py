@@ -0,0 +1,152 @@
+import time
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Tuple
+
+import discord
+
+from bot.utils.auto_defer import AutoDeferTree
+from bot.utils.audit_log import AUDIT_LOG, AUDIT_COMMAND
+from bot.utils.tracing import start_trace
+
+# Upper bounds (seconds) of the command latency histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Outcomes of an app command
+OUTCOME_OK = 'ok'
+OUTCOME_ERROR = 'error'  # The handler raised
+OUTCOME_REJECTED = 'rejected'  # A check (blacklist, permissions) stopped it
+
+# App command running in the current task; API calls made under it are counted against it.
+# Tasks inherit it, so long-lived background tasks are started with an empty contextvars.Context()
+current_command: ContextVar[str] = ContextVar('current_command', default='')
+
+class MetricsRegistry:
+    """Per-command counters and latency histograms, rendered in Prometheus text format.
+
+    Updated on the event loop and read from the keep-alive server's thread, so
+    every access takes one lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.outcomes: Dict[Tuple[str, str], int] = {}  # (command, outcome) -> count
+        self.latency: Dict[str, list] = {}  # command -> bucket counts (last is +Inf), then sum
+        self.api_calls: Dict[Tuple[str, str], int] = {}  # (command, method) -> count
+        self.auto_deferred: Dict[str, int] = {}
+        self.log_sink = None  # The bot's CommandLogSink, set by get_log_sink; its queue is reported as read
+
+    def observe_command(self, command: str, outcome: str, seconds: float, auto_deferred: bool = False) -> None:
+        with self.lock:
+            key = (command, outcome)
+            self.outcomes[key] = self.outcomes.get(key, 0) + 1
+            buckets = self.latency.get(command)
+            if buckets is None:
+                buckets = self.latency[command] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            buckets[-1] += seconds
+            if auto_deferred:
+                self.auto_deferred[command] = self.auto_deferred.get(command, 0) + 1
+
+    def count_api_call(self, method: str) -> None:
+        key = (current_command.get() or 'none', method)
+        with self.lock:
+            self.api_calls[key] = self.api_calls.get(key, 0) + 1
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            lines.append('# HELP discord_commands_total App command invocations by outcome.')
+            lines.append('# TYPE discord_commands_total counter')
+            for (command, outcome), count in sorted(self.outcomes.items()):
+                lines.append(f'discord_commands_total{{command="{command}",outcome="{outcome}"}} {count}')
+
+            lines.append('# HELP discord_command_duration_seconds App command latency.')
+            lines.append('# TYPE discord_command_duration_seconds histogram')
+            for command, buckets in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                    cumulative += count
+                    lines.append(f'discord_command_duration_seconds_bucket{{command="{command}",le="{bound}"}} {cumulative}')
+                lines.append(f'discord_command_duration_seconds_sum{{command="{command}"}} {buckets[-1]:.6f}')
+                lines.append(f'discord_command_duration_seconds_count{{command="{command}"}} {cumulative}')
+
+            lines.append('# HELP discord_api_requests_total Discord REST requests made while handling each command.')
+            lines.append('# TYPE discord_api_requests_total counter')
+            for (command, method), count in sorted(self.api_calls.items()):
+                lines.append(f'discord_api_requests_total{{command="{command}",method="{method}"}} {count}')
+
+            lines.append('# HELP discord_command_auto_deferred_total App commands deferred automatically for running long.')
+            lines.append('# TYPE discord_command_auto_deferred_total counter')
+            for command, count in sorted(self.auto_deferred.items()):
+                lines.append(f'discord_command_auto_deferred_total{{command="{command}"}} {count}')
+
+            sink = self.log_sink
+            if sink is not None:
+                lines.append('# HELP discord_command_log_queue_depth Command log embeds waiting to be sent.')
+                lines.append('# TYPE discord_command_log_queue_depth gauge')
+                lines.append(f'discord_command_log_queue_depth {sink.depth}')
+                lines.append('# HELP discord_command_log_sent_total Command log embeds sent to the log channel.')
+                lines.append('# TYPE discord_command_log_sent_total counter')
+                lines.append(f'discord_command_log_sent_total {sink.sent}')
+                lines.append('# HELP discord_command_log_dropped_total Command log embeds dropped because the queue was full.')
+                lines.append('# TYPE discord_command_log_dropped_total counter')
+                lines.append(f'discord_command_log_dropped_total {sink.dropped}')
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()  # Process-wide, shared with the keep-alive server
+
+def instrument_http(http) -> None:
+    """Count every REST request the bot's HTTP client makes against the running command.
+    Interaction responses and followups go through webhooks and are not counted."""
+    original = http.request
+
+    async def request(route, **kwargs):
+        REGISTRY.count_api_call(route.method)
+        return await original(route, **kwargs)
+
+    http.request = request
+
+class MetricsTree(AutoDeferTree):
+    """Auto-deferring command tree that also records latency, outcome and API calls per command,
+    writes every invocation to the audit log and opens a (sampled) trace around it"""
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        if interaction.type is not discord.InteractionType.application_command:
+            return await super()._call(interaction)  # Autocomplete requests aren't command runs
+
+        started = time.perf_counter()
+        name = interaction.command.qualified_name if interaction.command else 'unknown'
+        token = current_command.set(name)
+        try:
+            with start_trace(f'/{name}', command=name, user_id=interaction.user.id):
+                await super()._call(interaction)
+        finally:
+            current_command.reset(token)
+            if interaction.extras.get('error') is not None:
+                outcome = OUTCOME_ERROR
+            elif interaction.command_failed:
+                outcome = OUTCOME_REJECTED
+            else:
+                outcome = OUTCOME_OK
+            REGISTRY.observe_command(name, outcome, time.perf_counter() - started,
+                                     getattr(interaction.response, 'auto_deferred', False))
+            self.audit(interaction, name, outcome)
+
+    def audit(self, interaction: discord.Interaction, name: str, outcome: str) -> None:
+        """Write the invocation to the audit log; the first user option is recorded as its target"""
+        target_id = None
+        options = []
+        for option, value in interaction.namespace:
+            if isinstance(value, (discord.abc.User, discord.Object)):
+                target_id = target_id or value.id
+            value = getattr(value, 'id', value)  # Members, roles and channels by ID
+            options.append(f'{option}={value}')
+        AUDIT_LOG.record(AUDIT_COMMAND, interaction.user.id, name, target_id, f"{outcome} {' '.join(options)}".strip())
+
+    async def on_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError) -> None:
+        if not isinstance(error, discord.app_commands.CheckFailure):
+            interaction.extras['error'] = type(getattr(error, 'original', error)).__name__
+        await super().on_error(interaction, error)
@@ -1,10 +1,12 @@
 import discord
 import logging
+from bot.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 MODERATOR_ROLE_ID = 1393754910088101958
 
+@traced()
 def has_moderator_role(user: discord.Member) -> bool:
     """Check if a user has the moderator role"""
     try:
@@ -27,6 +29,7 @@ def has_moderator_role(user: discord.Member) -> bool:
         logger.error(f'Error checking moderator role: {e}')
         return False
 
+@traced()
 def has_permission(user: discord.Member, permission: str) -> bool:
     """Check if a user has a specific permission"""
     try:
@@ -42,10 +45,12 @@ def has_permission(user: discord.Member, permission: str) -> bool:
         logger.error(f'Error checking permission {permission}: {e}')
         return False
 
+@traced()
 def is_moderator_or_higher(user: discord.Member) -> bool:
     """Check if user is moderator or has higher permissions"""
     return has_moderator_role(user)
 
+@traced()
 def can_moderate_member(moderator: discord.Member, target: discord.Member) -> bool:
     """Check if moderator can moderate the target member"""
     try:
@@ -0,0 +1,151 @@
+import json
+import os
+import asyncio
+import contextvars
+import time
+import logging
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+POINTS_FILE = os.getenv('POINTS_FILE', 'data/points.json')
+POINT_DECAY_DAYS = float(os.getenv('POINT_DECAY_DAYS', '30'))  # Points expire this long after they were given (0 keeps them)
+POINTS_FLUSH_INTERVAL = float(os.getenv('POINTS_FLUSH_INTERVAL', '5'))  # Seconds changes are batched before writing
+
+class PointLedger:
+    """Infraction points per user, kept as timestamped entries that expire.
+
+    Entries are stored oldest first, so expiry is applied lazily on each read or
+    write by dropping entries from the front; every entry is dropped at most once.
+    Changes are batched and written to disk at most once per flush interval.
+    """
+
+    def __init__(self, data_file: str = POINTS_FILE, decay_days: Optional[float] = None):
+        self.data_file = data_file
+        decay_days = POINT_DECAY_DAYS if decay_days is None else decay_days
+        self.decay_seconds = decay_days * 86400
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self.entries: Dict[int, deque] = self._load()  # user_id -> [points, timestamp] entries, oldest first
+        self.totals: Dict[int, int] = {user_id: sum(points for points, _ in entries) for user_id, entries in self.entries.items()}
+
+    def _load(self) -> Dict[int, deque]:
+        """Load point entries from JSON file"""
+        try:
+            if os.path.exists(self.data_file):
+                with open(self.data_file, 'r') as f:
+                    data = json.load(f)
+                return {int(user_id): deque(list(entry) for entry in entries) for user_id, entries in data.items() if entries}
+        except Exception as e:
+            logger.error(f'Error loading points: {e}')
+        return {}
+
+    def _expire(self, user_id: int, now: float) -> int:
+        """Drop a user's expired entries, returns their remaining total"""
+        entries = self.entries.get(user_id)
+        if not entries:
+            return 0
+
+        if self.decay_seconds > 0:
+            cutoff = now - self.decay_seconds
+            while entries and entries[0][1] <= cutoff:
+                points, _ = entries.popleft()
+                self.totals[user_id] -= points
+
+        if not entries:
+            del self.entries[user_id]
+            del self.totals[user_id]
+            return 0
+        return self.totals[user_id]
+
+    def get_points(self, user_id: int) -> int:
+        """Get a user's current points"""
+        return self._expire(user_id, time.time())
+
+    def add_points(self, user_id: int, points: int) -> int:
+        """Give a user points, returns their new total"""
+        now = time.time()
+        self._expire(user_id, now)
+        self.entries.setdefault(user_id, deque()).append([points, now])
+        self.totals[user_id] = self.totals.get(user_id, 0) + points
+        self._mark_dirty()
+        return self.totals[user_id]
+
+    def remove_points(self, user_id: int, points: int) -> int:
+        """Take points away, newest entries first, returns the new total"""
+        self._expire(user_id, time.time())
+        entries = self.entries.get(user_id)
+        if not entries:
+            return 0
+
+        remaining = points
+        while entries and remaining > 0:
+            entry = entries[-1]
+            taken = min(entry[0], remaining)
+            entry[0] -= taken
+            remaining -= taken
+            self.totals[user_id] -= taken
+            if entry[0] <= 0:
+                entries.pop()
+
+        if not entries:
+            del self.entries[user_id]
+            del self.totals[user_id]
+        self._mark_dirty()
+        return self.totals.get(user_id, 0)
+
+    def _mark_dirty(self) -> None:
+        """Schedule a batched write of the ledger"""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, tests): nothing can flush later, so write now
+            self.flush()
+            return
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later(), context=contextvars.Context())  # Not part of the awarding command
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(POINTS_FLUSH_INTERVAL)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the ledger if it changed since the last write"""
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        try:
+            cutoff = time.time() - self.decay_seconds if self.decay_seconds > 0 else None
+            data = {}
+            for user_id, entries in self.entries.items():
+                live = [entry for entry in entries if cutoff is None or entry[1] > cutoff]
+                if live:
+                    data[str(user_id)] = live
+
+            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+            temp_file = self.data_file + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.data_file)
+        except Exception as e:
+            logger.error(f'Error saving points: {e}')
+            self._dirty = True
+
+    def close(self) -> None:
+        """Write any batched changes now"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self.flush()
+
+def get_point_ledger(bot) -> PointLedger:
+    """Get the process-wide point ledger attached to the bot, creating it on first use"""
+    ledger = getattr(bot, 'point_ledger', None)
+    if ledger is None:
+        ledger = PointLedger()
+        bot.point_ledger = ledger
+    return ledger
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import datetime
+from typing import Callable, List, Optional
+
+import discord
+
+from bot.utils.bulk_actions import ProgressMessage
+
+logger = logging.getLogger(__name__)
+
+# Discord only bulk-deletes messages younger than 14 days; keep a margin for clock skew
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)
+BULK_DELETE_CHUNK = 100  # Most messages one bulk delete request accepts
+SINGLE_DELETE_INTERVAL = 1.0  # Seconds between deletes of messages too old to bulk-delete
+PURGE_MAX_SCANNED = 100_000  # History messages one job looks at before giving up
+
+class PurgeJob:
+    """Delete up to `limit` messages matching `check` from a channel, newest first.
+
+    History is streamed page by page and only the current bulk-delete chunk is
+    held in memory. Messages younger than 14 days are bulk-deleted in chunks of
+    100; older ones (always after the young ones, since history is newest first)
+    are deleted one at a time with a pause between requests.
+    """
+
+    def __init__(self, channel: discord.TextChannel, limit: int, check: Callable[[discord.Message], bool],
+                 progress: Optional[ProgressMessage] = None):
+        self.channel = channel
+        self.limit = limit
+        self.check = check
+        self.progress = progress
+        self.scanned = 0
+        self.matched = 0
+        self.deleted = 0
+        self.failed = 0
+
+    async def run(self) -> int:
+        """Run the purge, returns how many messages were deleted"""
+        chunk: List[discord.Message] = []
+        async for message in self.channel.history(limit=PURGE_MAX_SCANNED):
+            self.scanned += 1
+            if not self.check(message):
+                continue
+
+            self.matched += 1
+            if message.created_at > discord.utils.utcnow() - BULK_DELETE_MAX_AGE:
+                chunk.append(message)
+                if len(chunk) >= BULK_DELETE_CHUNK:
+                    await self._bulk_delete(chunk)
+                    chunk = []
+            else:
+                if chunk:
+                    await self._bulk_delete(chunk)
+                    chunk = []
+                await self._single_delete(message)
+
+            if self.matched >= self.limit:
+                break
+
+        if chunk:
+            await self._bulk_delete(chunk)
+        return self.deleted
+
+    async def _bulk_delete(self, messages: List[discord.Message]) -> None:
+        try:
+            await self.channel.delete_messages(messages)
+            self.deleted += len(messages)
+        except discord.HTTPException as e:
+            logger.error(f'Bulk delete of {len(messages)} messages in {self.channel} failed: {e}')
+            self.failed += len(messages)
+        await self._report()
+
+    async def _single_delete(self, message: discord.Message) -> None:
+        try:
+            await message.delete()
+            self.deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            logger.error(f'Deleting message {message.id} in {self.channel} failed: {e}')
+            self.failed += 1
+        await self._report()
+        await asyncio.sleep(SINGLE_DELETE_INTERVAL)
+
+    async def _report(self) -> None:
+        if self.progress is not None:
+            self.progress.done = self.deleted
+            self.progress.failed = self.failed
+            await self.progress.refresh()
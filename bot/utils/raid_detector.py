@@ -0,0 +1,97 @@
+from typing import List, Optional
+
+RAID_WINDOW = 60  # Seconds of joins the detector looks at, one bucket per second
+RAID_JOIN_THRESHOLD = 10  # Joins within the window that start a raid
+RAID_YOUNG_THRESHOLD = 6  # ...or this many joins from accounts younger than a day
+RAID_CALM_AFTER = 120  # Seconds below half the thresholds before a raid is over
+
+# Upper bounds (seconds) of the account-age histogram bins; the last bin holds everything older
+AGE_BINS = (3600, 86400, 7 * 86400, 30 * 86400)
+AGE_LABELS = ('<1h', '<1d', '<7d', '<30d', 'older')
+YOUNG_BINS = 2  # Bins counted as young accounts (<1h and <1d)
+
+class JoinRateTracker:
+    """Joins and account ages over the last RAID_WINDOW seconds.
+
+    Joins are counted in a ring of one-second buckets, each with its own
+    account-age histogram, plus running totals of both. A join touches one
+    bucket and clears the buckets skipped since the last join, so the work
+    and memory per join stay fixed no matter how large the guild is.
+    """
+
+    def __init__(self, window: int = RAID_WINDOW):
+        self.window = window
+        self.joins = [0] * window
+        self.ages = [[0] * len(AGE_LABELS) for _ in range(window)]
+        self.total = 0
+        self.age_totals = [0] * len(AGE_LABELS)
+        self.current = None  # Second of the newest bucket
+        self.raid_started: Optional[float] = None
+        self.raid_joins = 0
+        self.calm_since: Optional[float] = None
+
+    def _advance(self, second: int) -> None:
+        """Clear buckets that fell out of the window up to `second`"""
+        if self.current is None or second - self.current >= self.window:
+            self.joins = [0] * self.window
+            self.ages = [[0] * len(AGE_LABELS) for _ in range(self.window)]
+            self.total = 0
+            self.age_totals = [0] * len(AGE_LABELS)
+        else:
+            for stale in range(self.current + 1, second + 1):
+                index = stale % self.window
+                self.total -= self.joins[index]
+                self.joins[index] = 0
+                bucket = self.ages[index]
+                for age_bin, count in enumerate(bucket):
+                    self.age_totals[age_bin] -= count
+                    bucket[age_bin] = 0
+        if self.current is None or second > self.current:
+            self.current = second
+
+    def young(self) -> int:
+        return sum(self.age_totals[:YOUNG_BINS])
+
+    def histogram(self) -> List[tuple]:
+        """(label, joins) per account-age bin within the window"""
+        return list(zip(AGE_LABELS, self.age_totals))
+
+    def record(self, now: float, account_age: float) -> Optional[str]:
+        """Count a join. Returns 'start' when it starts a raid, 'end' when a raid
+        is over (checked on each join and each tick), otherwise None."""
+        self._advance(int(now))
+        index = int(now) % self.window
+        age_bin = next((n for n, bound in enumerate(AGE_BINS) if account_age < bound), len(AGE_BINS))
+        self.joins[index] += 1
+        self.total += 1
+        self.ages[index][age_bin] += 1
+        self.age_totals[age_bin] += 1
+
+        if self.raid_started is not None:
+            self.raid_joins += 1
+        elif self.total >= RAID_JOIN_THRESHOLD or self.young() >= RAID_YOUNG_THRESHOLD:
+            self.raid_started = now
+            self.raid_joins = self.total
+            self.calm_since = None
+            return 'start'
+        return self.tick(now)
+
+    def tick(self, now: float) -> Optional[str]:
+        """Update raid state without a join, returns 'end' when the raid is over"""
+        if self.raid_started is None:
+            return None
+        self._advance(int(now))
+        if self.total * 2 >= RAID_JOIN_THRESHOLD or self.young() * 2 >= RAID_YOUNG_THRESHOLD:
+            self.calm_since = None
+            return None
+        if self.calm_since is None:
+            self.calm_since = now
+        if now - self.calm_since < RAID_CALM_AFTER:
+            return None
+        self.raid_started = None
+        self.calm_since = None
+        return 'end'
+
+    @property
+    def raiding(self) -> bool:
+        return self.raid_started is not None
@@ -0,0 +1,235 @@
+import json
+import os
+import time
+import heapq
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_FILE = os.getenv('SCHEDULE_FILE', 'data/schedule.jsonl')
+SCHEDULE_COMPACT_THRESHOLD = 1000  # Finished jobs in the journal before it is rewritten
+SCHEDULE_RETRY_DELAY = 300  # Seconds before a job whose guild or channel wasn't available is tried again
+SCHEDULE_MAX_RETRIES = 12  # Retries before such a job is given up on (an hour at the delay above)
+
+# Job kinds
+JOB_UNBAN = 'unban'
+JOB_UNLOCK = 'unlock'
+JOB_REMOVE_ROLE = 'remove_role'
+
+class JobRetry(Exception):
+    """Raised by a handler when its job can't run yet (e.g. the guild isn't cached); the job is retried later"""
+
+class ScheduledJob:
+    """One timed action: undo a punishment at `due` (Unix time)"""
+
+    __slots__ = ('job_id', 'kind', 'due', 'guild_id', 'target_id', 'extra_id', 'retries')
+
+    def __init__(self, job_id: int, kind: str, due: float, guild_id: int, target_id: int, extra_id: Optional[int] = None,
+                 retries: int = 0):
+        self.job_id = job_id
+        self.kind = kind
+        self.due = due
+        self.guild_id = guild_id
+        self.target_id = target_id  # User to unban or strip a role from, or channel to unlock
+        self.extra_id = extra_id  # Role to remove, for remove_role jobs
+        self.retries = retries
+
+    def to_dict(self) -> dict:
+        return {'op': 'add', 'id': self.job_id, 'kind': self.kind, 'due': self.due, 'guild_id': self.guild_id,
+                'target_id': self.target_id, 'extra_id': self.extra_id, 'retries': self.retries}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ScheduledJob':
+        return cls(data['id'], data['kind'], data['due'], data['guild_id'], data['target_id'], data.get('extra_id'),
+                   data.get('retries', 0))
+
+class PunishmentScheduler:
+    """Runs timed jobs (unbans, unlocks, role removals) when they fall due.
+
+    Pending jobs sit in a min-heap of (due, job_id), so scheduling is O(log n).
+    The runner sleeps until the earliest job is due, and is woken early when a
+    sooner job is added; it never polls. Jobs are kept in an append-only journal
+    of add and done records, replayed on start so jobs survive restarts (a later
+    add of the same job, written when it is retried, replaces the earlier one).
+    Jobs that fell due while the bot was down run as soon as the runner's ready
+    check passes. Cancelled jobs are dropped from the job table and skipped when popped.
+    """
+
+    def __init__(self, data_file: str = SCHEDULE_FILE):
+        self.data_file = data_file
+        self.handlers: Dict[str, Callable[[ScheduledJob], Awaitable[None]]] = {}
+        self.jobs: Dict[int, ScheduledJob] = {}
+        self.next_id = 1
+        self._finished_records = 0
+        self._journal = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._load()
+        self.heap: List[Tuple[float, int]] = [(job.due, job.job_id) for job in self.jobs.values()]
+        heapq.heapify(self.heap)
+
+    def _load(self) -> None:
+        """Replay the journal into the job table"""
+        if not os.path.exists(self.data_file):
+            return
+        try:
+            with open(self.data_file, 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f'Skipping unreadable record on line {line_number} of {self.data_file}')
+                        continue
+                    if record['op'] == 'add':
+                        job = ScheduledJob.from_dict(record)
+                        if job.job_id in self.jobs:
+                            self._finished_records += 1  # A retry superseding the earlier add
+                        self.jobs[job.job_id] = job
+                        self.next_id = max(self.next_id, job.job_id + 1)
+                    else:
+                        self.jobs.pop(record['id'], None)
+                        self._finished_records += 1
+        except Exception as e:
+            logger.error(f'Error loading scheduled jobs: {e}')
+
+    def _append(self, record: dict) -> None:
+        try:
+            if self._journal is None:
+                os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+                self._journal = open(self.data_file, 'a')
+            self._journal.write(json.dumps(record) + '\n')
+            self._journal.flush()
+        except Exception as e:
+            logger.error(f'Error writing scheduled job: {e}')
+
+    def _compact(self) -> None:
+        """Rewrite the journal with only the pending jobs"""
+        try:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            temp_file = self.data_file + '.tmp'
+            with open(temp_file, 'w') as f:
+                for job in self.jobs.values():
+                    f.write(json.dumps(job.to_dict()) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.data_file)
+            self._finished_records = 0
+        except Exception as e:
+            logger.error(f'Error compacting scheduled jobs: {e}')
+
+    def register(self, kind: str, handler: Callable[[ScheduledJob], Awaitable[None]]) -> None:
+        """Set the coroutine that carries out jobs of a kind"""
+        self.handlers[kind] = handler
+
+    def schedule(self, kind: str, delay: float, guild_id: int, target_id: int, extra_id: Optional[int] = None) -> ScheduledJob:
+        """Add a job due `delay` seconds from now"""
+        job = ScheduledJob(self.next_id, kind, time.time() + delay, guild_id, target_id, extra_id)
+        self.next_id += 1
+        self.jobs[job.job_id] = job
+        self._append(job.to_dict())
+        earliest = not self.heap or job.due < self.heap[0][0]
+        heapq.heappush(self.heap, (job.due, job.job_id))
+        if earliest and self._wakeup is not None:
+            self._wakeup.set()  # New earliest job, cut the runner's sleep short
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Drop a pending job, returns whether it existed"""
+        if self.jobs.pop(job_id, None) is None:
+            return False
+        self._finish(job_id)
+        return True
+
+    def pending(self, guild_id: Optional[int] = None) -> List[ScheduledJob]:
+        jobs = [job for job in self.jobs.values() if guild_id is None or job.guild_id == guild_id]
+        return sorted(jobs, key=lambda job: job.due)
+
+    def _finish(self, job_id: int) -> None:
+        self._append({'op': 'done', 'id': job_id})
+        self._finished_records += 1
+        if self._finished_records >= max(SCHEDULE_COMPACT_THRESHOLD, len(self.jobs)):
+            self._compact()
+
+    def start(self, ready: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """Start the runner on the current event loop; no job runs before `ready` returns
+        (pass the bot's wait_until_ready, so handlers see the guild cache)"""
+        if self._runner is None or self._runner.done():
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.create_task(self._run(ready))
+
+    async def _run(self, ready: Optional[Callable[[], Awaitable[None]]]) -> None:
+        if ready is not None:
+            await ready()
+        while True:
+            # Drop cancelled jobs from the top so the sleep targets a live one
+            while self.heap and self.heap[0][1] not in self.jobs:
+                heapq.heappop(self.heap)
+
+            self._wakeup.clear()
+            if not self.heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self.heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, job_id = heapq.heappop(self.heap)
+            job = self.jobs.pop(job_id)
+            if await self._execute(job):
+                self._finish(job_id)
+
+    async def _execute(self, job: ScheduledJob) -> bool:
+        """Run a job, returns whether it is finished (False when it was put back for a retry)"""
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            logger.error(f'No handler for scheduled {job.kind} job #{job.job_id}, dropping it')
+            return True
+        try:
+            await handler(job)
+            logger.info(f'Ran scheduled {job.kind} job #{job.job_id} for {job.target_id}')
+        except JobRetry as e:
+            if job.retries >= SCHEDULE_MAX_RETRIES:
+                logger.error(f'Giving up on scheduled {job.kind} job #{job.job_id} after {job.retries} retries: {e}')
+                return True
+            job.retries += 1
+            job.due = time.time() + SCHEDULE_RETRY_DELAY
+            self.jobs[job.job_id] = job
+            self._append(job.to_dict())
+            self._finished_records += 1  # The earlier add is superseded, count it towards compaction
+            heapq.heappush(self.heap, (job.due, job.job_id))
+            logger.warning(f'Scheduled {job.kind} job #{job.job_id} can\'t run yet ({e}), retrying in {SCHEDULE_RETRY_DELAY}s')
+            return False
+        except Exception as e:
+            logger.error(f'Scheduled {job.kind} job #{job.job_id} failed: {e}')
+        return True
+
+    def close(self) -> None:
+        """Stop the runner and close the journal"""
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        if self._journal is not None:
+            try:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            except Exception as e:
+                logger.error(f'Error syncing scheduled jobs: {e}')
+            self._journal.close()
+            self._journal = None
+
+def get_scheduler(bot) -> PunishmentScheduler:
+    """Get the process-wide scheduler attached to the bot, creating it on first use"""
+    scheduler = getattr(bot, 'scheduler', None)
+    if scheduler is None:
+        scheduler = PunishmentScheduler()
+        bot.scheduler = scheduler
+    return scheduler
@@ -0,0 +1,395 @@
+import os
+import sqlite3
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from bot.utils.audit_log import AUDIT_LOG, AUDIT_CASE
+from bot.utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cases (
+    case_number INTEGER PRIMARY KEY,
+    action TEXT NOT NULL,
+    target_id INTEGER NOT NULL,
+    moderator_id INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_target ON cases (target_id, case_number);
+CREATE INDEX IF NOT EXISTS idx_cases_moderator ON cases (moderator_id, case_number);
+CREATE INDEX IF NOT EXISTS idx_cases_action ON cases (action, case_number);
+CREATE INDEX IF NOT EXISTS idx_cases_timestamp ON cases (timestamp);
+CREATE TABLE IF NOT EXISTS case_rollups (
+    day TEXT NOT NULL,
+    action TEXT NOT NULL,
+    moderator_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, action, moderator_id)
+);
+'''
+
+QUERY_BATCH_SIZE = 100  # Rows fetched per round trip by iter_cases
+IMPORT_BATCH_SIZE = 1000  # Rows inserted per executemany by the one-time import
+
+COLUMNS = ('case_number', 'action', 'target_id', 'moderator_id', 'reason', 'timestamp', 'created_at')
+
+class SQLiteCaseTracker:
+    """Case store on a local SQLite file.
+
+    Every query runs on a single dedicated worker thread, and all methods
+    except get_next_case_number are awaitable so the event loop never
+    waits on disk.
+    """
+
+    def __init__(self, db_file: str = 'data/cases.db'):
+        self.db_file = db_file
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='case-db')
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Runs once at startup before the bot connects, like the JSON load
+        self.next_case_number = self._executor.submit(self._open).result() + 1
+
+    def _open(self) -> int:
+        """Open the database, create the schema and return the highest case number"""
+        directory = os.path.dirname(self.db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+        has_cases = self._connection.execute('SELECT EXISTS (SELECT 1 FROM cases)').fetchone()[0]
+        has_rollups = self._connection.execute('SELECT EXISTS (SELECT 1 FROM case_rollups)').fetchone()[0]
+        if has_cases and not has_rollups:
+            # Database predates the rollup table
+            self._rebuild_rollups()
+        row = self._connection.execute('SELECT MAX(case_number) FROM cases').fetchone()
+        return row[0] or 0
+
+    async def _run(self, func, *args):
+        """Run a blocking database call on the worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        return [dict(row) for row in self._connection.execute(sql, params).fetchall()]
+
+    @traced()
+    def get_next_case_number(self) -> int:
+        """Get the next available case number"""
+        with self._lock:
+            case_number = self.next_case_number
+            self.next_case_number += 1
+            return case_number
+
+    def _rollup(self, case_data: Dict[str, Any], delta: int) -> None:
+        """Adjust the daily rollup a case belongs to (caller holds the transaction)"""
+        key = (case_data['timestamp'][:10], case_data['action'], case_data['moderator_id'])
+        self._connection.execute(
+            'INSERT INTO case_rollups (day, action, moderator_id, count) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (day, action, moderator_id) DO UPDATE SET count = count + excluded.count',
+            key + (delta,)
+        )
+        if delta < 0:
+            self._connection.execute(
+                'DELETE FROM case_rollups WHERE day = ? AND action = ? AND moderator_id = ? AND count <= 0', key
+            )
+
+    def _rebuild_rollups(self) -> None:
+        with self._connection:
+            self._connection.execute('DELETE FROM case_rollups')
+            self._connection.execute(
+                'INSERT INTO case_rollups (day, action, moderator_id, count) '
+                'SELECT substr(timestamp, 1, 10), action, moderator_id, COUNT(*) FROM cases '
+                'GROUP BY substr(timestamp, 1, 10), action, moderator_id'
+            )
+
+    def _insert_cases(self, cases: List[Dict[str, Any]]) -> None:
+        """Insert or replace cases in a single transaction"""
+        with self._connection:
+            for case_data in cases:
+                previous = self._connection.execute(
+                    'SELECT timestamp, action, moderator_id FROM cases WHERE case_number = ?', (case_data['case_number'],)
+                ).fetchone()
+                if previous:
+                    self._rollup(dict(previous), -1)
+                self._rollup(case_data, 1)
+                self._connection.execute(
+                    f'INSERT OR REPLACE INTO cases ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})',
+                    tuple(case_data[column] for column in COLUMNS)
+                )
+
+    @staticmethod
+    def _case_data(case_number: int, action: str, target_id: int, moderator_id: int, reason: str) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        return {
+            'case_number': case_number,
+            'action': action,
+            'target_id': target_id,
+            'moderator_id': moderator_id,
+            'reason': reason,
+            'timestamp': now.isoformat(),
+            'created_at': now.strftime('%Y-%m-%d %H:%M:%S UTC')
+        }
+
+    @traced()
+    async def save_case(self, case_number: int, action: str, target_id: int, moderator_id: int, reason: str) -> None:
+        """Save a moderation case"""
+        try:
+            await self._run(self._insert_cases, [self._case_data(case_number, action, target_id, moderator_id, reason)])
+            AUDIT_LOG.record(AUDIT_CASE, moderator_id, f'save {action}', target_id, f'#{case_number} {reason}')
+            logger.info(f'Case #{case_number} saved: {action} by {moderator_id} on {target_id}')
+        except Exception as e:
+            logger.error(f'Error saving case #{case_number}: {e}')
+
+    @traced()
+    async def save_cases(self, cases: List[tuple]) -> int:
+        """Save many (case_number, action, target_id, moderator_id, reason) cases in one transaction,
+        returns how many were saved"""
+        try:
+            await self._run(self._insert_cases, [self._case_data(*case) for case in cases])
+            for case_number, action, target_id, moderator_id, reason in cases:
+                AUDIT_LOG.record(AUDIT_CASE, moderator_id, f'save {action}', target_id, f'#{case_number} {reason}')
+            logger.info(f'Saved {len(cases)} cases')
+            return len(cases)
+        except Exception as e:
+            logger.error(f'Error saving {len(cases)} cases: {e}')
+            return 0
+
+    @traced()
+    async def get_case(self, case_number: int) -> Dict[str, Any]:
+        """Get a specific case by number"""
+        try:
+            rows = await self._run(self._query, 'SELECT * FROM cases WHERE case_number = ?', (case_number,))
+            return rows[0] if rows else {}
+        except Exception as e:
+            logger.error(f'Error getting case #{case_number}: {e}')
+            return {}
+
+    @traced()
+    async def get_cases_by_target(self, target_id: int) -> list:
+        """Get all cases for a specific target"""
+        try:
+            return await self._run(self._query, 'SELECT * FROM cases WHERE target_id = ? ORDER BY case_number', (target_id,))
+        except Exception as e:
+            logger.error(f'Error getting cases for target {target_id}: {e}')
+            return []
+
+    @traced()
+    async def get_cases_by_moderator(self, moderator_id: int) -> list:
+        """Get all cases by a specific moderator"""
+        try:
+            return await self._run(self._query, 'SELECT * FROM cases WHERE moderator_id = ? ORDER BY case_number', (moderator_id,))
+        except Exception as e:
+            logger.error(f'Error getting cases by moderator {moderator_id}: {e}')
+            return []
+
+    @traced()
+    async def get_cases_by_action(self, action: str) -> list:
+        """Get all cases of a specific action type"""
+        try:
+            return await self._run(self._query, 'SELECT * FROM cases WHERE action = ? ORDER BY case_number', (action,))
+        except Exception as e:
+            logger.error(f'Error getting cases by action {action}: {e}')
+            return []
+
+    @traced()
+    async def get_total_cases(self) -> int:
+        """Get total number of cases"""
+        try:
+            rows = await self._run(self._query, 'SELECT COUNT(*) AS total FROM cases')
+            return rows[0]['total']
+        except Exception as e:
+            logger.error(f'Error counting cases: {e}')
+            return 0
+
+    async def iter_cases(self, target_id: Optional[int] = None, moderator_id: Optional[int] = None,
+                         action: Optional[str] = None, since: Optional[datetime] = None,
+                         until: Optional[datetime] = None, cursor: Optional[int] = None,
+                         newest_first: bool = True):
+        """Yield matching cases one at a time in case number order.
+
+        cursor is the case number of the last case already seen; iteration resumes
+        after it. Rows are fetched in keyset-paginated batches off the event loop.
+        """
+        conditions = []
+        params = []
+        for column, value in (('target_id', target_id), ('moderator_id', moderator_id), ('action', action)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(_to_stored_timestamp(since))
+        if until is not None:
+            conditions.append('timestamp < ?')
+            params.append(_to_stored_timestamp(until))
+
+        comparison, order = ('<', 'DESC') if newest_first else ('>', 'ASC')
+        last = cursor
+        while True:
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if last is not None:
+                page_conditions.append(f'case_number {comparison} ?')
+                page_params.append(last)
+            where = f'WHERE {" AND ".join(page_conditions)}' if page_conditions else ''
+            rows = await self._run(
+                self._query,
+                f'SELECT * FROM cases {where} ORDER BY case_number {order} LIMIT ?',
+                tuple(page_params) + (QUERY_BATCH_SIZE,)
+            )
+            for row in rows:
+                yield row
+            if len(rows) < QUERY_BATCH_SIZE:
+                return
+            last = rows[-1]['case_number']
+
+    def _delete_case(self, case_number: int) -> Optional[Dict[str, Any]]:
+        """Delete a case, returning its data if it existed"""
+        with self._connection:
+            previous = self._connection.execute(
+                'SELECT timestamp, action, target_id, moderator_id FROM cases WHERE case_number = ?', (case_number,)
+            ).fetchone()
+            if not previous:
+                return None
+            previous = dict(previous)
+            self._rollup(previous, -1)
+            self._connection.execute('DELETE FROM cases WHERE case_number = ?', (case_number,))
+            return previous
+
+    def _case_stats(self, since_day: Optional[str], until_day: Optional[str],
+                    moderator_id: Optional[int], action: Optional[str]) -> Dict[str, Any]:
+        conditions = []
+        params = []
+        if since_day:
+            conditions.append('day >= ?')
+            params.append(since_day)
+        if until_day:
+            conditions.append('day < ?')
+            params.append(until_day)
+        if moderator_id is not None:
+            conditions.append('moderator_id = ?')
+            params.append(moderator_id)
+        if action is not None:
+            conditions.append('action = ?')
+            params.append(action)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        rows = self._connection.execute(
+            f'SELECT action, moderator_id, SUM(count) FROM case_rollups {where} GROUP BY action, moderator_id', params
+        ).fetchall()
+
+        by_action: Dict[str, int] = {}
+        by_moderator: Dict[int, int] = {}
+        for action_name, moderator, count in rows:
+            by_action[action_name] = by_action.get(action_name, 0) + count
+            by_moderator[moderator] = by_moderator.get(moderator, 0) + count
+        return {'total': sum(by_action.values()), 'by_action': by_action, 'by_moderator': by_moderator}
+
+    @traced()
+    async def get_case_stats(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             moderator_id: Optional[int] = None, action: Optional[str] = None) -> Dict[str, Any]:
+        """Count cases per action and per moderator from the daily rollup table (until is exclusive)"""
+        try:
+            since_day = _to_stored_timestamp(since)[:10] if since else None
+            until_day = _to_stored_timestamp(until)[:10] if until else None
+            return await self._run(self._case_stats, since_day, until_day, moderator_id, action)
+        except Exception as e:
+            logger.error(f'Error getting case statistics: {e}')
+            return {'total': 0, 'by_action': {}, 'by_moderator': {}}
+
+    @traced()
+    async def delete_case(self, case_number: int) -> bool:
+        """Delete a case (admin only)"""
+        try:
+            deleted = await self._run(self._delete_case, case_number)
+            if deleted:
+                AUDIT_LOG.record(AUDIT_CASE, None, f"delete {deleted['action']}", deleted['target_id'], f'#{case_number}')
+                logger.info(f'Case #{case_number} deleted')
+            return deleted is not None
+        except Exception as e:
+            logger.error(f'Error deleting case #{case_number}: {e}')
+            return False
+
+    @staticmethod
+    def _import_row(case_data: Dict[str, Any]) -> tuple:
+        timestamp = case_data.get('timestamp') or datetime.utcnow().isoformat()
+        return (
+            int(case_data['case_number']),
+            case_data.get('action', ''),
+            int(case_data.get('target_id', 0)),
+            int(case_data.get('moderator_id', 0)),
+            case_data.get('reason', ''),
+            timestamp,
+            case_data.get('created_at') or datetime.fromisoformat(timestamp).strftime('%Y-%m-%d %H:%M:%S UTC')
+        )
+
+    def _import_cases(self, cases: Iterable[Dict[str, Any]]) -> int:
+        """Insert cases in the JSON format in one transaction, in batches so a large archive isn't held in memory"""
+        cases = iter(cases)
+        highest = 0
+        with self._connection:
+            # Existing rows win, so running the import twice is harmless
+            before = self._connection.total_changes
+            while True:
+                rows = [self._import_row(case_data) for case_data in islice(cases, IMPORT_BATCH_SIZE)]
+                if not rows:
+                    break
+                highest = max(highest, max(row[0] for row in rows))
+                self._connection.executemany(
+                    f'INSERT OR IGNORE INTO cases ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})',
+                    rows
+                )
+            imported = self._connection.total_changes - before
+        if imported:
+            self._rebuild_rollups()
+
+        with self._lock:
+            self.next_case_number = max(self.next_case_number, highest + 1)
+        return imported
+
+    @staticmethod
+    def _tracker_cases(tracker) -> Iterator[Dict[str, Any]]:
+        """Every case a loaded CaseTracker holds: archive segments first, then the hot set
+        (which already has the journal or indexed file applied)"""
+        yield from tracker.archive.iter_all()
+        for case_number in sorted(tracker.cases):
+            yield tracker.cases[case_number].to_dict()
+
+    def import_case_tracker_blocking(self, tracker) -> int:
+        """Import every case from a loaded CaseTracker, for use before the event loop starts"""
+        imported = self._executor.submit(self._import_cases, self._tracker_cases(tracker)).result()
+        logger.info(f'Imported {imported} cases from {tracker.data_file} into {self.db_file}')
+        return imported
+
+    async def import_case_tracker(self, tracker) -> int:
+        """Import every case from a loaded CaseTracker"""
+        imported = await self._run(self._import_cases, self._tracker_cases(tracker))
+        logger.info(f'Imported {imported} cases from {tracker.data_file} into {self.db_file}')
+        return imported
+
+    def close(self) -> None:
+        """Finish pending queries and close the database"""
+        def _close():
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+        try:
+            self._executor.submit(_close).result()
+        finally:
+            self._executor.shutdown(wait=True)
+
+def _to_stored_timestamp(moment: datetime) -> str:
+    """Format a datetime like the stored naive-UTC ISO timestamps so they compare as text"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
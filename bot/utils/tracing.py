@@ -0,0 +1,135 @@
+import json
+import os
+import time
+import random
+import inspect
+import logging
+import functools
+from contextvars import ContextVar
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = os.getenv('TRACE_FILE', 'data/traces.jsonl')
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))  # Share of app commands traced (0 turns tracing off)
+TRACE_MAX_BYTES = 16 * 1024 * 1024  # Trace file size before it is moved to TRACE_FILE.1
+SERVICE_NAME = 'discord-bot'
+
+class Span:
+    """One timed operation, written as a Zipkin v2 JSON span"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'tags', 'start', 'started')
+
+    def __init__(self, trace: list, name: str, parent_id: Optional[str], tags: dict):
+        self.trace = trace  # Every finished span of the trace, written when the root ends
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.name = name
+        self.tags = tags
+        self.start = time.time()
+        self.started = time.perf_counter()
+
+    def to_dict(self, trace_id: str, duration: float) -> dict:
+        data = {
+            'traceId': trace_id,
+            'id': self.span_id,
+            'name': self.name,
+            'timestamp': int(self.start * 1_000_000),
+            'duration': max(1, int(duration * 1_000_000)),
+            'localEndpoint': {'serviceName': SERVICE_NAME}
+        }
+        if self.parent_id is not None:
+            data['parentId'] = self.parent_id
+        if self.tags:
+            data['tags'] = {key: str(value) for key, value in self.tags.items()}
+        return data
+
+# Innermost open span of the current task; copied into tasks it creates, see current_command in metrics
+current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+class _SpanScope:
+    """Context manager behind span() and start_trace(); does nothing outside a sampled trace"""
+
+    __slots__ = ('name', 'tags', 'root', 'span', 'token')
+
+    def __init__(self, name: str, tags: dict, root: bool):
+        self.name = name
+        self.tags = tags
+        self.root = root
+        self.span = None
+
+    def __enter__(self):
+        parent = current_span.get()
+        if parent is not None:
+            self.span = Span(parent.trace, self.name, parent.span_id, self.tags)
+        elif self.root and TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE:
+            trace = [f'{random.getrandbits(64):016x}']  # Trace ID first, then finished spans
+            self.span = Span(trace, self.name, None, self.tags)
+        if self.span is not None:
+            self.token = current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        if span is None:
+            return False
+        current_span.reset(self.token)
+        if exc is not None:
+            span.tags['error'] = f'{exc_type.__name__}: {exc}'
+        span.trace.append(span.to_dict(span.trace[0], time.perf_counter() - span.started))
+        if span.parent_id is None:
+            _write(span.trace[1:])
+        return False
+
+def start_trace(name: str, **tags) -> _SpanScope:
+    """Open a root span, sampled at TRACE_SAMPLE_RATE; joins the current trace if there is one"""
+    return _SpanScope(name, tags, True)
+
+def span(name: str, **tags) -> _SpanScope:
+    """Open a child span of the current one; a no-op when nothing is being traced"""
+    return _SpanScope(name, tags, False)
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping each call of a function or coroutine function in a span"""
+    def decorate(function):
+        span_name = name or function.__qualname__
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                if current_span.get() is None:
+                    return await function(*args, **kwargs)
+                with span(span_name):
+                    return await function(*args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if current_span.get() is None:
+                    return function(*args, **kwargs)
+                with span(span_name):
+                    return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def trace_http(http) -> None:
+    """Record every REST request the bot's HTTP client makes as a span of the current trace"""
+    original = http.request
+
+    async def request(route, **kwargs):
+        if current_span.get() is None:
+            return await original(route, **kwargs)
+        with span(f'{route.method} {route.path}', **{'http.method': route.method, 'http.path': route.path}):
+            return await original(route, **kwargs)
+
+    http.request = request
+
+def _write(spans: list) -> None:
+    """Append a finished trace to the trace file, one span per line"""
+    try:
+        os.makedirs(os.path.dirname(TRACE_FILE), exist_ok=True)
+        if os.path.exists(TRACE_FILE) and os.path.getsize(TRACE_FILE) >= TRACE_MAX_BYTES:
+            os.replace(TRACE_FILE, TRACE_FILE + '.1')
+        with open(TRACE_FILE, 'a') as f:
+            f.write(''.join(json.dumps(data) + '\n' for data in spans))
+    except Exception as e:
+        logger.error(f'Error writing trace: {e}')
@@ -1,11 +1,16 @@
-from flask import Flask
+from flask import Flask, Response
+import os
 import threading
 import logging
+from bot.utils.metrics import REGISTRY
+from bot.utils.loop_monitor import LOOP_MONITOR
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))  # main.py starts this server on the port when set; 0 leaves it off
+
 app = Flask(__name__)
 
 @app.route('/')
@@ -24,17 +29,25 @@ def status():
         "status": "online"
     }
 
-def run():
+@app.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/diagnostics')
+def diagnostics():
+    return LOOP_MONITOR.snapshot()
+
+def run(port: int = 5000):
     try:
-        app.run(host='0.0.0.0', port=5000, debug=False)
+        app.run(host='0.0.0.0', port=port, debug=False)
     except Exception as e:
         logger.error(f'Error running Flask app: {e}')
 
-def keep_alive():
+def keep_alive(port: int = 5000):
     try:
-        server = threading.Thread(target=run)
+        server = threading.Thread(target=run, args=(port,))
         server.daemon = True
         server.start()
-        logger.info('Keep alive server started on port 5000')
+        logger.info(f'Keep alive server started on port {port}')
     except Exception as e:
         logger.error(f'Error starting keep alive server: {e}')
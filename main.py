@@ -2,12 +2,20 @@ import discord
 from discord.ext import commands
 import asyncio
 import os
+import signal
 from dotenv import load_dotenv
 import logging
-# from keep_alive import keep_alive  # Commented out for Render, uncomment if needed
 from bot.cogs.blacklist import blacklisted_users  # shared global blacklist set
 
 load_dotenv()
+from bot.utils.case_tracker import create_case_tracker  # reads CASE_* settings, so import after load_dotenv
+from bot.utils.point_ledger import PointLedger  # reads POINT_* settings
+from bot.utils.metrics import MetricsTree, instrument_http  # MetricsTree also auto-defers, reads AUTO_DEFER_AFTER
+from bot.utils.scheduler import PunishmentScheduler  # reads SCHEDULE_FILE
+from bot.utils.loop_monitor import LOOP_MONITOR  # reads LOOP_STALL_THRESHOLD
+from bot.utils.audit_log import AUDIT_LOG  # reads AUDIT_* settings
+from bot.utils.tracing import trace_http  # reads TRACE_* settings
+from keep_alive import keep_alive, METRICS_PORT  # reads METRICS_PORT
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -22,7 +30,12 @@ intents.message_content = True
 intents.members = True
 intents.guilds = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = commands.Bot(command_prefix="!", intents=intents, tree_cls=MetricsTree)  # slow slash commands get deferred automatically
+instrument_http(bot.http)  # count Discord API calls per command for /metrics
+trace_http(bot.http)  # Discord API calls as spans of sampled command traces
+bot.case_tracker = create_case_tracker()  # one case store shared by every cog
+bot.point_ledger = PointLedger()
+bot.scheduler = PunishmentScheduler()  # timed unbans, unlocks and role removals
 
 # ✅ Global check for all slash commands
 async def global_blacklist_check(interaction: discord.Interaction) -> bool:
@@ -41,15 +54,19 @@ async def load_cogs():
     for cog in [
         'bot.cogs.welcome',
         'bot.cogs.moderation',
+        'bot.cogs.automod',
         'bot.cogs.member_count',
         'bot.cogs.messaging',
         'bot.cogs.infraction',
         'bot.cogs.suggestions',
+        'bot.cogs.cases',
         'bot.cogs.promote',
         'bot.cogs.topicc',
         'bot.cogs.session',
         'bot.cogs.blacklist',
-        'bot.cogs.review'
+        'bot.cogs.review',
+        'bot.cogs.diagnostics',
+        'bot.cogs.audit'
     ]:
         try:
             await bot.load_extension(cog)
@@ -71,12 +88,36 @@ async def on_ready():
         logger.error(f"Sync failed: {e}")
 
 async def main():
-    # keep_alive()  # Commented out for Render compatibility; uncomment if you want to keep it
+    if METRICS_PORT:
+        keep_alive(METRICS_PORT)  # /health, /metrics and /diagnostics; off unless METRICS_PORT is set
+    LOOP_MONITOR.start()  # loop lag and blocking callbacks, see /diagnostics
     await load_cogs()
+    # Render and containers stop the bot with SIGTERM; cancel like Ctrl+C does so the finally below
+    # still flushes the case store, point ledger and command logs
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass  # No signal handlers on Windows event loops
     try:
         await bot.start(TOKEN)
+    except asyncio.CancelledError:
+        logger.info("Shutting down")
     except Exception as e:
         logger.error(f"Bot start failed: {e}")
+    finally:
+        sink = getattr(bot, 'command_log_sink', None)
+        if sink is not None:
+            try:
+                await asyncio.wait_for(sink.drain(), timeout=10)  # queued command logs, while the HTTP session is open
+            except Exception as e:
+                logger.error(f"Command log drain failed: {e}")
+        if not bot.is_closed():
+            await bot.close()
+        bot.case_tracker.close()
+        bot.point_ledger.close()
+        bot.scheduler.close()
+        LOOP_MONITOR.stop()
+        AUDIT_LOG.close()
 
 if __name__ == "__main__":
     asyncio.run(main())